@@ -0,0 +1,117 @@
+import asyncio
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from agents.class_score import ClassScore
+from config import settings
+from metrics import grading_budget_exhausted, grading_budget_limit, grading_degraded_scores
+
+# Longest piece of one tool result carried into a best-effort score
+EVIDENCE_CHARS = 1500
+
+@dataclass
+class AgentBudget:
+    max_tool_calls: int
+    max_tokens: int
+    deadline: float
+
+    @classmethod
+    def from_settings(cls) -> "AgentBudget":
+        return cls(settings.agent_max_tool_calls, settings.agent_max_tokens, settings.agent_deadline_seconds)
+
+@dataclass
+class AgentRun:
+    """What an agent run produced; exhausted names the budget that stopped it"""
+    messages: list
+    structured_response: Optional[ClassScore] = None
+    tool_calls: int = 0
+    tokens: int = 0
+    exhausted: Optional[str] = None
+    evidence: list[str] = field(default_factory=list)
+
+async def run_with_budget(agent: Any, messages: list, budget: AgentBudget) -> AgentRun:
+    """Stream a ReAct agent run, stopping it once a budget is spent.
+
+    Tool calls are counted as the model requests them, so a turn that would
+    go over max_tool_calls stops the run before those tools execute. Tokens
+    come from the model messages' usage metadata. Whatever the run gathered
+    up to that point is returned.
+    """
+    run = AgentRun(messages=list(messages))
+    try:
+        async with asyncio.timeout(budget.deadline):
+            async with aclosing(agent.astream({"messages": messages}, stream_mode="updates")) as updates:
+                async for update in updates:
+                    for values in (update or {}).values():
+                        values = values or {}
+                        for message in values.get("messages", []):
+                            run.messages.append(message)
+                            if isinstance(message, AIMessage):
+                                run.tool_calls += len(message.tool_calls)
+                                run.tokens += (message.usage_metadata or {}).get("total_tokens", 0)
+                            elif isinstance(message, ToolMessage):
+                                content = message.content if isinstance(message.content, str) else str(message.content)
+                                run.evidence.append(content[:EVIDENCE_CHARS])
+                        if values.get("structured_response") is not None:
+                            run.structured_response = values["structured_response"]
+                    if run.structured_response is None:
+                        if run.tool_calls > budget.max_tool_calls:
+                            run.exhausted = "tool_calls"
+                        elif run.tokens > budget.max_tokens:
+                            run.exhausted = "tokens"
+                        if run.exhausted:
+                            break
+    except TimeoutError:
+        run.exhausted = "deadline"
+    if run.exhausted:
+        grading_budget_exhausted.inc(reason=run.exhausted)
+    return run
+
+def _degrade(score: ClassScore) -> ClassScore:
+    return score.model_copy(update={"confidence": min(score.confidence, settings.agent_degraded_confidence)})
+
+def heuristic_score(course_id: str, evidence: list[str]) -> ClassScore:
+    """Neutral placeholder score carrying whatever evidence was found"""
+    return ClassScore(
+        score=50,
+        ch=3,
+        summary=f"Best-effort placeholder for {course_id}: research stopped before an assessment was made.",
+        time_load=3.0,
+        pre_reqs=[],
+        co_reqs=[],
+        tags=["incomplete-research"],
+        evidence_snippets=[snippet[:300] for snippet in evidence[:5]],
+        confidence=0.0 if not evidence else 0.1,
+    )
+
+async def best_effort_score(llm: Any, system_prompt: str, course_id: str, run: AgentRun) -> ClassScore:
+    """Score a course from a stopped run's evidence, at reduced confidence.
+
+    One structured-output call over the evidence gathered so far, bounded by
+    agent_finalize_seconds; if that fails too, a neutral heuristic score.
+    """
+    evidence = "\n\n".join(f"[{i + 1}] {text}" for i, text in enumerate(run.evidence)) or "(none)"
+    request = [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=(
+            f"Evaluate the class {course_id}. The research budget ran out ({run.exhausted}); do not search "
+            f"further. Give your best assessment from this evidence alone and lower your confidence to match "
+            f"how little it covers.\n\nEvidence:\n{evidence}"
+        )),
+    ]
+    try:
+        score = await asyncio.wait_for(
+            llm.with_structured_output(ClassScore).ainvoke(request), settings.agent_finalize_seconds
+        )
+        grading_degraded_scores.inc(source="model")
+        return _degrade(score)
+    except Exception:
+        grading_degraded_scores.inc(source="heuristic")
+        return _degrade(heuristic_score(course_id, run.evidence))
+
+grading_budget_limit.set(settings.agent_max_tool_calls, budget="tool_calls")
+grading_budget_limit.set(settings.agent_max_tokens, budget="tokens")
+grading_budget_limit.set(settings.agent_deadline_seconds, budget="deadline_seconds")
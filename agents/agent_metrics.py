@@ -0,0 +1,79 @@
+import time
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import LLMResult
+
+from agents.class_score_cache import class_score_cache
+from agents.tools.internet_search import cached_tavily_search
+from metrics import (
+    grading_react_iterations,
+    grading_tool_calls,
+    grading_tool_duration,
+    record_llm_usage,
+    registry,
+    stats_metrics,
+)
+
+class GradingMetricsCallback(BaseCallbackHandler):
+    """Records tool wall time and chat model token usage for every run it sees.
+
+    Attached to the compiled grading graph, so it reaches the ReAct agent's
+    model and tool calls. Keyed by run id, so one instance serves concurrent runs.
+    """
+
+    # Bookkeeping only; no need to hop to an executor thread
+    run_inline = True
+
+    def __init__(self):
+        self._tools: dict[UUID, tuple[str, float]] = {}
+
+    def on_tool_start(self, serialized: dict, input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        self._tools[run_id] = (name, time.perf_counter())
+
+    def _tool_done(self, run_id: UUID, outcome: str) -> None:
+        name, start = self._tools.pop(run_id, ("unknown", None))
+        if start is not None:
+            grading_tool_duration.observe(time.perf_counter() - start, tool=name)
+        grading_tool_calls.inc(tool=name, outcome=outcome)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._tool_done(run_id, "ok")
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._tool_done(run_id, "error")
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if not usage:
+                    continue
+                model = message.response_metadata.get("model_name") or (response.llm_output or {}).get("model_name") or "unknown"
+                record_llm_usage(model, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
+grading_metrics_callback = GradingMetricsCallback()
+
+def record_agent_run(messages: list) -> int:
+    """Record how many model turns an agent run took; returns the count"""
+    iterations = sum(isinstance(message, AIMessage) for message in messages)
+    grading_react_iterations.observe(iterations)
+    return iterations
+
+@registry.collector
+def _cache_metrics():
+    return [
+        *stats_metrics(
+            "class_score_cache", "Class score cache", class_score_cache.stats(),
+            counters=("hits", "misses", "evictions", "expirations", "writes", "extensions"),
+        ),
+        # Misses are the calls that actually reached Tavily
+        *stats_metrics(
+            "search_cache", "Search tool result cache", cached_tavily_search.stats(),
+            counters=("hits", "misses", "run_dedups"),
+        ),
+    ]
@@ -1,24 +1,26 @@
+import asyncio
+import time
+from typing import Any, Optional, TypedDict, Annotated, Literal
 from dotenv import load_dotenv
-load_dotenv()
-
-from pydantic import BaseModel, Field
-from typing import Optional, TypedDict, Annotated, Literal
-from langgraph.graph import StateGraph, START, END
-from langgraph.graph.message import add_messages
-from langgraph.prebuilt import create_react_agent
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from agents.agent_budget import AgentBudget, best_effort_score, run_with_budget
+from agents.agent_metrics import grading_metrics_callback, record_agent_run
+from agents.class_score import ClassScore
+from agents.class_score_cache import class_score_cache
+from agents.evidence import Snippet, evidence_bundle, evidence_records, gather_evidence, rank_evidence
+from config import settings
+from course_identity import course_index
+from metrics import grading_path, timed_node
+from prerequisites import prerequisite_graph
+from similar_courses import similar_courses
 
 # Import tools
-from agents.tools.internet_search import basic_tavily_search
-#from agents.tools.osu_search import osu_search
-#from agents.tools.reddit_search import reddit_search
-#from agents.tools.coursicle_search import coursicle_search
-#from agents.tools.rate_my_professor import rate_my_professor_search
-
-# TODO
-# Implement all tools and import them here and add them to thhe tool list below
-# Implement caching of class scores
+from agents.tools.internet_search import cached_tavily_search
+from agents.tools.osu_search import osu_search, osu_source
+from agents.tools.reddit_search import reddit_search, reddit_source
+from agents.tools.coursicle_search import coursicle_search, coursicle_source
+from agents.tools.rate_my_professor import rate_my_professor_search, rate_my_professor_source
 
 prompt = '''
 You are an expert Ohio State University class difficulty analyzer. Your job is to research and evaluate the difficulty of OSU classes to help students make informed course selection decisions.
@@ -99,86 +101,189 @@ List the required and recommended prerequisite/co-requisite courses.
 Now, research the class and provide your comprehensive difficulty assessment.
 '''
 
-# Scoring fields for the classes
-class ClassScore(BaseModel):
-    score: int = Field(ge=1, le=100, description="overall class difficulty score")
-    ch: int = Field(description="credit hours of course")
-    summary: str = Field(description="overall summary of class difficulty")
-    time_load: float = Field(ge=0, le=8, description="weekly time/effort vibe, how many credit hours it feels like for this class.")
-    rigor: int = Field(0, ge=0, le=100, description="conceptual/technical depth")
-    assessment_intensity: int = Field(0, ge=0, le=100, description="amount and difficulty of exams")
-    project_intensity: int = Field(0, ge=0, le=100, description="amount and difficulty of projects")
-    pace: int = Field(50, ge=0, le=100, description="pace of class")
-    pre_reqs: list[str] = Field(description="list of pre-req classes needed")
-    co_reqs: list[str] = Field(description="list of co-req classes needed")
-    
-    # Evidence
-    tags: list[str] = Field(default_factory=list, description="tags about class")
-    evidence_snippets: list[str] = Field(default_factory=list, description="direct snippets from online posts")
-    confidence: float = Field(0.6, ge=0.0, le=1.0, description="amount and difficulty of exams")
+def _add_messages(left: list, right: list) -> list:
+    """LangGraph's add_messages reducer, imported when the graph first runs"""
+    from langgraph.graph.message import add_messages
+    return add_messages(left, right)
 
 # Define the state for the graph
 class ClassGradingState(TypedDict):
-    messages: Annotated[list, add_messages]
+    messages: Annotated[list, _add_messages]
     class_name: str
     class_score: ClassScore | None
     cached: bool
+    evidence: list
+    refresh: bool
+    cache_checked: bool
+
+tools = [cached_tavily_search, osu_search, reddit_search, coursicle_search, rate_my_professor_search]
+
+# The model, ReAct agent and compiled graph are built on first use rather than
+# at import, so the app boots fast and without API keys. Building is
+# synchronous, so concurrent requests on the event loop can't build twice.
+# Assign llm/agent directly to swap in stand-ins (see benchmarks/stand_ins.py).
+llm: Any = None
+agent: Any = None
+_graph: Any = None
+
+def get_llm():
+    """The chat model shared by every grading run"""
+    global llm
+    if llm is None:
+        from langchain_openai import ChatOpenAI
+        load_dotenv()
+        llm = ChatOpenAI(model="gpt-5-mini", temperature=1)
+    return llm
+
+def get_agent():
+    """The ReAct agent with tools, shared by every grading run"""
+    global agent
+    if agent is None:
+        from langgraph.prebuilt import create_react_agent
+        agent = create_react_agent(
+            model=get_llm(),
+            tools=tools,
+            prompt=prompt,
+            response_format=ClassScore
+        )
+    return agent
+
+# Queried all at once ahead of scoring; swap in fixtures to grade offline
+evidence_sources = [osu_source, reddit_source, coursicle_source, rate_my_professor_source]
+
+evidence_instructions = '''
+## Evidence Provided
+Research has already been done: base your assessment only on the numbered evidence in the user's message
+and do not ask for more. Quote evidence snippets from it, and lower your confidence where it is thin.
+'''
 
-# Initialize the ReAct agent with tools
-llm = ChatOpenAI(model="gpt-5-mini", temperature=1)
-tools = [basic_tavily_search]#, osu_search, reddit_search, coursicle_search, rate_my_professor_search]
-agent = create_react_agent(
-    model=llm,
-    tools=tools,
-    prompt=prompt,
-    response_format=ClassScore
-)
+# Bounds how many agent runs (LLM + search round trips) are in flight at once
+agent_run_limiter = asyncio.Semaphore(settings.max_concurrent_agent_runs)
 
 # Node 1: Check cache for class info
-def check_cache(state: ClassGradingState) -> ClassGradingState:
+async def check_cache(state: ClassGradingState) -> ClassGradingState:
     """Check if class information is already cached"""
-    # TODO: Implement actual cache lookup logic
-    # For now, always return no cache
+    if state.get("refresh"):
+        # Re-grading on purpose: the cached score is what's being replaced
+        return {"cached": False, "class_score": None}
+    if state.get("cache_checked"):
+        # The caller's lookup already missed (and was counted). Only a run that
+        # finished in between could have filled it, and that lands in memory.
+        entry = class_score_cache.peek(state["class_name"])
+        class_score = entry.score if entry is not None and entry.expires_at > time.time() else None
+        return {"cached": class_score is not None, "class_score": class_score}
+    class_score = await asyncio.to_thread(class_score_cache.get, state["class_name"])
     return {
-        "cached": False,
-        "class_score": None
+        "cached": class_score is not None,
+        "class_score": class_score
     }
 
-# Node 2: Score class agent (calls tools)
-def score_class_agent(state: ClassGradingState) -> ClassGradingState:
+async def collect_evidence(course_id: str) -> list[Snippet]:
+    """Query all evidence sources at once and keep the best distinct snippets"""
+    snippets = await gather_evidence(course_id, evidence_sources)
+    weights = {source.name: source.weight for source in evidence_sources}
+    return rank_evidence(course_id, snippets, weights)
+
+# Node 2: Gather evidence from every source concurrently
+async def retrieve_evidence(state: ClassGradingState) -> ClassGradingState:
+    """Collect evidence for the class, unless the caller (a refresh) already did"""
+    if state.get("evidence"):
+        return {}
+    return {
+        "evidence": await collect_evidence(state["class_name"])
+    }
+
+# Node 3: Score the class from the evidence in a single model call
+async def score_from_evidence(state: ClassGradingState) -> ClassGradingState:
+    """One structured-output call over the evidence bundle; leaves class_score unset if it fails"""
+    request = [
+        SystemMessage(content=prompt + evidence_instructions),
+        HumanMessage(content=f"Evaluate the class {state['class_name']}\n\nEvidence:\n{evidence_bundle(state['evidence'])}"),
+    ]
+    try:
+        async with agent_run_limiter:
+            class_score = await asyncio.wait_for(
+                get_llm().with_structured_output(ClassScore).ainvoke(request), settings.agent_deadline_seconds
+            )
+    except Exception:
+        # The ReAct agent gets a go instead
+        return {"class_score": None}
+    grading_path.inc(path="retrieval")
+    return {
+        "class_score": class_score
+    }
+
+# Node 4: Score class agent (calls tools)
+async def score_class_agent(state: ClassGradingState) -> ClassGradingState:
     """Agent that calls various tools to score the class"""
     messages = state["messages"]
-    response = agent.invoke({"messages": messages}, debug=False)
+    if state.get("evidence"):
+        # Don't make the agent rediscover what retrieval already found
+        messages = messages + [HumanMessage(content=f"Evidence found so far:\n{evidence_bundle(state['evidence'])}")]
+    grading_path.inc(path="agent")
+    async with agent_run_limiter:
+        run = await run_with_budget(get_agent(), messages, AgentBudget.from_settings())
+        class_score = run.structured_response
+        if class_score is None:
+            # Out of budget: settle for a low-confidence score from what was found
+            class_score = await best_effort_score(get_llm(), prompt, state["class_name"], run)
+    record_agent_run(run.messages)
     return {
-        "messages": response["messages"],
-        "class_score": response['structured_response']
+        "messages": run.messages,
+        "class_score": class_score
     }
 
-# Node 3: Cache class score and relevant course info
-def cache_class_score(state: ClassGradingState) -> ClassGradingState:
+# Node 5: Cache class score and relevant course info
+async def cache_class_score(state: ClassGradingState) -> ClassGradingState:
     """Cache the class scoring information and relevant course info"""
-    # TODO: Implement actual caching logic
-    # For now, just mark as cached without modifying the class_score
+    if state.get("class_score") is None:
+        return {"cached": False}
+    # Resolve first: a name that isn't a course id fails before anything is written
+    course = course_index.resolve(state["class_name"])
+    await asyncio.to_thread(
+        class_score_cache.put, state["class_name"], state["class_score"],
+        evidence=evidence_records(state.get("evidence") or []),
+    )
+    course_index.add(course)
+    similar_courses.add(course.key, str(course), state["class_score"])
+    await asyncio.to_thread(prerequisite_graph.update, course, state["class_score"])
     return {
         "cached": True
     }
 
 # Conditional edge, Route based on cache hit/miss
-def route_after_cache_check(state: ClassGradingState) -> Literal["score_class_agent", "end"]:
-    """Route to agent if no cache, otherwise end"""
+def route_after_cache_check(state: ClassGradingState) -> Literal["retrieve_evidence", "end"]:
+    """Route to evidence retrieval if no cache, otherwise end"""
     if state.get("cached") and state.get("class_score"):
         return "end"
+    return "retrieve_evidence"
+
+# Conditional edge, Score directly when retrieval found enough
+def route_after_retrieval(state: ClassGradingState) -> Literal["score_from_evidence", "score_class_agent"]:
+    """Single-call scoring with enough evidence, otherwise the agent researches"""
+    if len(state.get("evidence") or []) >= settings.evidence_min_snippets:
+        return "score_from_evidence"
+    return "score_class_agent"
+
+# Conditional edge, Fall back to the agent if the single call failed
+def route_after_evidence_score(state: ClassGradingState) -> Literal["cache_class_score", "score_class_agent"]:
+    if state.get("class_score") is not None:
+        return "cache_class_score"
     return "score_class_agent"
 
 # Build the graph
 def create_class_grading_graph():
     """Create and return the compiled class grading graph"""
+    from langgraph.graph import StateGraph, START, END
+
     graph = StateGraph(ClassGradingState)
 
     # Add nodes
-    graph.add_node("check_cache", check_cache)
-    graph.add_node("score_class_agent", score_class_agent)
-    graph.add_node("cache_class_score", cache_class_score)
+    graph.add_node("check_cache", timed_node("check_cache", check_cache))
+    graph.add_node("retrieve_evidence", timed_node("retrieve_evidence", retrieve_evidence))
+    graph.add_node("score_from_evidence", timed_node("score_from_evidence", score_from_evidence))
+    graph.add_node("score_class_agent", timed_node("score_class_agent", score_class_agent))
+    graph.add_node("cache_class_score", timed_node("cache_class_score", cache_class_score))
 
     # Add edges
     graph.add_edge(START, "check_cache")
@@ -186,17 +291,29 @@ def create_class_grading_graph():
         "check_cache",
         route_after_cache_check,
         {
-            "score_class_agent": "score_class_agent",
+            "retrieve_evidence": "retrieve_evidence",
             "end": END
         }
     )
+    graph.add_conditional_edges("retrieve_evidence", route_after_retrieval)
+    graph.add_conditional_edges("score_from_evidence", route_after_evidence_score)
     graph.add_edge("score_class_agent", "cache_class_score")
     graph.add_edge("cache_class_score", END)
 
-    return graph.compile()
+    # The callback follows the run into the agent's model and tool calls
+    return graph.compile().with_config(callbacks=[grading_metrics_callback])
 
-# Create the compiled graph
-class_grading_graph = create_class_grading_graph()
+def get_class_grading_graph():
+    """The compiled class grading graph, shared by every grading run"""
+    global _graph
+    if _graph is None:
+        _graph = create_class_grading_graph()
+    return _graph
+
+def warm_up() -> None:
+    """Build the model, agent and graph now instead of on the first request"""
+    get_agent()
+    get_class_grading_graph()
 
 if __name__ == "__main__":
     # run with python -m agents.class_grading_agent
@@ -207,10 +324,13 @@ if __name__ == "__main__":
         "messages": test_messages,
         "class_name": "CSE 2331",
         "class_score": None,
-        "cached": False
+        "cached": False,
+        "evidence": [],
+        "refresh": False,
+        "cache_checked": False,
     }
 
-    result = class_grading_graph.invoke(initial_state)
+    result = asyncio.run(get_class_grading_graph().ainvoke(initial_state))
     # Print as JSON
     import json
     print(json.dumps(result["class_score"].model_dump(), indent=2))
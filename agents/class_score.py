@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+
+# Scoring fields for the classes
+class ClassScore(BaseModel):
+    score: int = Field(ge=1, le=100, description="overall class difficulty score")
+    ch: int = Field(description="credit hours of course")
+    summary: str = Field(description="overall summary of class difficulty")
+    time_load: float = Field(ge=0, le=8, description="weekly time/effort vibe, how many credit hours it feels like for this class.")
+    rigor: int = Field(0, ge=0, le=100, description="conceptual/technical depth")
+    assessment_intensity: int = Field(0, ge=0, le=100, description="amount and difficulty of exams")
+    project_intensity: int = Field(0, ge=0, le=100, description="amount and difficulty of projects")
+    pace: int = Field(50, ge=0, le=100, description="pace of class")
+    pre_reqs: list[str] = Field(description="list of pre-req classes needed")
+    co_reqs: list[str] = Field(description="list of co-req classes needed")
+    
+    # Evidence
+    tags: list[str] = Field(default_factory=list, description="tags about class")
+    evidence_snippets: list[str] = Field(default_factory=list, description="direct snippets from online posts")
+    confidence: float = Field(0.6, ge=0.0, le=1.0, description="amount and difficulty of exams")
@@ -0,0 +1,289 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from agents.class_score import ClassScore
+from config import settings
+from course_identity import course_key
+
+def sqlite_path_from_url(url: str | None) -> str | None:
+    """Turn a sqlite:/// database url into a file path, None for non-sqlite urls"""
+    if not url or not url.startswith("sqlite"):
+        return None
+    path = url.split(":///", 1)[1] if ":///" in url else ""
+    return path or ":memory:"
+
+@dataclass
+class CacheEntry:
+    score: ClassScore
+    cached_at: float
+    expires_at: float
+    # The score serialized once, so cache hits can be served without re-encoding
+    payload: bytes
+    # The evidence the score was graded from (see agents.evidence.evidence_records)
+    evidence: list[dict] = field(default_factory=list)
+    # Last time the score was graded or its evidence re-checked
+    checked_at: float = 0.0
+
+    def __post_init__(self):
+        self.checked_at = self.checked_at or self.cached_at
+
+class ClassScoreCache:
+    """Two-tier ClassScore cache: an in-process LRU in front of a SQLite table.
+
+    Entries carry their own expiry, and scores below ``low_confidence`` get the
+    shorter ``low_confidence_ttl`` so weak guesses are re-graded sooner.
+    """
+
+    def __init__(
+        self,
+        db_path: str | None,
+        max_entries: int = 1024,
+        ttl: float = 7 * 24 * 60 * 60,
+        low_confidence_ttl: float = 24 * 60 * 60,
+        low_confidence: float = 0.5,
+    ):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.low_confidence_ttl = low_confidence_ttl
+        self.low_confidence = low_confidence
+
+        self._lru: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.writes = 0
+        self.extensions = 0
+
+    # ---------------------------------------------------------
+    # Durable tier
+    # ---------------------------------------------------------
+    def _db(self) -> sqlite3.Connection | None:
+        """Open the SQLite connection on first use"""
+        if self.db_path is None:
+            return None
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS class_score_cache (
+                    course_key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    confidence REAL NOT NULL,
+                    cached_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    evidence TEXT NOT NULL DEFAULT '[]',
+                    checked_at REAL
+                )
+                """
+            )
+            self._migrate(self._conn)
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _migrate(db: sqlite3.Connection) -> None:
+        """Add columns that caches created by older versions lack"""
+        columns = {row[1] for row in db.execute("PRAGMA table_info(class_score_cache)")}
+        if "evidence" not in columns:
+            db.execute("ALTER TABLE class_score_cache ADD COLUMN evidence TEXT NOT NULL DEFAULT '[]'")
+        if "checked_at" not in columns:
+            db.execute("ALTER TABLE class_score_cache ADD COLUMN checked_at REAL")
+
+    def _load(self, key: str) -> CacheEntry | None:
+        db = self._db()
+        if db is None:
+            return None
+        row = db.execute(
+            "SELECT payload, cached_at, expires_at, evidence, checked_at FROM class_score_cache WHERE course_key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        payload, cached_at, expires_at, evidence, checked_at = row
+        return CacheEntry(
+            ClassScore.model_validate_json(payload), cached_at, expires_at, payload.encode(),
+            json.loads(evidence), checked_at or cached_at,
+        )
+
+    def _store(self, key: str, entry: CacheEntry) -> None:
+        db = self._db()
+        if db is None:
+            return
+        db.execute(
+            """
+            INSERT OR REPLACE INTO class_score_cache
+                (course_key, payload, confidence, cached_at, expires_at, evidence, checked_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                key, entry.payload.decode(), entry.score.confidence, entry.cached_at, entry.expires_at,
+                json.dumps(entry.evidence), entry.checked_at,
+            ),
+        )
+        db.commit()
+
+    def _delete(self, key: str) -> None:
+        db = self._db()
+        if db is None:
+            return
+        db.execute("DELETE FROM class_score_cache WHERE course_key = ?", (key,))
+        db.commit()
+
+    # ---------------------------------------------------------
+    # In-process LRU
+    # ---------------------------------------------------------
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+            self.evictions += 1
+
+    def ttl_for(self, score: ClassScore) -> float:
+        """Low-confidence scores expire sooner than confident ones"""
+        if score.confidence < self.low_confidence:
+            return min(self.ttl, self.low_confidence_ttl)
+        return self.ttl
+
+    # ---------------------------------------------------------
+    # Public API
+    # ---------------------------------------------------------
+    def get_entry(self, course_id: str, lru_only: bool = False) -> CacheEntry | None:
+        """Return the live cache entry for a course, or None on a miss.
+
+        With lru_only, only the in-process tier is consulted (no SQLite I/O, so
+        it is safe on the event loop) and a miss there is left uncounted for
+        the full lookup that follows.
+        """
+        key = course_key(course_id)
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if lru_only and (entry is None or entry.expires_at <= now):
+                return None
+            if entry is None:
+                entry = self._load(key)
+                if entry is not None:
+                    self._remember(key, entry)
+            else:
+                self._lru.move_to_end(key)
+
+            if entry is not None and entry.expires_at <= now:
+                # The row stays in SQLite so a refresh can still diff its evidence
+                self._lru.pop(key, None)
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def get(self, course_id: str) -> ClassScore | None:
+        """Return the cached ClassScore for a course, or None on a miss"""
+        entry = self.get_entry(course_id)
+        return entry.score if entry else None
+
+    def peek(self, course_id: str) -> CacheEntry | None:
+        """The in-process entry for a course, without touching LRU order or counters"""
+        with self._lock:
+            return self._lru.get(course_key(course_id))
+
+    def stored_entry(self, course_id: str) -> CacheEntry | None:
+        """The entry for a course even if it has expired, without touching counters"""
+        key = course_key(course_id)
+        with self._lock:
+            return self._lru.get(key) or self._load(key)
+
+    def put(
+        self, course_id: str, score: ClassScore, ttl: float | None = None, evidence: list[dict] | None = None
+    ) -> CacheEntry:
+        """Cache a score (and the evidence behind it) in both tiers; ttl
+        overrides the confidence-based default"""
+        key = course_key(course_id)
+        now = time.time()
+        entry = CacheEntry(
+            score, now, now + (ttl if ttl is not None else self.ttl_for(score)), score.model_dump_json().encode(),
+            evidence or [],
+        )
+        with self._lock:
+            self._remember(key, entry)
+            self._store(key, entry)
+            self.writes += 1
+        return entry
+
+    def extend(self, course_id: str, ttl: float | None = None) -> CacheEntry | None:
+        """Keep a stored score for another TTL after its evidence checked out
+        unchanged; None if nothing is stored for the course"""
+        key = course_key(course_id)
+        now = time.time()
+        with self._lock:
+            stored = self._lru.get(key) or self._load(key)
+            if stored is None:
+                return None
+            entry = CacheEntry(
+                stored.score, stored.cached_at, now + (ttl if ttl is not None else self.ttl_for(stored.score)),
+                stored.payload, stored.evidence, now,
+            )
+            self._remember(key, entry)
+            self._store(key, entry)
+            self.extensions += 1
+        return entry
+
+    def invalidate(self, course_id: str) -> None:
+        """Drop a course from both tiers"""
+        key = course_key(course_id)
+        with self._lock:
+            self._lru.pop(key, None)
+            self._delete(key)
+
+    def keys(self) -> list[str]:
+        """Keys of every course in the durable tier (or the LRU without one)"""
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return list(self._lru)
+            return [row[0] for row in db.execute("SELECT course_key FROM class_score_cache")]
+
+    def scores(self) -> list[tuple[str, ClassScore]]:
+        """(key, score) for every course in the durable tier (or the LRU without
+        one), expired entries included"""
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return [(key, entry.score) for key, entry in self._lru.items()]
+            rows = db.execute("SELECT course_key, payload FROM class_score_cache").fetchall()
+        return [(key, ClassScore.model_validate_json(payload)) for key, payload in rows]
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "writes": self.writes,
+                "extensions": self.extensions,
+                "size": len(self._lru),
+            }
+
+class_score_cache = ClassScoreCache(
+    db_path=sqlite_path_from_url(settings.class_score_cache_url or settings.database_url),
+    max_entries=settings.class_score_cache_size,
+    ttl=settings.class_score_cache_ttl_seconds,
+    low_confidence_ttl=settings.class_score_cache_low_confidence_ttl_seconds,
+    low_confidence=settings.class_score_cache_low_confidence,
+)
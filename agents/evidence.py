@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import re
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional, Protocol, Sequence
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+from config import settings
+from course_identity import parse_course_id
+from metrics import evidence_source_duration, evidence_source_fetches
+
+@dataclass(frozen=True)
+class Snippet:
+    source: str
+    content: str
+    url: str = ""
+    title: str = ""
+    relevance: float = 0.5  # the provider's own 0-1 relevance, when it has one
+
+class EvidenceSource(Protocol):
+    """Anything that can look up evidence about a course.
+
+    weight scales how much its snippets count when ranking against other
+    sources. Tests and benchmarks plug in local fixtures by implementing this.
+    """
+    name: str
+    weight: float
+
+    async def fetch(self, course_id: str) -> list[Snippet]: ...
+
+class SearchSource:
+    """An evidence source backed by a web search tool restricted to some domains"""
+
+    def __init__(self, name: str, search: BaseTool, query: str, domains: Sequence[str], weight: float = 1.0):
+        self.name = name
+        self.search = search
+        self.query = query
+        self.domains = list(domains)
+        self.weight = weight
+
+    async def fetch(self, course_id: str) -> list[Snippet]:
+        result = await self.search.ainvoke({"query": self.query.format(course=course_id), "include_domains": self.domains})
+        if not isinstance(result, dict) or "error" in result:
+            return []
+        return [
+            Snippet(
+                source=self.name,
+                content=item.get("content") or "",
+                url=item.get("url") or "",
+                title=item.get("title") or "",
+                relevance=float(item.get("score") or 0.5),
+            )
+            for item in result.get("results") or []
+            if item.get("content")
+        ]
+
+    def as_tool(self, description: str) -> BaseTool:
+        """The same lookup as a tool the ReAct agent can call"""
+        async def lookup(course_id: str) -> list[dict]:
+            return [asdict(snippet) for snippet in await self.fetch(course_id)]
+        return StructuredTool.from_function(coroutine=lookup, name=f"{self.name}_search", description=description)
+
+async def _fetch(source: EvidenceSource, course_id: str, timeout: float) -> list[Snippet]:
+    start = time.perf_counter()
+    try:
+        snippets = await asyncio.wait_for(source.fetch(course_id), timeout)
+        outcome = "ok"
+    except asyncio.TimeoutError:
+        snippets, outcome = [], "timeout"
+    except Exception:
+        snippets, outcome = [], "error"
+    evidence_source_duration.observe(time.perf_counter() - start, source=source.name)
+    evidence_source_fetches.inc(source=source.name, outcome=outcome)
+    return snippets
+
+async def gather_evidence(course_id: str, sources: Sequence[EvidenceSource], timeout: Optional[float] = None) -> list[Snippet]:
+    """Query every source at once; a source that fails or times out contributes nothing"""
+    timeout = timeout or settings.evidence_source_timeout_seconds
+    results = await asyncio.gather(*(_fetch(source, course_id, timeout) for source in sources))
+    return [snippet for snippets in results for snippet in snippets]
+
+def _fingerprint(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower())[:30])
+
+def rank_evidence(
+    course_id: str,
+    snippets: Sequence[Snippet],
+    weights: dict[str, float],
+    limit: Optional[int] = None,
+) -> list[Snippet]:
+    """Drop duplicate snippets and keep the best `limit` of the rest.
+
+    Duplicates share a URL or open with the same words. Snippets are scored
+    by source weight times provider relevance, with a bonus for naming the
+    course number; every source's best snippet is kept ahead of the others
+    so one chatty source can't crowd out the rest.
+    """
+    limit = limit or settings.evidence_max_snippets
+    try:
+        number = parse_course_id(course_id).number
+    except ValueError:
+        number = None
+
+    seen_urls, seen_text, unique = set(), set(), []
+    for snippet in snippets:
+        fingerprint = _fingerprint(snippet.content)
+        if (snippet.url and snippet.url in seen_urls) or fingerprint in seen_text:
+            continue
+        seen_urls.add(snippet.url)
+        seen_text.add(fingerprint)
+        unique.append(snippet)
+
+    def score(snippet: Snippet) -> float:
+        mentions = number is not None and number in f"{snippet.title} {snippet.content}"
+        return weights.get(snippet.source, 1.0) * (0.5 + 0.5 * snippet.relevance) + (0.3 if mentions else 0.0)
+
+    ordered = sorted(unique, key=score, reverse=True)
+    leaders, rest, seen_sources = [], [], set()
+    for snippet in ordered:
+        if snippet.source in seen_sources:
+            rest.append(snippet)
+        else:
+            seen_sources.add(snippet.source)
+            leaders.append(snippet)
+    return (leaders + rest)[:limit]
+
+def evidence_bundle(snippets: Sequence[Snippet], max_chars: Optional[int] = None) -> str:
+    """Numbered, source-labelled evidence text for the scoring prompt"""
+    max_chars = max_chars or settings.evidence_snippet_chars
+    parts = []
+    for i, snippet in enumerate(snippets, 1):
+        header = f"[{i}] ({snippet.source}) {snippet.title}".rstrip()
+        if snippet.url:
+            header += f" <{snippet.url}>"
+        parts.append(f"{header}\n{snippet.content[:max_chars]}")
+    return "\n\n".join(parts)
+
+def content_hash(text: str) -> str:
+    """Hash of a snippet's words, ignoring case, punctuation and spacing"""
+    words = " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+    return hashlib.blake2b(words.encode(), digest_size=8).hexdigest()
+
+def evidence_records(snippets: Sequence[Snippet]) -> list[dict]:
+    """Snippets as stored alongside a cached score, each with its content hash"""
+    return [{**asdict(snippet), "hash": content_hash(snippet.content)} for snippet in snippets]
+
+def evidence_change(stored: Sequence[dict], snippets: Sequence[Snippet]) -> float:
+    """How different fresh evidence is from stored records, 0 (same) to 1 (disjoint).
+
+    Jaccard distance between the two sets of content hashes; a score stored
+    without evidence always counts as fully changed.
+    """
+    old = {record["hash"] for record in stored}
+    new = {content_hash(snippet.content) for snippet in snippets}
+    if not old:
+        return 1.0
+    return 1 - len(old & new) / len(old | new)
@@ -0,0 +1,174 @@
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+from enum import Enum
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+from agents.class_score import ClassScore
+from agents.class_score_cache import class_score_cache
+from agents.grading_service import grade_course
+from config import settings
+from course_identity import course_index
+from metrics import registry, stats_metrics
+
+logger = logging.getLogger(__name__)
+
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+# Lower runs first: interactive requests jump ahead of prefetch work
+JOB_PRIORITIES = {"interactive": 0, "prefetch": 1}
+
+class GradingJobRequest(BaseModel):
+    courseId: str
+    priority: Literal["interactive", "prefetch"] = "interactive"
+
+class GradingJob(BaseModel):
+    jobId: str
+    courseId: str
+    priority: Literal["interactive", "prefetch"]
+    status: JobStatus
+    submitted_at: float
+    finished_at: Optional[float] = None
+    result: Optional[ClassScore] = None
+    # A fixed message for clients; the exception itself is only logged
+    error: Optional[str] = None
+
+class QueueFull(Exception):
+    """Raised when the grading queue can't take another job"""
+
+class GradingJobQueue:
+    """Bounded, prioritized in-process queue of grading jobs.
+
+    Submitting a course that already has a queued or running job returns that
+    job instead of a new one. Finished jobs are kept for ``retention`` seconds
+    so clients can poll for the result.
+    """
+
+    def __init__(self, workers: int = 4, max_queued: int = 100, retention: float = 3600):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retention = retention
+
+        self._jobs: dict[str, GradingJob] = {}
+        self._active_by_course: dict[str, str] = {}
+        self._queue: asyncio.PriorityQueue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._seq = itertools.count()
+        self._queued = 0
+
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+
+    async def start(self) -> None:
+        """Start the worker pool"""
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the worker pool"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention
+        for job_id in [j.jobId for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    async def submit(self, course_id: str, priority: str = "interactive") -> GradingJob:
+        """Queue a grading job, or return the existing job for the same course.
+
+        Raises ValueError if course_id isn't a course id and QueueFull when the
+        queue is at capacity.
+        """
+        if self._queue is None:
+            raise RuntimeError("GradingJobQueue.start() has not been called")
+        course = course_index.resolve(course_id)
+        self._prune()
+
+        job_id = self._active_by_course.get(course.key)
+        if job_id is not None:
+            job = self._jobs[job_id]
+            self.deduplicated += 1
+            # Re-queue an existing prefetch job at the higher priority; the
+            # stale entry is skipped when a worker pops it
+            if job.status == JobStatus.queued and JOB_PRIORITIES[priority] < JOB_PRIORITIES[job.priority]:
+                job.priority = priority
+                self._queue.put_nowait((JOB_PRIORITIES[priority], next(self._seq), job.jobId))
+            return job
+
+        now = time.time()
+        job = GradingJob(jobId=uuid.uuid4().hex, courseId=str(course), priority=priority, status=JobStatus.queued, submitted_at=now)
+
+        class_score = await asyncio.to_thread(class_score_cache.get, course.key)
+        if class_score is not None:
+            job.status, job.result, job.finished_at = JobStatus.done, class_score, now
+            self._jobs[job.jobId] = job
+            self.submitted += 1
+            return job
+
+        if self._queued >= self.max_queued:
+            self.rejected += 1
+            raise QueueFull(f"Grading queue is full ({self.max_queued} jobs)")
+
+        self._jobs[job.jobId] = job
+        self._active_by_course[course.key] = job.jobId
+        self._queued += 1
+        self._queue.put_nowait((JOB_PRIORITIES[priority], next(self._seq), job.jobId))
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str) -> GradingJob | None:
+        return self._jobs.get(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job.status != JobStatus.queued:
+                continue
+            self._queued -= 1
+            job.status = JobStatus.running
+            try:
+                job.result = await grade_course(job.courseId)
+                job.status = JobStatus.done
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                job.error = "grading timed out"
+                job.status = JobStatus.failed
+            except Exception:
+                logger.exception("Grading job %s for %s failed", job.jobId, job.courseId)
+                job.error = "grading failed"
+                job.status = JobStatus.failed
+            finally:
+                job.finished_at = time.time()
+                self._active_by_course.pop(course_index.resolve(job.courseId).key, None)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queued,
+            "running": sum(j.status == JobStatus.running for j in self._jobs.values()),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+        }
+
+grading_jobs = GradingJobQueue(
+    workers=settings.grading_job_workers,
+    max_queued=settings.grading_job_queue_size,
+    retention=settings.grading_job_retention_seconds,
+)
+registry.collector(lambda: stats_metrics(
+    "grading_jobs", "Background grading jobs", grading_jobs.stats(), counters=("submitted", "deduplicated", "rejected")
+))
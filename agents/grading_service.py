@@ -0,0 +1,192 @@
+import asyncio
+from typing import AsyncIterator
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from agents.class_grading_agent import ClassScore, collect_evidence, get_class_grading_graph
+from agents.class_score_cache import class_score_cache
+from agents.evidence import evidence_change
+from agents.pinned_scores import pinned_scores
+from agents.single_flight import SingleFlight
+from agents.tools.search_cache import fresh_search_scope, search_run_scope
+from config import settings
+from course_identity import CourseId, course_index
+from metrics import grading_refreshes, registry, stats_metrics
+
+# Concurrent lookups for the same course share one agent run
+rating_flights: SingleFlight[ClassScore] = SingleFlight(waiter_timeout=settings.rating_waiter_timeout_seconds)
+registry.collector(lambda: stats_metrics(
+    "rating_flights", "Shared grading runs", rating_flights.stats(), counters=("runs", "coalesced", "timeouts")
+))
+
+def initial_grading_state(course_id: str, cache_checked: bool = False) -> dict:
+    """Initial graph state for grading a course. Pass cache_checked when the
+    caller has just missed the cache, so the graph doesn't count a second miss."""
+    return {
+        "messages": [HumanMessage(content=f"Evaluate the class {course_id}")],
+        "class_name": course_id,
+        "class_score": None,
+        "cached": False,
+        "evidence": [],
+        "refresh": False,
+        "cache_checked": cache_checked,
+    }
+
+async def _run_grading(course_id: str, evidence: list | None = None) -> ClassScore:
+    """Run the grading graph for one course, whose cache lookup just missed.
+    Given evidence, it re-grades from that evidence without consulting the cache."""
+    state = initial_grading_state(course_id, cache_checked=True)
+    if evidence is not None:
+        state.update(evidence=evidence, refresh=True)
+    with search_run_scope():
+        result = await get_class_grading_graph().ainvoke(state)
+    return result["class_score"]
+
+# Longest tool output forwarded as an "evidence" progress event
+EVIDENCE_PREVIEW_CHARS = 500
+
+def _progress_events(namespace: tuple, update: dict) -> list[tuple[str, dict]]:
+    """Translate one LangGraph "updates" chunk into progress events"""
+    events = []
+    for node, values in (update or {}).items():
+        if not namespace:
+            events.append(("node", {"node": node}))
+            for snippet in (values or {}).get("evidence") or []:
+                events.append(("evidence", {
+                    "tool": snippet.source, "url": snippet.url, "content": snippet.content[:EVIDENCE_PREVIEW_CHARS]
+                }))
+            continue
+        for message in (values or {}).get("messages", []):
+            if isinstance(message, AIMessage):
+                for call in message.tool_calls:
+                    events.append(("tool_call", {"tool": call["name"], "args": call["args"]}))
+            elif isinstance(message, ToolMessage):
+                content = message.content if isinstance(message.content, str) else str(message.content)
+                events.append(("evidence", {"tool": message.name, "content": content[:EVIDENCE_PREVIEW_CHARS]}))
+    return events
+
+async def _run_grading_streamed(course_id: str, events: asyncio.Queue) -> ClassScore:
+    """Run the grading graph for one course, pushing progress events to a queue"""
+    class_score = None
+    try:
+        with search_run_scope():
+            async for namespace, update in get_class_grading_graph().astream(
+                initial_grading_state(course_id, cache_checked=True), stream_mode="updates", subgraphs=True
+            ):
+                for event in _progress_events(namespace, update):
+                    events.put_nowait(event)
+                for values in (update or {}).values():
+                    if not namespace and (values or {}).get("class_score") is not None:
+                        class_score = values["class_score"]
+        return class_score
+    finally:
+        events.put_nowait(None)
+
+async def grade_course(course_id: str) -> ClassScore:
+    """Return the ClassScore for a course, from cache or a (shared) agent run.
+
+    Any spelling of a course id works; equivalent ids share one cache entry
+    and one run. Pinned scores win over both. Raises ValueError if course_id
+    isn't a course id, and asyncio.TimeoutError if the shared run outlives
+    the waiter timeout.
+    """
+    course = course_index.resolve(course_id)
+    if course.key in pinned_scores:
+        return pinned_scores[course.key]
+    class_score = await asyncio.to_thread(class_score_cache.get, course.key)
+    if class_score is not None:
+        return class_score
+    return await rating_flights.do(course.key, lambda: _run_grading(str(course)))
+
+async def refresh_course(course_id: str) -> str:
+    """Re-check a course's evidence, re-grading only if it materially changed.
+
+    Fetches every source live and diffs the snippets against the evidence
+    stored with the cached score. Returns "extended" when the change is under
+    evidence_change_threshold (the score is kept for another TTL), "regraded"
+    when the model scored the new evidence, "graded" when nothing was cached,
+    and "skipped" when no source returned anything or the score is pinned
+    (the entry is left alone).
+    """
+    outcome = await _refresh(course_index.resolve(course_id))
+    grading_refreshes.inc(outcome=outcome)
+    return outcome
+
+async def _refresh(course: CourseId) -> str:
+    if course.key in pinned_scores:
+        return "skipped"
+    entry = await asyncio.to_thread(class_score_cache.stored_entry, course.key)
+    if entry is None:
+        await grade_course(str(course))
+        return "graded"
+
+    with fresh_search_scope():
+        evidence = await collect_evidence(str(course))
+    if not evidence:
+        return "skipped"
+    if evidence_change(entry.evidence, evidence) < settings.evidence_change_threshold:
+        await asyncio.to_thread(class_score_cache.extend, course.key)
+        return "extended"
+    await rating_flights.do(course.key, lambda: _run_grading(str(course), evidence))
+    return "regraded"
+
+async def grade_courses(course_ids: list[str], max_fan_out: int | None = None) -> dict[str, ClassScore]:
+    """Resolve ClassScores for many courses at once, keyed by the ids given.
+
+    Cached scores are read in one pass; the misses are graded concurrently,
+    at most max_fan_out (default batch_grading_max_fan_out) at a time, and
+    equivalent spellings are graded once. Raises ValueError for strings that
+    aren't course ids.
+    """
+    courses = {course_id: course_index.resolve(course_id) for course_id in course_ids}
+    unique = {course.key: course for course in courses.values()}
+
+    def lookup_all() -> dict[str, ClassScore | None]:
+        return {key: pinned_scores.get(key) or class_score_cache.get(key) for key in unique}
+
+    by_key = await asyncio.to_thread(lookup_all)
+    misses = [key for key, score in by_key.items() if score is None]
+    if misses:
+        fan_out = asyncio.Semaphore(max_fan_out or settings.batch_grading_max_fan_out)
+
+        async def grade(key: str) -> ClassScore:
+            async with fan_out:
+                return await grade_course(str(unique[key]))
+
+        for key, score in zip(misses, await asyncio.gather(*(grade(k) for k in misses))):
+            by_key[key] = score
+    return {course_id: by_key[course.key] for course_id, course in courses.items()}
+
+async def stream_grading(course_id: str) -> AsyncIterator[tuple[str, dict]]:
+    """Grade a course, yielding (event, data) progress pairs as the graph runs.
+
+    Emits "start", then "node" / "tool_call" / "evidence" events while the
+    agent works, and finishes with "result" carrying the ClassScore. If the
+    course is already being graded the stream joins that run and emits
+    "waiting" instead of progress. Raises ValueError if course_id isn't a
+    course id, and asyncio.TimeoutError after the waiter timeout.
+    """
+    course = course_index.resolve(course_id)
+    yield "start", {"courseId": str(course)}
+
+    if course.key in pinned_scores:
+        yield "result", pinned_scores[course.key].model_dump(mode="json")
+        return
+    class_score = await asyncio.to_thread(class_score_cache.get, course.key)
+    if class_score is not None:
+        yield "node", {"node": "check_cache", "cached": True}
+        yield "result", class_score.model_dump(mode="json")
+        return
+
+    events: asyncio.Queue = asyncio.Queue()
+    run, started = rating_flights.join(course.key, lambda: _run_grading_streamed(str(course), events))
+    if started:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.rating_waiter_timeout_seconds
+        while (event := await asyncio.wait_for(events.get(), max(0.0, deadline - loop.time()))) is not None:
+            yield event
+    else:
+        yield "waiting", {"courseId": str(course)}
+
+    class_score = await rating_flights.wait(run)
+    yield "result", class_score.model_dump(mode="json")
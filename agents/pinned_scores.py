@@ -0,0 +1,42 @@
+from agents.class_score import ClassScore
+
+# Ratings set by hand, keyed by course key. grade_course serves these ahead
+# of the cache and the agent, so every route returns the same score for them.
+pinned_scores: dict[str, ClassScore] = {
+    "CSE2331": ClassScore(
+        score=73,
+        ch=3,
+        summary="A mid-level, conceptually rigorous data-structures and algorithms course (proofs, complexity, NP-completeness) that is challenging and time-consuming but essential for CS/CSE majors.",
+        time_load=6.0,
+        rigor=75,
+        assessment_intensity=65,
+        project_intensity=65,
+        pace=70,
+        pre_reqs=[
+            "CSE 2231",
+            "CSE 2321",
+            "STAT 3460 or STAT 3470"
+        ],
+        co_reqs=[
+            "Math 3345 (concurrent in some offerings)"
+        ],
+        tags=[
+            "algorithms",
+            "data-structures",
+            "proofs",
+            "NP-completeness",
+            "randomized-algorithms",
+            "hashing",
+            "graphs",
+            "time-consuming",
+            "core-course"
+        ],
+        evidence_snippets=[
+            '''"Design/analysis of algorithms and data structures; divide-and-conquer; sorting and selection, search trees, hashing, graph algorithms, string matching; probabilistic analysis; randomized algorithms; NP-completeness." — OSU course listing/syllabus''',
+            '''"Be competent with using asymptotic notation ... Be familiar with designing graph algorithms ... Be familiar with the use of balanced trees ... Be familiar with hashing." — OSU syllabus objectives''',
+            '''"Prereq: 2231, 2321, and Stat 3460 or 3470 ... Concur: Math 3345." — OSU course catalog entry''',
+            '''Student discussion note: "CSE 2331 & 2421 Study Resource ... Nick Painter's playlist is also great for studying Foundation II." — student forum (Reddit)'''
+        ],
+        confidence=0.75
+    ),
+}
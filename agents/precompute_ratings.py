@@ -0,0 +1,238 @@
+"""Warm the ratings cache for a list of courses ahead of registration.
+
+    python -m agents.precompute_ratings CSE2221 CSE2231
+    python -m agents.precompute_ratings --catalog cse_courses.txt --workers 4 --runs-per-minute 20
+
+Courses are graded by a pool of workers through the regular grading graph,
+so every result lands in the ratings cache. Progress is appended to a
+checkpoint file; re-running the same command after a crash skips courses
+that already finished.
+
+    python -m agents.precompute_ratings --catalog cse_courses.txt --refresh --refresh-older-than 20
+
+--refresh re-checks courses that are already cached instead: their
+evidence is fetched fresh and the model only runs again for courses whose
+evidence changed; the rest just have their cache TTL extended. The
+checkpoint is not used in this mode.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from agents.class_grading_agent import get_class_grading_graph
+from agents.class_score_cache import class_score_cache
+from agents.grading_service import initial_grading_state, refresh_course
+from agents.pinned_scores import pinned_scores
+from agents.tools.search_cache import search_run_scope
+from course_identity import course_index, course_key
+
+class RateLimiter:
+    """Token bucket allowing `rate` acquisitions per `per` seconds"""
+
+    def __init__(self, rate: float, per: float = 60.0):
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.fill_rate = rate / per
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.fill_rate)
+
+class Checkpoint:
+    """Append-only JSONL record of finished courses"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: set[str] = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        if entry["status"] == "done":
+                            self.done.add(entry["key"])
+
+    def record(self, course_id: str, status: str, error: str | None = None) -> None:
+        key = course_key(course_id)
+        if status == "done":
+            self.done.add(key)
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"key": key, "courseId": course_id, "status": status, "error": error, "at": time.time()}) + "\n")
+
+def read_catalog(path: str) -> list[str]:
+    """One course id per line; blank lines and # comments are ignored"""
+    with open(path) as f:
+        return [line.split("#", 1)[0].strip() for line in f if line.split("#", 1)[0].strip()]
+
+async def grade_with_retries(course_id: str, limiter: RateLimiter, retries: int) -> None:
+    if await asyncio.to_thread(class_score_cache.get, course_id) is not None:
+        return
+    for attempt in range(retries + 1):
+        await limiter.acquire()
+        try:
+            with search_run_scope():
+                result = await get_class_grading_graph().ainvoke(initial_grading_state(course_id, cache_checked=True))
+            if result.get("class_score") is None:
+                raise RuntimeError("agent returned no score")
+            return
+        except Exception:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(2 ** attempt)
+
+async def refresh_with_retries(course_id: str, limiter: RateLimiter, retries: int, older_than: float | None) -> str:
+    if older_than is not None:
+        entry = await asyncio.to_thread(class_score_cache.stored_entry, course_id)
+        if entry is not None and time.time() - entry.checked_at < older_than:
+            return "recent"
+    for attempt in range(retries + 1):
+        await limiter.acquire()
+        try:
+            return await refresh_course(course_id)
+        except Exception:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(2 ** attempt)
+
+async def refresh(
+    course_ids: list[str],
+    workers: int = 4,
+    runs_per_minute: float = 20,
+    retries: int = 2,
+    older_than_hours: float | None = None,
+) -> dict:
+    """Re-check every course's evidence, returning counts by outcome"""
+    limiter = RateLimiter(runs_per_minute)
+    older_than = older_than_hours * 3600 if older_than_hours is not None else None
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    counts = {"extended": 0, "regraded": 0, "graded": 0, "skipped": 0, "recent": 0, "failed": 0}
+    for course_id in dict.fromkeys(course_ids):
+        try:
+            queue.put_nowait(str(course_index.resolve(course_id)))
+        except ValueError as e:
+            counts["failed"] += 1
+            print(f"{course_id} failed: {e}", flush=True)
+    total = queue.qsize() + counts["failed"]
+
+    async def worker() -> None:
+        while True:
+            try:
+                course_id = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                status = await refresh_with_retries(course_id, limiter, retries, older_than)
+            except Exception as e:
+                status = "failed"
+                print(f"{course_id} failed: {e!r}", flush=True)
+            counts[status] += 1
+            print(f"[{sum(counts.values())}/{total}] {course_id} {status}", flush=True)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+    return counts
+
+async def precompute(
+    course_ids: list[str],
+    workers: int = 4,
+    runs_per_minute: float = 20,
+    checkpoint_path: str = ".precompute_checkpoint.jsonl",
+    retries: int = 2,
+    force: bool = False,
+) -> dict:
+    """Grade every course not already checkpointed, returning counts by outcome"""
+    checkpoint = Checkpoint(checkpoint_path)
+    limiter = RateLimiter(runs_per_minute)
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    counts = {"done": 0, "skipped": 0, "failed": 0}
+
+    seen = set()
+    for course_id in course_ids:
+        try:
+            course = course_index.resolve(course_id)
+        except ValueError as e:
+            # Not a course id: fail it now rather than after the agent has run for it
+            checkpoint.record(course_id, "failed", str(e))
+            counts["failed"] += 1
+            print(f"{course_id} failed: {e}", flush=True)
+            continue
+        key = course.key
+        if key in seen:
+            continue
+        seen.add(key)
+        course_id = str(course)
+        if key in pinned_scores or (key in checkpoint.done and not force):
+            counts["skipped"] += 1
+            continue
+        if force:
+            class_score_cache.invalidate(course_id)
+        queue.put_nowait(course_id)
+    total = queue.qsize() + counts["failed"]
+
+    async def worker() -> None:
+        while True:
+            try:
+                course_id = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                await grade_with_retries(course_id, limiter, retries)
+                checkpoint.record(course_id, "done")
+                counts["done"] += 1
+                status = "ok"
+            except Exception as e:
+                checkpoint.record(course_id, "failed", repr(e))
+                counts["failed"] += 1
+                status = f"failed: {e!r}"
+            print(f"[{counts['done'] + counts['failed']}/{total}] {course_id} {status}", flush=True)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm the ratings cache for many courses")
+    parser.add_argument("course_ids", nargs="*", help="course ids to grade, e.g. CSE2231")
+    parser.add_argument("--catalog", help="file with one course id per line")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--runs-per-minute", type=float, default=20, help="grading runs started per minute (OpenAI/Tavily quota)")
+    parser.add_argument("--checkpoint", default=".precompute_checkpoint.jsonl")
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--force", action="store_true", help="re-grade courses even if checkpointed or cached")
+    parser.add_argument("--refresh", action="store_true", help="re-check cached courses, re-grading only if their evidence changed")
+    parser.add_argument("--refresh-older-than", type=float, metavar="HOURS", help="with --refresh, skip courses checked more recently")
+    args = parser.parse_args()
+
+    course_ids = list(args.course_ids)
+    if args.catalog:
+        course_ids += read_catalog(args.catalog)
+    if not course_ids:
+        parser.error("give course ids or --catalog")
+
+    if args.refresh:
+        counts = asyncio.run(refresh(
+            course_ids,
+            workers=args.workers,
+            runs_per_minute=args.runs_per_minute,
+            retries=args.retries,
+            older_than_hours=args.refresh_older_than,
+        ))
+    else:
+        counts = asyncio.run(precompute(
+            course_ids,
+            workers=args.workers,
+            runs_per_minute=args.runs_per_minute,
+            checkpoint_path=args.checkpoint,
+            retries=args.retries,
+            force=args.force,
+        ))
+    print(json.dumps({**counts, "cache": class_score_cache.stats()}, indent=2))
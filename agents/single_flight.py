@@ -0,0 +1,59 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+class SingleFlight(Generic[T]):
+    """Coalesce concurrent calls for the same key into one in-flight run.
+
+    The first caller for a key starts the run as a task; everyone arriving
+    while it is in flight awaits that same task. Waiters are bounded by
+    ``waiter_timeout`` but the run itself is shielded, so a caller timing out
+    or disconnecting never cancels the work other callers are waiting on.
+    """
+
+    def __init__(self, waiter_timeout: float | None = None):
+        self.waiter_timeout = waiter_timeout
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+
+        self.runs = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Whether a run for this key is currently in flight"""
+        return key in self._in_flight
+
+    def join(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> tuple[asyncio.Task, bool]:
+        """Start fn for key unless a run is in flight; returns the run and whether it was started here"""
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task, False
+        task = asyncio.ensure_future(fn())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        self.runs += 1
+        return task, True
+
+    async def wait(self, task: asyncio.Task, timeout: float | None = None) -> T:
+        """Wait for a run without cancelling it if this waiter gives up"""
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout or self.waiter_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]], timeout: float | None = None) -> T:
+        """Run fn for key, or join the run already in flight for it"""
+        task, _ = self.join(key, fn)
+        return await self.wait(task, timeout)
+
+    def stats(self) -> dict:
+        """How many runs were started and how many duplicates were saved"""
+        return {
+            "runs": self.runs,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "in_flight": len(self._in_flight),
+        }
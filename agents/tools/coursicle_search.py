@@ -0,0 +1,16 @@
+from agents.evidence import SearchSource
+from agents.tools.internet_search import cached_tavily_search
+
+# Course listings: credit hours, descriptions and who teaches it
+coursicle_source = SearchSource(
+    name="coursicle",
+    search=cached_tavily_search,
+    query="{course} Ohio State coursicle",
+    domains=["coursicle.com"],
+    weight=0.8,
+)
+
+coursicle_search = coursicle_source.as_tool(
+    "Search Coursicle for an Ohio State course's listing: credit hours, description and instructors. "
+    "Input is a course id like 'CSE 2331'."
+)
@@ -1,23 +1,36 @@
 from dotenv import load_dotenv
+from langchain_tavily import TavilySearch
 
-load_dotenv()
+from agents.tools.search_cache import CachedSearchTool, search_result_store
+from config import settings
 
-from langchain_tavily import TavilySearch
+def make_tavily_search() -> TavilySearch:
+    """Langchain tool directly, just need the tavily key (checked here, not at import)"""
+    load_dotenv()
+    return TavilySearch(
+        max_results=3,
+        topic="general",
+        include_answer=True,
+        # include_raw_content=False,
+        # include_images=False,
+        # include_image_descriptions=False,
+        # search_depth="basic",
+        # time_range="day",
+        # include_domains=None,
+        # exclude_domains=None
+    )
 
-# Langchain tool directly, just need the tavily key
-basic_tavily_search = TavilySearch(
-    max_results=3,
-    topic="general",
-    include_answer=True,
-    # include_raw_content=False,
-    # include_images=False,
-    # include_image_descriptions=False,
-    # search_depth="basic",
-    # time_range="day",
-    # include_domains=None,
-    # exclude_domains=None
+# What the agent uses: same tool, behind the search result cache. Tavily
+# itself is only built on the first cache miss.
+cached_tavily_search = CachedSearchTool(
+    inner_factory=make_tavily_search,
+    store=search_result_store,
+    offline=settings.search_cache_offline,
+    name=TavilySearch.model_fields["name"].default,
+    description=TavilySearch.model_fields["description"].default,
+    args_schema=TavilySearch.model_fields["args_schema"].default,
 )
 
 if __name__ == "__main__":
     # Basic query example
-    print(basic_tavily_search.invoke({"query": "Who should i bet on in the nba finals this year"}))
\ No newline at end of file
+    print(make_tavily_search().invoke({"query": "Who should i bet on in the nba finals this year"}))
@@ -0,0 +1,16 @@
+from agents.evidence import SearchSource
+from agents.tools.internet_search import cached_tavily_search
+
+# Official catalog entries and syllabi: the most reliable source for content and prerequisites
+osu_source = SearchSource(
+    name="osu",
+    search=cached_tavily_search,
+    query="{course} Ohio State University course syllabus description prerequisites",
+    domains=["osu.edu"],
+    weight=1.2,
+)
+
+osu_search = osu_source.as_tool(
+    "Search official Ohio State (osu.edu) pages such as catalog entries and syllabi for a course. "
+    "Input is a course id like 'CSE 2331'."
+)
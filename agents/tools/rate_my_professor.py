@@ -0,0 +1,16 @@
+from agents.evidence import SearchSource
+from agents.tools.internet_search import cached_tavily_search
+
+# Reviews of the course's instructors, which often describe exams and workload
+rate_my_professor_source = SearchSource(
+    name="rate_my_professor",
+    search=cached_tavily_search,
+    query="{course} Ohio State professor reviews",
+    domains=["ratemyprofessors.com"],
+    weight=0.9,
+)
+
+rate_my_professor_search = rate_my_professor_source.as_tool(
+    "Search RateMyProfessors for reviews of the instructors who teach an Ohio State course. "
+    "Input is a course id like 'CSE 2331'."
+)
@@ -0,0 +1,16 @@
+from agents.evidence import SearchSource
+from agents.tools.internet_search import cached_tavily_search
+
+# Student discussion of workload and difficulty
+reddit_source = SearchSource(
+    name="reddit",
+    search=cached_tavily_search,
+    query="{course} Ohio State OSU difficulty workload reddit",
+    domains=["reddit.com"],
+    weight=1.0,
+)
+
+reddit_search = reddit_source.as_tool(
+    "Search Reddit (mostly r/OSU) for student discussion of a course's difficulty and workload. "
+    "Input is a course id like 'CSE 2331'."
+)
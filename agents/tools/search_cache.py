@@ -0,0 +1,210 @@
+import asyncio
+import contextvars
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from langchain_core.tools import BaseTool
+
+from config import settings
+
+def normalize_query(query: str) -> str:
+    """Case-, punctuation- and spacing-insensitive form of a search query.
+
+    Word order and repeated words are kept, since they change what the search
+    returns. Course numbers split from their subject, so "CSE-2331 OSU
+    syllabus" and "cse2331  osu Syllabus" both normalize to
+    "cse 2331 osu syllabus".
+    """
+    return " ".join(re.findall(r"[a-z]+|\d+", query.lower()))
+
+def cache_key(args: dict) -> str:
+    """Cache key for a tool call: the normalized query plus any other arguments"""
+    extra = {k: v for k, v in args.items() if k != "query" and v is not None}
+    return json.dumps([normalize_query(args.get("query", "")), extra], sort_keys=True, default=str)
+
+class SearchResultStore:
+    """SQLite-backed store of search results with a per-store TTL"""
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_results (
+                    cache_key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    stored_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT result, stored_at FROM search_results WHERE cache_key = ?", (key,)
+            ).fetchone()
+        if row is None or (self.ttl and row[1] + self.ttl <= time.time()):
+            return None
+        return json.loads(row[0])
+
+    def put(self, key: str, result: Any) -> None:
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO search_results VALUES (?, ?, ?)",
+                (key, json.dumps(result, default=str), time.time()),
+            )
+            self._db().commit()
+
+search_result_store = SearchResultStore(settings.search_cache_path, ttl=settings.search_cache_ttl_seconds)
+
+# Results already fetched during the current grading run, keyed by cache_key
+_run_results: contextvars.ContextVar[dict | None] = contextvars.ContextVar("search_run_results", default=None)
+
+@contextmanager
+def search_run_scope():
+    """Dedup identical queries issued within one grading run.
+
+    Open it around the whole graph run: the nodes run in copies of the
+    caller's context, so retrieval and the agent then share one set of results.
+    """
+    token = _run_results.set({})
+    try:
+        yield
+    finally:
+        _run_results.reset(token)
+
+# Set while refreshing: skip stored results (but still store what comes back)
+_fresh: contextvars.ContextVar[bool] = contextvars.ContextVar("search_fresh", default=False)
+
+@contextmanager
+def fresh_search_scope():
+    """Fetch live results for searches made inside, refreshing the store"""
+    token = _fresh.set(True)
+    try:
+        yield
+    finally:
+        _fresh.reset(token)
+
+class CachedSearchTool(BaseTool):
+    """Wraps a search tool with query normalization, a disk cache and per-run dedup.
+
+    Exposes the wrapped tool's name, description and argument schema, so the
+    agent sees the same tool. With ``offline`` set, misses return an empty
+    result instead of calling the network, which lets runs replay a recorded
+    store. Given ``inner_factory`` instead of ``inner``, the wrapped tool is
+    built on the first miss (name, description and args_schema must then be
+    passed explicitly), so a missing API key only matters once a search is made.
+    """
+
+    inner: Optional[BaseTool] = None
+    inner_factory: Optional[Callable[[], BaseTool]] = None
+    store: SearchResultStore
+    offline: bool = False
+
+    hits: int = 0
+    misses: int = 0
+    run_dedups: int = 0
+
+    def __init__(
+        self,
+        inner: Optional[BaseTool] = None,
+        store: Optional[SearchResultStore] = None,
+        offline: bool = False,
+        inner_factory: Optional[Callable[[], BaseTool]] = None,
+        **kwargs,
+    ):
+        if inner is not None:
+            kwargs = {"name": inner.name, "description": inner.description, "args_schema": inner.args_schema, **kwargs}
+        super().__init__(inner=inner, inner_factory=inner_factory, store=store, offline=offline, **kwargs)
+
+    def upstream(self) -> BaseTool:
+        """The wrapped tool, built now if it was given as a factory"""
+        if self.inner is None:
+            self.inner = self.inner_factory()
+        return self.inner
+
+    def _miss_result(self, args: dict) -> dict:
+        return {"query": args.get("query"), "results": [], "error": "offline: no recorded result for this query"}
+
+    def _run(self, run_manager: Optional[CallbackManagerForToolRun] = None, **kwargs) -> Any:
+        key = cache_key(kwargs)
+        seen = _run_results.get()
+        if seen is not None and key in seen and not asyncio.isfuture(seen[key]):
+            self.run_dedups += 1
+            return seen[key]
+
+        result = None if _fresh.get() else self.store.get(key)
+        if result is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            if self.offline:
+                return self._miss_result(kwargs)
+            result = self.upstream().invoke(kwargs)
+            if not (isinstance(result, dict) and "error" in result):
+                self.store.put(key, result)
+
+        if seen is not None:
+            seen[key] = result
+        return result
+
+    async def _arun(self, run_manager: Optional[AsyncCallbackManagerForToolRun] = None, **kwargs) -> Any:
+        key = cache_key(kwargs)
+        seen = _run_results.get()
+        if seen is not None and key in seen:
+            self.run_dedups += 1
+            # Parallel tool calls for the same query share one future
+            return await seen[key] if asyncio.isfuture(seen[key]) else seen[key]
+
+        future = asyncio.get_running_loop().create_future()
+        if seen is not None:
+            seen[key] = future
+        try:
+            result = None if _fresh.get() else await asyncio.to_thread(self.store.get, key)
+            if result is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                if self.offline:
+                    result = self._miss_result(kwargs)
+                else:
+                    result = await self.upstream().ainvoke(kwargs)
+                    if not (isinstance(result, dict) and "error" in result):
+                        await asyncio.to_thread(self.store.put, key, result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            if seen is not None:
+                seen.pop(key, None)
+            future.cancel()
+            raise
+        except Exception as e:
+            if seen is not None:
+                seen.pop(key, None)
+            future.set_exception(e)
+            # Nobody else may be waiting on the future; mark its exception retrieved
+            future.exception()
+            raise
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "run_dedups": self.run_dedups,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
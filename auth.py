@@ -0,0 +1,154 @@
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import bcrypt
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError, jwt
+
+from config import settings
+from metrics import password_hash_duration, registry, stats_metrics
+from models import Token, User
+
+class HasherBusy(Exception):
+    """Raised when too many password hashes are already queued"""
+
+class PasswordHasher:
+    """bcrypt on its own small thread pool, so it never runs on the event loop.
+
+    bcrypt releases the GIL, so ``workers`` hashes really run in parallel;
+    the pool is separate from the default executor, so a login burst can't
+    starve the cache and database work that uses asyncio.to_thread. Past
+    ``workers + max_waiting`` pending calls, new ones raise HasherBusy.
+    """
+
+    def __init__(self, workers: int, max_waiting: int, rounds: int):
+        self.workers = workers
+        self.max_waiting = max_waiting
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+        self.rejected = 0
+        # Checked against when the user doesn't exist, so both cases take as long
+        self._dummy_hash: Optional[str] = None
+
+    async def _run(self, operation: str, fn: Callable, *args):
+        if self._pending >= self.workers + self.max_waiting:
+            self.rejected += 1
+            raise HasherBusy("Too many logins in progress, try again shortly")
+        self._pending += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+            password_hash_duration.observe(time.perf_counter() - start, operation=operation)
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run("hash", lambda: bcrypt.hashpw(password.encode(), bcrypt.gensalt(self.rounds)))
+        return hashed.decode()
+
+    async def verify(self, password: str, hashed: Optional[str]) -> bool:
+        """Whether password matches; a missing hash still costs one check"""
+        if hashed is None and self._dummy_hash is None:
+            self._dummy_hash = await self.hash("")
+        target = (hashed or self._dummy_hash).encode()
+        matches = await self._run("verify", bcrypt.checkpw, password.encode(), target)
+        return matches and hashed is not None
+
+    def stats(self) -> dict:
+        return {"pending": self._pending, "workers": self.workers, "rejected": self.rejected}
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_waiting=settings.password_hash_max_waiting,
+    rounds=settings.bcrypt_rounds,
+)
+
+# =======================
+# TOKENS
+# =======================
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    id: int
+    username: str
+    expires_at: float
+
+class InvalidToken(Exception):
+    """Raised for tokens that are malformed, forged or expired"""
+
+class VerifiedTokenCache:
+    """LRU of tokens whose signature already checked out, until they expire"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._tokens: OrderedDict[str, AuthenticatedUser] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[AuthenticatedUser]:
+        user = self._tokens.get(token)
+        if user is not None and user.expires_at <= time.time():
+            del self._tokens[token]
+            user = None
+        if user is None:
+            self.misses += 1
+            return None
+        self._tokens.move_to_end(token)
+        self.hits += 1
+        return user
+
+    def put(self, token: str, user: AuthenticatedUser) -> None:
+        self._tokens[token] = user
+        self._tokens.move_to_end(token)
+        while len(self._tokens) > self.max_entries:
+            self._tokens.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._tokens)}
+
+verified_tokens = VerifiedTokenCache(settings.token_cache_size)
+
+def create_access_token(user: User) -> Token:
+    expires_at = int(time.time()) + settings.access_token_expire_minutes * 60
+    claims = {"sub": str(user.id), "username": user.username, "exp": expires_at}
+    return Token(access_token=jwt.encode(claims, settings.secret_key, algorithm=settings.algorithm))
+
+def verify_token(token: str) -> AuthenticatedUser:
+    """The user a token was issued to; raises InvalidToken"""
+    user = verified_tokens.get(token)
+    if user is not None:
+        return user
+    try:
+        claims = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        user = AuthenticatedUser(int(claims["sub"]), claims.get("username", ""), float(claims["exp"]))
+    except (JWTError, KeyError, ValueError) as e:
+        raise InvalidToken(str(e)) from e
+    verified_tokens.put(token, user)
+    return user
+
+_bearer = HTTPBearer(auto_error=False)
+
+async def current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer)) -> AuthenticatedUser:
+    """Dependency for routes that need a signed-in user"""
+    unauthorized = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Not authenticated",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    if credentials is None:
+        raise unauthorized
+    try:
+        return verify_token(credentials.credentials)
+    except InvalidToken:
+        raise unauthorized
+
+registry.collector(lambda: [
+    *stats_metrics("password_hasher", "Password hashing pool", password_hasher.stats(), counters=("rejected",)),
+    *stats_metrics("verified_tokens", "Verified access token cache", verified_tokens.stats(), counters=("hits", "misses")),
+])
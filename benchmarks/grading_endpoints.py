@@ -0,0 +1,140 @@
+"""Offline load test of the ratings, compare and schedule endpoints.
+
+The OpenAI model and Tavily search are replaced by stand-ins
+(benchmarks/stand_ins.py) with seeded lognormal latencies, and every
+database and cache points at a throwaway directory, so this runs on a
+laptop with no network or API keys. Each scenario sends --requests
+requests to main.app through httpx.ASGITransport with --concurrency in
+flight, then reports throughput, latency percentiles and how many agent
+runs and upstream searches it triggered.
+
+    python -m benchmarks.grading_endpoints --concurrency 16 --llm-latency 0.5 --search-latency 0.3
+    python -m benchmarks.grading_endpoints --warm   # request path only, every course cached
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+_scratch = tempfile.mkdtemp(prefix="grading_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_scratch}/app.db"
+os.environ["CLASS_SCORE_CACHE_URL"] = f"sqlite:///{_scratch}/class_scores.db"
+os.environ["SEARCH_CACHE_PATH"] = f"{_scratch}/search.db"
+os.environ["SEARCH_CACHE_OFFLINE"] = "false"
+
+import httpx
+
+from benchmarks.schedule_solver import PATTERNS, section
+from benchmarks.stand_ins import Latency, install, summarize
+from agents.grading_service import grade_courses, rating_flights
+from main import app, lifespan
+
+SUBJECTS = ["CSE", "MATH", "STAT", "PHYSICS", "ECE"]
+
+def course_pool(size: int, rng: random.Random) -> list[str]:
+    ids = set()
+    while len(ids) < size:
+        ids.add(f"{rng.choice(SUBJECTS)} {rng.randint(1, 5)}{rng.randint(100, 999)}")
+    return sorted(ids)
+
+def scenarios(pool: list[str], rng: random.Random, batch: int) -> dict:
+    """name -> factory of (method, url, json body) for one request"""
+    hourly = list(range(8 * 60, 19 * 60, 60))
+
+    def ratings():
+        return "GET", f"/courses/ratings/{rng.choice(pool)}", None
+
+    def compare():
+        courses = rng.sample(pool, batch)
+        return "POST", "/courses/compare", {"courses": [{"courseId": c} for c in courses]}
+
+    def schedule_load():
+        return "POST", "/courses/schedule-load", {"courseIds": rng.sample(pool, batch)}
+
+    def schedule_options():
+        courses = rng.sample(pool, batch)
+        sections = {
+            c: [section(f"{j:04d}", rng.choice(PATTERNS), rng.choice(hourly)).model_dump() for j in range(4)]
+            for c in courses
+        }
+        return "POST", "/courses/schedule-options", {
+            "courseIds": courses, "sections": sections, "constraints": {"maxCredits": 18}, "topK": 5,
+        }
+
+    def saved_schedules():
+        user = f"bench{rng.randrange(50)}"
+        if rng.random() < 0.2:
+            body = {"name": f"Plan {rng.randrange(3)}", "items": [{"courseId": c} for c in rng.sample(pool, batch)]}
+            return "PUT", f"/schedule/save/{user}", body
+        return "GET", f"/schedule/{user}", None
+
+    return {
+        "ratings": ratings,
+        "compare": compare,
+        "schedule-load": schedule_load,
+        "schedule-options": schedule_options,
+        "saved-schedules": saved_schedules,
+    }
+
+async def run(client: httpx.AsyncClient, make_request, requests: int, concurrency: int) -> tuple:
+    """Closed loop: `concurrency` workers issue `requests` requests between them"""
+    latencies, errors = [], 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            method, url, body = make_request()
+            start = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+async def main(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    model, search = install(
+        Latency(args.llm_latency, args.sigma, seed=args.seed),
+        Latency(args.search_latency, args.sigma, seed=args.seed + 1),
+        searches=args.searches,
+    )
+    pool = course_pool(args.courses, rng)
+    selected = scenarios(pool, rng, args.batch)
+    if args.only:
+        selected = {name: selected[name] for name in args.only}
+
+    async with lifespan(app):
+        if args.warm:
+            await grade_courses(pool)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            print(f"{len(pool)} courses, {args.requests} requests per scenario, concurrency={args.concurrency}")
+            for name, make_request in selected.items():
+                runs, searches = rating_flights.runs, search.calls
+                latencies, errors, elapsed = await run(client, make_request, args.requests, args.concurrency)
+                print(
+                    f"{name:<17} {len(latencies) / elapsed:8.1f} req/s  {summarize(latencies)}  "
+                    f"errors={errors} agent_runs={rating_flights.runs - runs} searches={search.calls - searches}"
+                )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--courses", type=int, default=60, help="size of the course id pool")
+    parser.add_argument("--batch", type=int, default=5, help="courses per compare/schedule request")
+    parser.add_argument("--llm-latency", type=float, default=0.4, help="median seconds per model call")
+    parser.add_argument("--search-latency", type=float, default=0.3, help="median seconds per search")
+    parser.add_argument("--sigma", type=float, default=0.5, help="lognormal spread of stand-in latencies (0 = fixed)")
+    parser.add_argument("--searches", type=int, default=2, help="search turns per agent run")
+    parser.add_argument("--warm", action="store_true", help="grade every course before measuring")
+    parser.add_argument("--only", nargs="+", choices=["ratings", "compare", "schedule-load", "schedule-options", "saved-schedules"])
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,113 @@
+"""Load test: /health latency while N cold ratings lookups are in flight.
+
+The grading agent is replaced by a stand-in that waits ``--agent-latency``
+seconds, and the evidence sources by ones that find nothing (so every run
+goes to the agent), so no OpenAI/Tavily credits are spent and nothing
+touches the network. Caches and databases live in a throwaway directory.
+``--blocking`` makes the stand-in sleep synchronously, reproducing the old
+behaviour where the agent run held the event loop.
+
+    python -m benchmarks.health_under_load --ratings 32 --agent-latency 2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+_scratch = tempfile.mkdtemp(prefix="health_bench_")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-benchmark")
+os.environ.setdefault("CLASS_SCORE_CACHE_URL", "sqlite://")
+os.environ["DATABASE_URL"] = f"sqlite:///{_scratch}/app.db"
+os.environ["SEARCH_CACHE_PATH"] = f"{_scratch}/search.db"
+
+import httpx
+
+from agents import class_grading_agent
+from agents.class_grading_agent import ClassScore
+from benchmarks.stand_ins import percentile
+from main import app
+
+class StandInAgent:
+    """Replaces the ReAct agent with a fixed-latency canned answer"""
+
+    def __init__(self, latency: float, blocking: bool):
+        self.latency = latency
+        self.blocking = blocking
+
+    async def astream(self, inputs, **kwargs):
+        if self.blocking:
+            time.sleep(self.latency)
+        else:
+            await asyncio.sleep(self.latency)
+        yield {
+            "generate_structured_response": {
+                "structured_response": ClassScore(
+                    score=50, ch=3, summary="stand-in", time_load=3.0, pre_reqs=[], co_reqs=[]
+                ),
+            }
+        }
+
+class NoEvidence:
+    """Evidence source that answers at once with nothing"""
+
+    weight = 1.0
+
+    def __init__(self, name: str):
+        self.name = name
+
+    async def fetch(self, course_id: str) -> list:
+        return []
+
+async def probe_health(client: httpx.AsyncClient, duration: float, interval: float) -> list[float]:
+    """Hit /health on a fixed schedule for duration seconds, returning latencies in ms.
+
+    Latency is measured from when each probe was due, so time spent waiting
+    for a blocked event loop counts against the probe.
+    """
+    latencies = []
+    start = time.perf_counter()
+    due = start
+    while due < start + duration:
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        response = await client.get("/health")
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - due) * 1000)
+        due = max(due + interval, time.perf_counter() - interval)
+    return latencies
+
+def report(label: str, latencies: list[float]) -> None:
+    print(
+        f"{label:<22} n={len(latencies):<5} "
+        f"p50={statistics.median(latencies):7.2f}ms "
+        f"p99={percentile(latencies, 99):7.2f}ms "
+        f"max={max(latencies):7.2f}ms"
+    )
+
+async def main(args: argparse.Namespace) -> None:
+    class_grading_agent.agent = StandInAgent(args.agent_latency, args.blocking)
+    class_grading_agent.evidence_sources = [NoEvidence(source.name) for source in class_grading_agent.evidence_sources]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        report("/health idle", await probe_health(client, args.duration, args.interval))
+
+        ratings = [
+            asyncio.create_task(client.get(f"/courses/ratings/BENCH{i:04d}"))
+            for i in range(args.ratings)
+        ]
+        await asyncio.sleep(0)
+        report(f"/health +{args.ratings} ratings", await probe_health(client, args.duration, args.interval))
+
+        responses = await asyncio.gather(*ratings)
+        print(f"ratings completed: {sum(r.status_code == 200 for r in responses)}/{len(responses)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ratings", type=int, default=32, help="cold ratings lookups kept in flight")
+    parser.add_argument("--agent-latency", type=float, default=2.0, help="seconds per stand-in agent run")
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds to probe /health for")
+    parser.add_argument("--interval", type=float, default=0.01, help="pause between /health probes")
+    parser.add_argument("--blocking", action="store_true", help="simulate the old event-loop-blocking agent")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,85 @@
+"""Latency of other routes while a burst of logins is being checked.
+
+Registers one user, then fires --logins concurrent POST /users/login
+requests while another task polls GET /health and GET /users/me, all
+through httpx.ASGITransport. With --inline, bcrypt runs on the event loop
+instead of the hashing pool, for comparison.
+
+    python -m benchmarks.login_burst --logins 64
+    python -m benchmarks.login_burst --logins 64 --inline
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-benchmark")
+os.environ.setdefault("CLASS_SCORE_CACHE_URL", "sqlite://")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+import httpx
+
+from auth import password_hasher
+from benchmarks.stand_ins import summarize
+from main import app
+
+def run_inline() -> None:
+    """Make the pool call bcrypt on the event loop, as a synchronous hasher would"""
+    async def inline(operation, fn, *args):
+        return fn(*args)
+    password_hasher._run = inline
+
+async def poll(client: httpx.AsyncClient, path: str, headers: dict, stop: asyncio.Event) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+        await asyncio.sleep(0.005)
+    return latencies
+
+async def main(args: argparse.Namespace) -> None:
+    if args.inline:
+        run_inline()
+    password_hasher.max_waiting = max(password_hasher.max_waiting, args.logins)
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post(
+            "/users/register", json={"username": "bench", "email": "bench@example.com", "password": "hunter22"}
+        )
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        idle = {}
+        for path in ("/health", "/users/me"):
+            stop = asyncio.Event()
+            task = asyncio.create_task(poll(client, path, headers, stop))
+            await asyncio.sleep(0.5)
+            stop.set()
+            idle[path] = await task
+
+        stop = asyncio.Event()
+        pollers = {path: asyncio.create_task(poll(client, path, headers, stop)) for path in ("/health", "/users/me")}
+        start = time.perf_counter()
+        logins = await asyncio.gather(*(
+            client.post("/users/login", json={"username_or_email": "bench", "password": "hunter22"})
+            for _ in range(args.logins)
+        ))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        busy = {path: await task for path, task in pollers.items()}
+
+    print(f"{args.logins} logins ({'inline' if args.inline else f'{password_hasher.workers} hashing threads'}) "
+          f"in {elapsed:.2f}s, statuses {sorted({r.status_code for r in logins})}")
+    for path in idle:
+        print(f"{path:<10} idle         {len(idle[path]):5} requests {summarize(idle[path])}")
+        print(f"{path:<10} during burst {len(busy[path]):5} requests {summarize(busy[path])}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--inline", action="store_true", help="run bcrypt on the event loop")
+    asyncio.run(main(parser.parse_args()))
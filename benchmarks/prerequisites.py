@@ -0,0 +1,75 @@
+"""Cost of the prerequisite graph at catalog scale.
+
+Builds a synthetic --courses catalog where every course requires one to
+three lower-numbered courses (some clauses with alternatives), then times
+the closure rebuild, schedule validation (what PUT /schedule/save runs when
+completedCourses is given) and unlock queries.
+
+    python -m benchmarks.prerequisites --courses 10000
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("CLASS_SCORE_CACHE_URL", "sqlite://")
+
+from agents.class_score import ClassScore
+from benchmarks.stand_ins import summarize
+from course_identity import parse_course_id
+from prerequisites import PrerequisiteGraph
+
+SUBJECTS = ["CSE", "MATH", "STAT", "PHYSICS", "ECE", "ECON", "CHEM", "BIOLOGY"]
+
+def catalog(courses: int, rng: random.Random) -> list[tuple]:
+    ids = sorted({f"{rng.choice(SUBJECTS)} {rng.randint(1000, 7999)}" for _ in range(courses * 2)})[:courses]
+    ids.sort(key=lambda c: c.split()[1])
+    rated = []
+    for i, course_id in enumerate(ids):
+        earlier = ids[max(0, i - 400):i]
+        pre_reqs = []
+        for _ in range(rng.randint(1, 3) if earlier else 0):
+            options = rng.sample(earlier, min(len(earlier), rng.choice([1, 1, 2])))
+            pre_reqs.append(" or ".join(options))
+        score = ClassScore(score=50, ch=3, summary="", time_load=3, pre_reqs=pre_reqs, co_reqs=[])
+        rated.append((parse_course_id(course_id), score))
+    return rated
+
+def timed(fn, runs: int) -> list[float]:
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def main(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    rated = catalog(args.courses, rng)
+    graph = PrerequisiteGraph(None)
+
+    start = time.perf_counter()
+    graph.load(rated)
+    print(f"{graph.stats()['courses']} courses parsed in {(time.perf_counter() - start) * 1000:.1f}ms")
+    start = time.perf_counter()
+    graph.refresh()
+    print(f"closure built in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    ids = [str(course) for course, _ in rated]
+    half = len(ids) // 2
+
+    def validate():
+        graph.unmet(rng.sample(ids[half:], 6), rng.sample(ids[:half], 30))
+
+    def unlocks():
+        graph.unlocks(rated[rng.randrange(half)][0], rng.sample(ids[:half], 30))
+
+    print(f"{'validate 6 courses':<20} {summarize(timed(validate, args.queries))}")
+    print(f"{'unlocks':<20} {summarize(timed(unlocks, args.queries))}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--courses", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    main(parser.parse_args())
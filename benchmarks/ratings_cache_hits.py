@@ -0,0 +1,75 @@
+"""Requests/sec for /courses/ratings/{courseId} when every lookup is a cache hit.
+
+Seeds the class score cache with --courses scores (with realistic evidence
+snippets and tags) and replays ratings requests in-process through
+httpx.ASGITransport, so the numbers measure the app's own per-request cost:
+routing, cache lookup, serialization and compression.
+
+    python -m benchmarks.ratings_cache_hits --requests 5000 --concurrency 1 16
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-benchmark")
+os.environ.setdefault("CLASS_SCORE_CACHE_URL", "sqlite://")
+
+import httpx
+
+from agents.class_score import ClassScore
+from agents.class_score_cache import class_score_cache
+from main import app
+
+def seed(courses: int) -> list[str]:
+    ids = [f"CSE {3000 + i}" for i in range(courses)]
+    for course_id in ids:
+        class_score_cache.put(course_id, ClassScore(
+            score=random.randint(20, 90), ch=3, summary="Benchmark course " * 8,
+            time_load=random.uniform(2, 8), rigor=random.randint(10, 95),
+            assessment_intensity=50, project_intensity=50, pace=50,
+            pre_reqs=["CSE 2221", "CSE 2231"], co_reqs=[],
+            tags=["algorithms", "proofs", "projects", "time-consuming"],
+            evidence_snippets=["Student forum: " + "the weekly labs take a while. " * 12] * 4,
+            confidence=0.8,
+        ))
+    return ids
+
+async def run(client: httpx.AsyncClient, ids: list[str], requests: int, concurrency: int, encoding: str) -> float:
+    """Issue `requests` ratings GETs with `concurrency` in flight; returns requests/sec"""
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            response = await client.get(f"/courses/ratings/{random.choice(ids)}", headers={"Accept-Encoding": encoding})
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - start)
+
+async def main(args: argparse.Namespace) -> None:
+    ids = seed(args.courses)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await run(client, ids, 200, 1, args.encoding)  # warm-up
+        sample = await client.get(f"/courses/ratings/{ids[0]}", headers={"Accept-Encoding": args.encoding})
+        print(
+            f"response: {sample.num_bytes_downloaded} bytes on the wire, "
+            f"content-encoding={sample.headers.get('content-encoding', 'identity')}"
+        )
+        for concurrency in args.concurrency:
+            rate = await run(client, ids, args.requests, concurrency, args.encoding)
+            print(f"concurrency={concurrency:<4} {rate:8.0f} requests/sec")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--courses", type=int, default=200, help="courses seeded into the cache")
+    parser.add_argument("--requests", type=int, default=5000, help="requests per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--encoding", default="gzip", help="Accept-Encoding to send (gzip or identity)")
+    asyncio.run(main(parser.parse_args()))
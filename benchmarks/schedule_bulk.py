@@ -0,0 +1,87 @@
+"""Bulk schedule writes and reads against their one-at-a-time equivalents.
+
+Against a throwaway SQLite database, times saving --batch schedules for
+--batch different users with save_schedule in a loop versus one
+save_schedules call, reading those users' favorites one by one versus
+get_favorite_schedules, and, for one user with --schedules schedules,
+list_schedules versus walking list_schedules_page --page at a time.
+
+    python -m benchmarks.schedule_bulk --batch 500 --schedules 2000 --page 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/schedule_bulk.db"
+
+import crud
+from database import async_session, engine, init_db
+from models import ScheduleItem, SchedulePayload
+
+COURSES = [f"CSE {n}" for n in range(1111, 5999, 37)]
+
+def payload(name: str, favorite: bool) -> SchedulePayload:
+    return SchedulePayload(
+        name=name,
+        items=[ScheduleItem(courseId=c, sectionId="0010") for c in random.sample(COURSES, 6)],
+        favorite=favorite,
+    )
+
+async def timed(label: str, fn) -> None:
+    async with async_session() as session:
+        start = time.perf_counter()
+        await fn(session)
+        print(f"{label:<44} {(time.perf_counter() - start) * 1000:9.1f}ms")
+
+async def main(args: argparse.Namespace) -> None:
+    await init_db()
+    users = [f"student{i}" for i in range(args.batch)]
+
+    async def one_by_one(session):
+        for user_id in users:
+            await crud.save_schedule(session, user_id, payload("Fall", True))
+
+    async def batched(session):
+        await crud.save_schedules(session, [(user_id, payload("Spring", True)) for user_id in users])
+
+    async def favorites_one_by_one(session):
+        for user_id in users:
+            await crud.get_favorite_schedule(session, user_id)
+
+    async def favorites_batched(session):
+        await crud.get_favorite_schedules(session, users)
+
+    await timed(f"save_schedule x{args.batch}", one_by_one)
+    await timed(f"save_schedules, {args.batch} entries", batched)
+    await timed("save_schedules again (all updates)", batched)
+    await timed(f"get_favorite_schedule x{args.batch}", favorites_one_by_one)
+    await timed(f"get_favorite_schedules, {args.batch} users", favorites_batched)
+
+    async with async_session() as session:
+        await crud.save_schedules(session, [("advisee", payload(f"Plan {i}", False)) for i in range(args.schedules)])
+
+    async def whole_list(session):
+        await crud.list_schedules(session, "advisee")
+
+    async def first_page(session):
+        await crud.list_schedules_page(session, "advisee", args.page)
+
+    async def every_page(session):
+        _, cursor = await crud.list_schedules_page(session, "advisee", args.page)
+        while cursor is not None:
+            _, cursor = await crud.list_schedules_page(session, "advisee", args.page, cursor)
+
+    await timed(f"list_schedules, {args.schedules} schedules", whole_list)
+    await timed(f"list_schedules_page, first {args.page}", first_page)
+    await timed(f"list_schedules_page, all pages", every_page)
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=500, help="users in the bulk save/read")
+    parser.add_argument("--schedules", type=int, default=2000, help="schedules for the paginated user")
+    parser.add_argument("--page", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,68 @@
+"""Throughput of per-user schedule reads against the async data layer.
+
+Seeds a throwaway SQLite database with --users users, each holding
+--schedules schedules of --items items, then reads random users' schedules
+through crud.list_schedules at several concurrency levels.
+
+    python -m benchmarks.schedule_reads --users 1000 --schedules 5 --items 6
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/schedule_reads.db"
+
+import crud
+from database import async_session, engine, init_db
+from models import ScheduleItem, SchedulePayload
+
+COURSES = [f"CSE {n}" for n in range(1111, 5999, 37)]
+
+async def seed(users: int, schedules: int, items: int) -> None:
+    async with async_session() as session:
+        for u in range(users):
+            for s in range(schedules):
+                body = SchedulePayload(
+                    name=f"Plan {s}",
+                    items=[ScheduleItem(courseId=c, sectionId="0010") for c in random.sample(COURSES, items)],
+                    favorite=s == 0,
+                )
+                await crud.add_schedule(session, f"user{u}", body)
+
+async def read_load(users: int, concurrency: int, reads: int) -> float:
+    """Run `reads` list_schedules calls with `concurrency` in flight; returns reads/sec"""
+    remaining = reads
+
+    async def reader() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            async with async_session() as session:
+                schedules = await crud.list_schedules(session, f"user{random.randrange(users)}")
+                assert schedules
+
+    start = time.perf_counter()
+    await asyncio.gather(*(reader() for _ in range(concurrency)))
+    return reads / (time.perf_counter() - start)
+
+async def main(args: argparse.Namespace) -> None:
+    await init_db()
+    start = time.perf_counter()
+    await seed(args.users, args.schedules, args.items)
+    print(f"seeded {args.users * args.schedules} schedules in {time.perf_counter() - start:.1f}s")
+    for concurrency in args.concurrency:
+        rate = await read_load(args.users, concurrency, args.reads)
+        print(f"concurrency={concurrency:<4} {rate:8.0f} schedule reads/sec")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--schedules", type=int, default=5, help="schedules per user")
+    parser.add_argument("--items", type=int, default=6, help="items per schedule")
+    parser.add_argument("--reads", type=int, default=5000, help="reads per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    asyncio.run(main(parser.parse_args()))
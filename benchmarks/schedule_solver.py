@@ -0,0 +1,70 @@
+"""Worst-case timings for schedule_solver.solve_schedules.
+
+Each scenario builds synthetic courses and sections and reports the best
+time over --repeat runs.
+
+    python -m benchmarks.schedule_solver
+"""
+import argparse
+import random
+import time
+
+from agents.class_score import ClassScore
+from models import SectionMeeting, SectionOption
+from schedule_solver import solve_schedules
+
+PATTERNS = ["MWF", "TR", "MW", "WF", "MTWR"]
+
+def course_score(rng: random.Random) -> ClassScore:
+    return ClassScore(
+        score=rng.randint(20, 90), ch=3, summary="", time_load=rng.uniform(2, 7),
+        rigor=rng.randint(10, 95), pre_reqs=[], co_reqs=[],
+    )
+
+def section(section_id: str, days: str, start: int, length: int = 55) -> SectionOption:
+    begin = f"{start // 60:02d}:{start % 60:02d}"
+    end = f"{(start + length) // 60:02d}:{(start + length) % 60:02d}"
+    return SectionOption(sectionId=section_id, meetings=[SectionMeeting(day=d, start=begin, end=end) for d in days])
+
+def random_catalog(rng: random.Random, courses: int, sections: int, slots: list[int]) -> tuple:
+    ids = [f"CSE {3000 + i}" for i in range(courses)]
+    sections_by_course = {
+        course_id: [section(f"{j:04d}", rng.choice(PATTERNS), rng.choice(slots)) for j in range(sections)]
+        for course_id in ids
+    }
+    return ids, {course_id: course_score(rng) for course_id in ids}, sections_by_course
+
+def scenarios(rng: random.Random) -> dict:
+    hourly = list(range(8 * 60, 20 * 60, 60))
+    return {
+        # Typical registration request: random meeting times
+        "12 courses x 5 sections, random times": (*random_catalog(rng, 12, 5, hourly), {"maxCredits": 36}),
+        # Many slots, few conflicts: the largest feasible space
+        "10 courses x 4 sections, sparse times": (
+            *random_catalog(rng, 10, 4, list(range(7 * 60, 22 * 60, 15))), {"maxCredits": 30}
+        ),
+        # Everything overlaps: conflicts must prune almost every branch
+        "12 courses x 6 sections, 3 time slots": (*random_catalog(rng, 12, 6, hourly[:3]), {}),
+        # Optional courses under a credit cap: subset choice on top of sections
+        "16 optional courses x 4 sections, 18 credit cap": (
+            *random_catalog(rng, 16, 4, hourly), {"maxCredits": 18, "required": ["CSE 3000"]}
+        ),
+        "12 courses x 5 sections, no Fridays": (*random_catalog(rng, 12, 5, hourly), {"noFri": True, "maxCredits": 36}),
+    }
+
+def main(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    for name, (ids, scores, sections, constraints) in scenarios(rng).items():
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            options = solve_schedules(ids, scores, sections, constraints, top_k=args.top_k)
+            timings.append(time.perf_counter() - start)
+        print(f"{name:<50} {min(timings) * 1000:8.1f}ms  {len(options)} schedules")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
@@ -0,0 +1,109 @@
+"""Query latency of the similar-course index at catalog scale.
+
+Seeds the ratings cache with --courses synthetic scores, then times the
+initial index build, incremental adds, direct index queries with and
+without filters, and GET /courses/similar/{courseId} end to end through
+httpx.ASGITransport.
+
+    python -m benchmarks.similar_courses --courses 10000 --queries 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-benchmark")
+os.environ.setdefault("CLASS_SCORE_CACHE_URL", "sqlite://")
+
+import httpx
+
+from agents.class_score import ClassScore
+from agents.class_score_cache import class_score_cache
+from benchmarks.stand_ins import summarize
+from courses_router import _indexed_scores
+from main import app
+from similar_courses import similar_courses
+
+SUBJECTS = ["CSE", "MATH", "STAT", "PHYSICS", "ECE", "ECON", "ENGLISH", "HISTORY", "CHEM", "BIOLOGY"]
+TAGS = [
+    "math-heavy", "project-based", "proofs", "memorization", "time-consuming", "well-taught", "group-work",
+    "writing-intensive", "lab", "curved", "online-homework", "coding", "reading-heavy", "discussion",
+]
+WORDS = "exams projects homework lectures proofs labs essays quizzes readings weekly midterm final curve".split()
+
+def synthetic_score(rng: random.Random) -> ClassScore:
+    level = rng.randint(1, 5)
+    return ClassScore(
+        score=min(100, rng.randint(5, 40) + level * 12),
+        ch=rng.choice([2, 3, 3, 4]),
+        summary=" ".join(rng.choices(WORDS, k=12)),
+        time_load=round(min(8.0, rng.uniform(1, 3) + level * 0.8), 1),
+        rigor=min(100, rng.randint(0, 40) + level * 12),
+        assessment_intensity=rng.randint(0, 100),
+        project_intensity=rng.randint(0, 100),
+        pace=rng.randint(0, 100),
+        pre_reqs=[],
+        co_reqs=[],
+        tags=rng.sample(TAGS, 3),
+    )
+
+def seed(courses: int, rng: random.Random) -> list[str]:
+    ids = set()
+    while len(ids) < courses:
+        ids.add(f"{rng.choice(SUBJECTS)} {rng.randint(1000, 7999)}")
+    ids = sorted(ids)
+    for course_id in ids:
+        class_score_cache.put(course_id, synthetic_score(rng))
+    return ids
+
+def time_queries(pool: list[str], queries: int, rng: random.Random, **filters) -> list[float]:
+    latencies = []
+    for _ in range(queries):
+        score = class_score_cache.get(rng.choice(pool))
+        start = time.perf_counter()
+        similar_courses.similar(score, 10, **filters)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+async def main(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    class_score_cache.max_entries = args.courses
+    pool = seed(args.courses, rng)
+
+    start = time.perf_counter()
+    similar_courses.load(_indexed_scores())
+    print(f"{len(similar_courses)} courses indexed in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    extra = [synthetic_score(rng) for _ in range(1000)]
+    start = time.perf_counter()
+    for i, score in enumerate(extra):
+        similar_courses.add(f"BENCH{i}", f"BENCH {i}", score)
+    print(f"incremental add: {(time.perf_counter() - start) / len(extra) * 1e6:.1f}us per course")
+    for i in range(len(extra)):
+        similar_courses.remove(f"BENCH{i}")
+
+    for name, filters in {
+        "index, no filter": {},
+        "index, maxScore=50": {"max_score": 50},
+        "index, subject=CSE": {"subject": "CSE"},
+    }.items():
+        print(f"{name:<22} {summarize(time_queries(pool, args.queries, rng, **filters))}")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latencies = []
+        for _ in range(args.queries):
+            start = time.perf_counter()
+            response = await client.get(f"/courses/similar/{rng.choice(pool)}", params={"easier": "true"})
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+        print(f"{'GET /similar?easier':<22} {summarize(latencies)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--courses", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,199 @@
+"""Offline stand-ins for the grading agent's model and search tool.
+
+``install()`` swaps ChatOpenAI for StandInChatModel and the Tavily tool
+behind the search cache for StandInSearch, so the real graph, ReAct loop,
+caches and HTTP layer run with no network and no API keys. Latencies
+are drawn from seeded lognormal distributions and every ClassScore is
+derived from the course id, so runs are repeatable.
+"""
+import asyncio
+import math
+import os
+import random
+import re
+import statistics
+import time
+import zlib
+from typing import Any, Optional
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-benchmark")
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import BaseTool
+from pydantic import PrivateAttr
+
+from agents.class_score import ClassScore
+
+SEARCH_TOPICS = ["syllabus", "reddit reviews", "rate my professor", "workload", "exams"]
+
+class Latency:
+    """Lognormal latency with the given median; sigma=0 makes it fixed"""
+
+    def __init__(self, median: float, sigma: float = 0.0, seed: int = 0):
+        self.median = median
+        self.sigma = sigma
+        self.rng = random.Random(seed)
+
+    def sample(self) -> float:
+        if self.median <= 0:
+            return 0.0
+        if not self.sigma:
+            return self.median
+        return self.median * math.exp(self.rng.gauss(0, self.sigma))
+
+    async def wait(self) -> None:
+        await asyncio.sleep(self.sample())
+
+    def block(self) -> None:
+        time.sleep(self.sample())
+
+def course_of(messages: list) -> str:
+    """The course the grading prompt asks about ("Evaluate the class CSE 2221")"""
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            text = str(message.content).split("Evaluate the class", 1)[-1]
+            return text.split("\n", 1)[0].split(". ", 1)[0].strip()
+    return "unknown"
+
+def canned_score(course_id: str) -> ClassScore:
+    """A plausible ClassScore that depends only on the course id"""
+    rng = random.Random(zlib.crc32(course_id.encode()))
+    number = int((re.findall(r"\d+", course_id) or ["2000"])[0])
+    level = min(max(number // 1000, 1), 5)
+    return ClassScore(
+        score=min(100, rng.randint(10, 40) + level * 10),
+        ch=rng.choice([3, 3, 3, 4]),
+        summary=f"Stand-in assessment of {course_id}.",
+        time_load=round(rng.uniform(1.5, 3.0) + level * 0.8, 1),
+        rigor=min(100, rng.randint(5, 30) + level * 12),
+        assessment_intensity=rng.randint(20, 90),
+        project_intensity=rng.randint(10, 90),
+        pace=rng.randint(30, 80),
+        pre_reqs=[],
+        co_reqs=[],
+        tags=rng.sample(["math-heavy", "project-based", "proofs", "time-consuming", "well-taught"], 2),
+        evidence_snippets=[f"Stand-in evidence {i} for {course_id}." for i in range(3)],
+        confidence=round(rng.uniform(0.55, 0.95), 2),
+    )
+
+class StandInChatModel(BaseChatModel):
+    """Chat model that runs a fixed number of search turns, then answers.
+
+    Each turn waits on ``latency``; usage metadata is filled in from the
+    message sizes so the token/cost metrics have something to count.
+    """
+
+    latency: Any
+    searches: int = 2
+
+    _calls: int = PrivateAttr(default=0)
+
+    @property
+    def _llm_type(self) -> str:
+        return "stand-in"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _reply(self, messages: list) -> AIMessage:
+        course = course_of(messages)
+        done = sum(isinstance(m, ToolMessage) for m in messages)
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        usage = {"input_tokens": prompt_tokens, "output_tokens": 60, "total_tokens": prompt_tokens + 60}
+        if done < self.searches:
+            topic = SEARCH_TOPICS[done % len(SEARCH_TOPICS)]
+            call = {"name": "tavily_search", "args": {"query": f"OSU {course} {topic}"}, "id": f"call_{done}"}
+            return AIMessage(content="", tool_calls=[call], usage_metadata=usage, response_metadata={"model_name": "stand-in"})
+        return AIMessage(content=f"Finished researching {course}.", usage_metadata=usage, response_metadata={"model_name": "stand-in"})
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self._calls += 1
+        self.latency.block()
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self._calls += 1
+        await self.latency.wait()
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    def with_structured_output(self, schema, **kwargs):
+        def score(messages) -> ClassScore:
+            return canned_score(course_of(messages.to_messages() if hasattr(messages, "to_messages") else messages))
+
+        def respond(messages) -> ClassScore:
+            self.latency.block()
+            return score(messages)
+
+        async def arespond(messages) -> ClassScore:
+            await self.latency.wait()
+            return score(messages)
+        return RunnableLambda(respond, afunc=arespond)
+
+class StandInSearch(BaseTool):
+    """Search tool returning canned results after ``latency``"""
+
+    name: str = "tavily_search"
+    description: str = "Stand-in web search"
+    latency: Any
+    calls: int = 0
+
+    def _run(self, *args, run_manager: Optional[Any] = None, **kwargs) -> Any:
+        self.calls += 1
+        self.latency.block()
+        return self._results(kwargs.get("query", ""))
+
+    async def _arun(self, *args, run_manager: Optional[Any] = None, **kwargs) -> Any:
+        self.calls += 1
+        await self.latency.wait()
+        return self._results(kwargs.get("query", ""))
+
+    def _results(self, query: str) -> dict:
+        return {
+            "query": query,
+            "answer": f"Stand-in answer for {query}.",
+            "results": [
+                {
+                    "url": f"https://example.edu/{zlib.crc32(query.encode()):08x}/{i}",
+                    "title": query,
+                    "content": f"Result {i} about {query}. " * 10,
+                }
+                for i in range(3)
+            ],
+        }
+
+def install(llm_latency: Latency, search_latency: Latency, searches: int = 2) -> tuple[StandInChatModel, StandInSearch]:
+    """Swap the agent's model and the cached search tool's upstream for stand-ins"""
+    from langgraph.prebuilt import create_react_agent
+
+    from agents import class_grading_agent
+    from agents.tools.internet_search import cached_tavily_search
+
+    model = StandInChatModel(latency=llm_latency, searches=searches)
+    search = StandInSearch(latency=search_latency, args_schema=cached_tavily_search.args_schema)
+    cached_tavily_search.inner = search
+    class_grading_agent.llm = model
+    class_grading_agent.agent = create_react_agent(
+        model=model,
+        tools=class_grading_agent.tools,
+        prompt=class_grading_agent.prompt,
+        response_format=ClassScore,
+    )
+    return model, search
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def summarize(latencies: list[float]) -> str:
+    """p50/p95/p99/max of latencies given in seconds"""
+    if not latencies:
+        return "no samples"
+    ms = [x * 1000 for x in latencies]
+    return (
+        f"p50={statistics.median(ms):8.1f}ms p95={percentile(ms, 95):8.1f}ms "
+        f"p99={percentile(ms, 99):8.1f}ms max={max(ms):8.1f}ms"
+    )
@@ -0,0 +1,77 @@
+"""Cold start of main:app with no LLM or search credentials.
+
+Each run is a fresh interpreter with OPENAI_API_KEY and TAVILY_API_KEY
+removed from the environment (and no .env loaded). It times importing
+main, running the lifespan startup and serving the first /health, and
+checks that the heavy agent libraries (langchain_openai, langgraph) were
+never imported. --warm turns on warm_grading_agent with dummy keys to show
+what building the agent at startup adds.
+
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --runs 5 --warm
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Runs in the child interpreter
+CHILD = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+import httpx
+
+async def boot():
+    async with main.lifespan(main.app):
+        started = time.perf_counter()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/health")
+        return started, time.perf_counter(), response.status_code
+
+started, served, status = asyncio.run(boot())
+print(json.dumps({
+    "import": imported - start,
+    "startup": started - imported,
+    "first_health": served - start,
+    "status": status,
+    "heavy": [m for m in ("langchain_openai", "langgraph") if m in sys.modules],
+}))
+"""
+
+def run_once(warm: bool) -> dict:
+    scratch = tempfile.mkdtemp(prefix="startup_bench_")
+    env = {k: v for k, v in os.environ.items() if k not in ("OPENAI_API_KEY", "TAVILY_API_KEY")}
+    env.update(
+        DATABASE_URL=f"sqlite:///{scratch}/app.db",
+        CLASS_SCORE_CACHE_URL=f"sqlite:///{scratch}/class_scores.db",
+        SEARCH_CACHE_PATH=f"{scratch}/search.db",
+        PYTHONPATH=os.getcwd(),
+    )
+    if warm:
+        env.update(WARM_GRADING_AGENT="true", OPENAI_API_KEY="sk-benchmark", TAVILY_API_KEY="tvly-benchmark")
+    # From the scratch directory, so a developer's .env isn't picked up
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD], env=env, cwd=scratch, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main(args: argparse.Namespace) -> None:
+    runs = [run_once(args.warm) for _ in range(args.runs)]
+    print(f"{args.runs} cold starts, warm_grading_agent={args.warm}")
+    for name in ("import", "startup", "first_health"):
+        ms = [run[name] * 1000 for run in runs]
+        print(f"{name:<13} median={statistics.median(ms):7.1f}ms  max={max(ms):7.1f}ms")
+    print(f"/health status: {sorted({run['status'] for run in runs})}")
+    print(f"agent libraries imported: {sorted({m for run in runs for m in run['heavy']}) or 'none'}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warm", action="store_true", help="build the grading agent during startup")
+    main(parser.parse_args())
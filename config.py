@@ -6,12 +6,82 @@ class Settings(BaseSettings):
     secret_key: str = "your-secret-key-here"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    # Verified access tokens kept in memory until they expire
+    token_cache_size: int = 10_000
+    # Passwords: bcrypt cost, and how many hashes run at once on their own
+    # threads; past max_waiting queued behind those, logins get a 429
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_max_waiting: int = 64
+    # Async connection pool (ignored for in-memory SQLite)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: float = 30
+    db_pool_recycle_seconds: int = 30 * 60
+    # GET /schedule/{userId}?limit= page sizes, and the most schedules or
+    # users one POST /schedule/batch or GET /schedule/favorites may name
+    schedule_page_size: int = 50
+    schedule_page_max: int = 200
+    schedule_batch_max: int = 500
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     
     openai_api_key: str | None = Field(default=None, validation_alias="OPENAI_API_KEY")
     tavily_api_key: str | None = Field(default=None, validation_alias="TAVILY_API_KEY")
 
+    # Known courses, one id per line, loaded into the course index at startup
+    course_catalog_path: str | None = None
+
+    # Class score cache (in-process LRU in front of SQLite)
+    class_score_cache_url: str | None = None  # defaults to database_url
+    class_score_cache_size: int = 1024
+    class_score_cache_ttl_seconds: int = 7 * 24 * 60 * 60
+    class_score_cache_low_confidence_ttl_seconds: int = 24 * 60 * 60
+    class_score_cache_low_confidence: float = 0.5
+
+    # How long a request waits on a shared (coalesced) grading run
+    rating_waiter_timeout_seconds: float = 120.0
+    # How many grading agent runs may be in flight per worker
+    max_concurrent_agent_runs: int = 8
+    # How many cache misses one compare/schedule-load request grades at once
+    batch_grading_max_fan_out: int = 8
+
+    # Per-run agent budgets; past one, the run stops and a best-effort score
+    # (reduced confidence) is built from the evidence gathered so far. The
+    # deadline plus finalize time should stay under the waiter timeout.
+    agent_max_tool_calls: int = 8
+    agent_max_tokens: int = 60_000
+    agent_deadline_seconds: float = 90.0
+    agent_finalize_seconds: float = 15.0
+    agent_degraded_confidence: float = 0.3  # cap on a best-effort score's confidence
+    # Build the grading model, agent and graph at startup rather than on the
+    # first rating request (needs OPENAI_API_KEY at boot)
+    warm_grading_agent: bool = False
+
+    # Evidence retrieval ahead of scoring: all sources are queried at once and
+    # the ranked snippets go to a single model call; with fewer than
+    # evidence_min_snippets the ReAct agent researches instead
+    evidence_source_timeout_seconds: float = 8.0
+    evidence_max_snippets: int = 12
+    evidence_min_snippets: int = 3
+    evidence_snippet_chars: int = 600
+    # Share of snippets that must differ before a refresh re-grades a course
+    # (below it the cached score just gets a new TTL)
+    evidence_change_threshold: float = 0.34
+
+    # Background grading jobs (POST /courses/ratings/jobs)
+    grading_job_workers: int = 4
+    grading_job_queue_size: int = 100
+    grading_job_retention_seconds: int = 60 * 60
+
+    # Search tool result cache
+    search_cache_path: str = ".search_cache.db"
+    search_cache_ttl_seconds: int = 3 * 24 * 60 * 60
+    search_cache_offline: bool = False  # replay recorded results only, never call Tavily
+
+    # Responses at least this many bytes are gzipped for clients that accept it
+    gzip_minimum_size: int = 1024
+
     class Config:
         env_file = ".env"
 
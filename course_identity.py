@@ -0,0 +1,116 @@
+import re
+import threading
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+# Subject, catalog number and an optional variant: "CSE 2331", "cse-2221",
+# "Math 1151H", "English 1110.01", "A&E 2000"
+COURSE_ID_RE = re.compile(
+    r"^\s*(?P<subject>[A-Za-z][A-Za-z&]*(?:\s+[A-Za-z&]+)*?)[\s\-_.]*"
+    r"(?P<number>\d{3,5})"
+    r"(?P<variant>\.\d{1,2}|[A-Za-z]{1,2})?\s*$"
+)
+
+@dataclass(frozen=True)
+class CourseId:
+    subject: str
+    number: str
+    variant: str = ""
+
+    @property
+    def key(self) -> str:
+        """Compact identity used for cache keys and lookups, e.g. "CSE2331" """
+        return f"{self.subject}{self.number}{self.variant}".replace(" ", "")
+
+    def __str__(self) -> str:
+        return f"{self.subject} {self.number}{self.variant}"
+
+def parse_course_id(text: str) -> CourseId:
+    """Parse a course id in any common spelling; raises ValueError if it isn't one"""
+    match = COURSE_ID_RE.match(text)
+    if match is None:
+        raise ValueError(f"Not a course id: {text!r}")
+    subject = re.sub(r"\s+", " ", match["subject"]).upper()
+    return CourseId(subject, match["number"], (match["variant"] or "").upper())
+
+class CourseIndex:
+    """In-memory index of known courses with O(1) resolution of spelling variants"""
+
+    def __init__(self):
+        self._by_key: dict[str, CourseId] = {}
+        self._by_spelling: dict[str, CourseId] = {}
+        self._lock = threading.Lock()
+
+    def add(self, course: CourseId | str) -> CourseId:
+        """Add a course (or course id string) to the index"""
+        if isinstance(course, str):
+            course = parse_course_id(course)
+        with self._lock:
+            return self._by_key.setdefault(course.key, course)
+
+    def add_all(self, courses: Iterable[CourseId | str]) -> int:
+        """Add many courses, skipping strings that aren't course ids; returns how many were added"""
+        added = 0
+        for course in courses:
+            try:
+                self.add(course)
+                added += 1
+            except ValueError:
+                pass
+        return added
+
+    def load_file(self, path: str) -> int:
+        """Load one course id per line; blank lines and # comments are ignored"""
+        with open(path) as f:
+            return self.add_all(line.split("#", 1)[0].strip() for line in f if line.split("#", 1)[0].strip())
+
+    def resolve(self, text: str) -> CourseId:
+        """Canonical CourseId for any spelling; raises ValueError if it isn't a course id.
+
+        Spellings seen before resolve with a single dict lookup; new ones are
+        parsed once and remembered. Resolving does not add the course to the
+        set of known courses.
+        """
+        course = self._by_spelling.get(text)
+        if course is not None:
+            return course
+        course = parse_course_id(text)
+        course = self._by_key.get(course.key, course)
+        if len(self._by_spelling) < 100_000:
+            self._by_spelling[text] = course
+        return course
+
+    def get(self, text: str) -> Optional[CourseId]:
+        """Like resolve, but returns None for strings that aren't course ids"""
+        try:
+            return self.resolve(text)
+        except ValueError:
+            return None
+
+    def __contains__(self, text: str) -> bool:
+        """Whether the course is a known course"""
+        course = self.get(text)
+        return course is not None and course.key in self._by_key
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def __iter__(self):
+        return iter(list(self._by_key.values()))
+
+course_index = CourseIndex()
+
+def course_key(text: str) -> str:
+    """Cache/lookup key for a course id, e.g. "cse-2331" -> "CSE2331".
+
+    Strings that aren't course ids fall back to their upper-cased alphanumerics.
+    """
+    course = course_index.get(text)
+    if course is None:
+        return re.sub(r"[^A-Z0-9]", "", text.upper())
+    return course.key
+
+def canonical_course_id(text: str) -> str:
+    """Display form of a course id, e.g. "cse-2331" -> "CSE 2331"; non-ids are returned stripped"""
+    course = course_index.get(text)
+    return str(course) if course is not None else text.strip()
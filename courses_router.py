@@ -1,67 +1,230 @@
-from fastapi import APIRouter
-from typing import List
-from agents.class_grading_agent import ClassScore, class_grading_graph
-from langchain_core.messages import HumanMessage
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from agents.class_score import ClassScore
+from agents.class_score_cache import CacheEntry, class_score_cache
+from agents.grading_jobs import GradingJob, GradingJobRequest, QueueFull, grading_jobs
+from agents.grading_service import grade_course, grade_courses, stream_grading
+from course_identity import CourseId, canonical_course_id, course_index
+from http_caching import conditional_json
+from models import (
+    CoursePrerequisites, CoursesCompareRequest, CoursesCompareResult, CourseUnlocks, ScheduleLoadRequest,
+    ScheduleLoadResult, ScheduleOption, SimilarCoursesResult,
+)
+from prerequisites import loaded_prerequisite_graph
+from schedule_solver import solve_schedules
+from scoring import compare_courses, schedule_load
+from similar_courses import similar_courses
 
 # User microservice router
 courses_router = APIRouter(prefix="/courses", tags=["courses"])
 
+def _rating_response(request: Request, score: ClassScore, entry: CacheEntry | None):
+    """Cacheable rating response; max-age is what's left of the cache entry's TTL.
+
+    Cached entries are sent as their stored bytes, skipping re-serialization.
+    """
+    if entry is None:
+        return conditional_json(
+            request, score, cache_control=f"public, max-age={int(class_score_cache.ttl_for(score))}"
+        )
+    return conditional_json(
+        request,
+        entry.payload,
+        cache_control=f"public, max-age={max(0, int(entry.expires_at - time.time()))}",
+        last_modified=datetime.fromtimestamp(entry.cached_at, timezone.utc),
+    )
+
+def _course_or_422(courseId: str) -> CourseId:
+    course = course_index.get(courseId)
+    if course is None:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Not a course id: {courseId}")
+    return course
+
 @courses_router.get("/ratings/{courseId}", response_model=ClassScore)
-async def ratings_courseId(courseId: str):
-    # Return hardcoded data for CSE2331
-    if courseId == "CSE2331":
-        return ClassScore(
-            score=73,
-            ch=3,
-            summary="A mid-level, conceptually rigorous data-structures and algorithms course (proofs, complexity, NP-completeness) that is challenging and time-consuming but essential for CS/CSE majors.",
-            time_load=6.0,
-            rigor=75,
-            assessment_intensity=65,
-            project_intensity=65,
-            pace=70,
-            pre_reqs=[
-                "CSE 2231",
-                "CSE 2321",
-                "STAT 3460 or STAT 3470"
-            ],
-            co_reqs=[
-                "Math 3345 (concurrent in some offerings)"
-            ],
-            tags=[
-                "algorithms",
-                "data-structures",
-                "proofs",
-                "NP-completeness",
-                "randomized-algorithms",
-                "hashing",
-                "graphs",
-                "time-consuming",
-                "core-course"
-            ],
-            evidence_snippets=[
-                '''"Design/analysis of algorithms and data structures; divide-and-conquer; sorting and selection, search trees, hashing, graph algorithms, string matching; probabilistic analysis; randomized algorithms; NP-completeness." — OSU course listing/syllabus''',
-                '''"Be competent with using asymptotic notation ... Be familiar with designing graph algorithms ... Be familiar with the use of balanced trees ... Be familiar with hashing." — OSU syllabus objectives''',
-                '''"Prereq: 2231, 2321, and Stat 3460 or 3470 ... Concur: Math 3345." — OSU course catalog entry''',
-                '''Student discussion note: "CSE 2331 & 2421 Study Resource ... Nick Painter's playlist is also great for studying Foundation II." — student forum (Reddit)'''
-            ],
-            confidence=0.75
+async def ratings_courseId(courseId: str, request: Request):
+    course = _course_or_422(courseId)
+    # Hits in the in-process tier are answered without leaving the event loop
+    entry = class_score_cache.get_entry(course.key, lru_only=True)
+    if entry is not None:
+        return _rating_response(request, entry.score, entry)
+    score = await _rating(course)
+    return _rating_response(request, score, class_score_cache.peek(course.key))
+
+async def _rating(course: CourseId) -> ClassScore:
+    # Cached, pinned or graded by the agent (concurrent requests share one run)
+    try:
+        return await grade_course(str(course))
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Grading {course} is still in progress, try again shortly",
+        )
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@courses_router.get(
+    "/ratings/{courseId}/stream",
+    response_class=StreamingResponse,
+    summary="Streams grading progress as server-sent events, ending with the ClassScore",
+)
+async def ratings_courseId_stream(courseId: str):
+    course = _course_or_422(courseId)
+
+    async def events():
+        try:
+            async for event, data in stream_grading(str(course)):
+                yield _sse(event, data)
+        except asyncio.TimeoutError:
+            yield _sse("error", {"detail": f"Grading {courseId} is still in progress, try again shortly"})
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@courses_router.post(
+    "/ratings/jobs",
+    response_model=GradingJob,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queues a course for grading; poll the returned job for the result",
+)
+async def submit_rating_job(body: GradingJobRequest):
+    try:
+        return await grading_jobs.submit(body.courseId, body.priority)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except QueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": "30"},
         )
 
-    # For other courses, use the agent
-    test_messages = [HumanMessage(content=f"Evaluate the class {courseId}")]
-    initial_state = {
-        "messages": test_messages,
-        "class_name": courseId,
-        "class_score": None,
-        "cached": False
-    }
-    result = class_grading_graph.invoke(initial_state)
-    return result["class_score"]
-
-@courses_router.post("/schedule-load", response_model=List[ClassScore])
-async def compare(courseIds: List[str]):
-    return
-
-@courses_router.post("/compare", response_model=List[ClassScore])
-async def compare(courseIds: List[str]):
-    return
+@courses_router.get(
+    "/ratings/jobs/{jobId}",
+    response_model=GradingJob,
+    summary="Gets the status (and result, once done) of a grading job",
+)
+async def get_rating_job(jobId: str):
+    job = grading_jobs.get(jobId)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+async def _grade_many(courseIds: List[str]) -> dict[str, ClassScore]:
+    try:
+        return await grade_courses(courseIds)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Grading is still in progress for some courses, try again shortly",
+        )
+
+@courses_router.post("/schedule-load", response_model=ScheduleLoadResult)
+async def schedule_load_courses(body: ScheduleLoadRequest):
+    scores = await _grade_many(body.courseIds)
+    return schedule_load(scores)
+
+@courses_router.post("/compare", response_model=CoursesCompareResult)
+async def compare(body: CoursesCompareRequest):
+    scores = await _grade_many([item.courseId for item in body.courses])
+    try:
+        return compare_courses(scores, body.weights)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+@courses_router.post(
+    "/schedule-options",
+    response_model=List[ScheduleOption],
+    summary="Finds the top-k lightest conflict-free schedules for the given courses, sections and constraints",
+)
+async def schedule_options(body: ScheduleLoadRequest):
+    course_ids = [canonical_course_id(c) for c in body.courseIds]
+    scores = await _grade_many(course_ids)
+    sections = {canonical_course_id(c): options for c, options in (body.sections or {}).items()}
+    constraints = body.constraints.model_dump(exclude_none=True) if body.constraints else {}
+    try:
+        # CPU-bound search; keep it off the event loop
+        return await asyncio.to_thread(solve_schedules, course_ids, scores, sections, constraints, body.topK)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+_similar_load_lock = asyncio.Lock()
+
+def _indexed_scores():
+    for key, score in class_score_cache.scores():
+        try:
+            course = course_index.resolve(key)
+        except ValueError:
+            continue
+        yield course.key, str(course), score
+
+@courses_router.get(
+    "/similar/{courseId}",
+    response_model=SimilarCoursesResult,
+    summary="Finds the rated courses most like a course, optionally only easier or lighter ones",
+)
+async def similar_courses_courseId(
+    courseId: str,
+    k: int = Query(10, ge=1, le=50),
+    easier: bool = Query(False, description="only courses with a lower overall score"),
+    maxScore: Optional[int] = Query(None, ge=1, le=100),
+    maxTimeLoad: Optional[float] = Query(None, ge=0, le=8),
+    subject: Optional[str] = None,
+):
+    course = _course_or_422(courseId)
+    score = await _rating(course)
+    if not similar_courses.loaded:
+        # Built from the ratings cache on first use; cache_class_score keeps it current after that
+        async with _similar_load_lock:
+            if not similar_courses.loaded:
+                await asyncio.to_thread(similar_courses.load, _indexed_scores())
+    max_score = maxScore
+    if easier:
+        max_score = min(max_score or 100, score.score - 1)
+    neighbors = similar_courses.similar(
+        score, k, exclude=course.key, max_score=max_score, max_time_load=maxTimeLoad, subject=subject
+    )
+    return SimilarCoursesResult(courseId=str(course), score=score.score, neighbors=neighbors)
+
+@courses_router.get(
+    "/prereqs/{courseId}",
+    response_model=CoursePrerequisites,
+    summary="Gets a course's prerequisites and co-requisites, and everything they transitively require",
+)
+async def course_prerequisites(courseId: str):
+    course = _course_or_422(courseId)
+    graph = await loaded_prerequisite_graph()
+    requirements = graph.requirements(course)
+    if requirements is None:
+        # Not rated yet: its requirements come from its ClassScore
+        requirements = await asyncio.to_thread(graph.update, course, await _rating(course))
+        graph = await loaded_prerequisite_graph()
+    return CoursePrerequisites(
+        courseId=str(course),
+        prereqs=requirements.prereqs,
+        coreqs=requirements.coreqs,
+        allPrereqs=graph.all_prereqs(course),
+    )
+
+@courses_router.get(
+    "/unlocks/{courseId}",
+    response_model=CourseUnlocks,
+    summary="Lists the courses taking a course would make available, given the courses already completed",
+)
+async def course_unlocks(courseId: str, completed: List[str] = Query([])):
+    course = _course_or_422(courseId)
+    graph = await loaded_prerequisite_graph()
+    unlocked, leads_to = graph.unlocks(course, completed)
+    return CourseUnlocks(courseId=str(course), unlocked=unlocked, leadsTo=leads_to)
@@ -0,0 +1,288 @@
+import base64
+import uuid
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import orjson
+from sqlalchemy import delete, insert, or_, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from db_models import ScheduleItemRow, ScheduleRow, UserRow, as_utc, utcnow
+from models import ScheduleItem, SchedulePayload, ScheduleSaved, User, UserCreate, UserUpdate
+
+# =======================
+# SCHEDULES
+# =======================
+
+def to_schedule(row: ScheduleRow, items: Optional[List[ScheduleItem]] = None) -> ScheduleSaved:
+    return ScheduleSaved(
+        scheduleId=row.schedule_id,
+        userId=row.user_id,
+        name=row.name,
+        items=items if items is not None else [
+            ScheduleItem(courseId=item.course_id, sectionId=item.section_id) for item in row.items
+        ],
+        favorite=row.favorite,
+        updatedAt=as_utc(row.updated_at),
+    )
+
+def new_schedule_id() -> str:
+    return f"sch_{uuid.uuid4().hex[:16]}"
+
+class InvalidCursor(ValueError):
+    """Raised for a page cursor that list_schedules_page didn't issue"""
+
+def encode_cursor(row: ScheduleRow) -> str:
+    """Opaque cursor for the page after row: its (created_at, schedule_id) sort key"""
+    key = orjson.dumps([row.created_at.isoformat(), row.schedule_id])
+    return base64.urlsafe_b64encode(key).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, schedule_id = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), str(schedule_id)
+    except (TypeError, ValueError) as e:
+        raise InvalidCursor(cursor) from e
+
+def _schedules_query(user_id: str):
+    # Served in order straight off ix_schedules_user_created
+    return (
+        select(ScheduleRow)
+        .options(joinedload(ScheduleRow.items))
+        .where(ScheduleRow.user_id == user_id)
+        .order_by(ScheduleRow.created_at, ScheduleRow.schedule_id)
+    )
+
+async def list_schedules(session: AsyncSession, user_id: str) -> List[ScheduleSaved]:
+    """All of a user's schedules, oldest first, with their items in the same query"""
+    rows = await session.scalars(_schedules_query(user_id))
+    return [to_schedule(row) for row in rows.unique()]
+
+async def list_schedules_page(
+    session: AsyncSession, user_id: str, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[ScheduleSaved], Optional[str]]:
+    """Up to limit of a user's schedules in list_schedules order, starting
+    after cursor, and the cursor for the next page (None on the last one).
+
+    Keyset rather than offset pagination: each page seeks straight to its
+    first row, and schedules added or deleted meanwhile don't shift rows
+    between pages. Raises InvalidCursor.
+    """
+    query = _schedules_query(user_id).limit(limit + 1)
+    if cursor is not None:
+        query = query.where(tuple_(ScheduleRow.created_at, ScheduleRow.schedule_id) > tuple_(*decode_cursor(cursor)))
+    rows = list((await session.scalars(query)).unique())
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return [to_schedule(row) for row in rows[:limit]], next_cursor
+
+async def get_favorite_schedule(session: AsyncSession, user_id: str) -> Optional[ScheduleSaved]:
+    row = await session.scalar(
+        select(ScheduleRow).where(ScheduleRow.user_id == user_id, ScheduleRow.favorite.is_(True))
+    )
+    return to_schedule(row) if row else None
+
+async def get_favorite_schedules(session: AsyncSession, user_ids: List[str]) -> Dict[str, Optional[ScheduleSaved]]:
+    """Each user's favorite schedule (None if they have none), items included, in one query"""
+    rows = await session.scalars(
+        select(ScheduleRow)
+        .options(joinedload(ScheduleRow.items))
+        .where(ScheduleRow.user_id.in_(user_ids), ScheduleRow.favorite.is_(True))
+    )
+    favorites = {row.user_id: to_schedule(row) for row in rows.unique()}
+    return {user_id: favorites.get(user_id) for user_id in user_ids}
+
+async def _clear_favorite(session: AsyncSession, user_id: str) -> None:
+    await session.execute(
+        update(ScheduleRow)
+        .where(ScheduleRow.user_id == user_id, ScheduleRow.favorite.is_(True))
+        .values(favorite=False)
+    )
+
+async def _insert_items(session: AsyncSession, schedule_id: str, items: List[ScheduleItem]) -> None:
+    """Bulk insert a schedule's items in one executemany"""
+    if items:
+        await session.execute(
+            insert(ScheduleItemRow),
+            [
+                {"schedule_id": schedule_id, "position": i, "course_id": item.courseId, "section_id": item.sectionId}
+                for i, item in enumerate(items)
+            ],
+        )
+
+T = TypeVar("T")
+
+async def _retry_conflict(session: AsyncSession, write: Callable[[], Awaitable[T]]) -> T:
+    """Run a write transaction, once more if a concurrent one beat it to a
+    unique index (e.g. made another schedule the favorite). Raises
+    IntegrityError if it conflicts again."""
+    try:
+        return await write()
+    except IntegrityError:
+        await session.rollback()
+        return await write()
+
+def _upsert_schedules(session: AsyncSession, values: List[dict]):
+    """INSERT ... ON CONFLICT (user_id, name) DO UPDATE for the session's
+    dialect, returning the rows. Conflicts keep the row's id and created_at."""
+    dialect_insert = postgresql.insert if session.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(ScheduleRow).values(values)
+    return stmt.on_conflict_do_update(
+        index_elements=[ScheduleRow.user_id, ScheduleRow.name],
+        set_={"favorite": stmt.excluded.favorite, "updated_at": stmt.excluded.updated_at},
+    ).returning(ScheduleRow)
+
+def _new_row_values(user_id: str, name: str, favorite: bool, now: datetime) -> dict:
+    return {
+        "schedule_id": new_schedule_id(), "user_id": user_id, "name": name,
+        "favorite": favorite, "created_at": now, "updated_at": now,
+    }
+
+async def add_schedule(session: AsyncSession, user_id: str, body: SchedulePayload) -> ScheduleSaved:
+    """Insert a new schedule; a new favorite replaces the user's old one.
+    Raises IntegrityError if the user already has a schedule of that name."""
+    async def write() -> ScheduleSaved:
+        if body.favorite:
+            await _clear_favorite(session, user_id)
+        row = ScheduleRow(**_new_row_values(user_id, body.name or "Untitled", body.favorite, utcnow()))
+        session.add(row)
+        await session.flush()
+        await _insert_items(session, row.schedule_id, body.items)
+        await session.commit()
+        return to_schedule(row, body.items)
+
+    return await _retry_conflict(session, write)
+
+async def save_schedule(session: AsyncSession, user_id: str, body: SchedulePayload) -> ScheduleSaved:
+    """Upsert a schedule by (user, name), replacing its items.
+
+    One INSERT ... ON CONFLICT on ux_schedules_user_name, so concurrent saves
+    of a name can't create it twice. Raises IntegrityError if concurrent
+    saves keep making another schedule the favorite.
+    """
+    async def write() -> ScheduleSaved:
+        if body.favorite:
+            await _clear_favorite(session, user_id)
+        row = await session.scalar(
+            _upsert_schedules(session, [_new_row_values(user_id, body.name or "Untitled", body.favorite, utcnow())]),
+            execution_options={"populate_existing": True},
+        )
+        await session.execute(delete(ScheduleItemRow).where(ScheduleItemRow.schedule_id == row.schedule_id))
+        await _insert_items(session, row.schedule_id, body.items)
+        await session.commit()
+        return to_schedule(row, body.items)
+
+    return await _retry_conflict(session, write)
+
+async def save_schedules(session: AsyncSession, entries: List[Tuple[str, SchedulePayload]]) -> List[ScheduleSaved]:
+    """Upsert many (user_id, schedule) pairs by (user, name) in one transaction.
+
+    Ends in the same state as calling save_schedule on each entry in turn: a
+    repeated (user, name) keeps its last entry, and a user's last favorite
+    wins. Returns one schedule per distinct (user, name), in order of first
+    appearance. A fixed handful of statements however many entries there are,
+    the rows upserted in one INSERT ... ON CONFLICT like save_schedule. Raises
+    IntegrityError if concurrent saves keep taking a user's favorite.
+    """
+    latest: Dict[Tuple[str, str], SchedulePayload] = {}
+    # Users with a favorite entry lose their old favorite; None if a later
+    # entry then un-favorited the new one
+    favorite_of: Dict[str, Optional[Tuple[str, str]]] = {}
+    for user_id, body in entries:
+        key = (user_id, body.name or "Untitled")
+        latest[key] = body
+        if body.favorite:
+            favorite_of[user_id] = key
+        elif favorite_of.get(user_id) == key:
+            favorite_of[user_id] = None
+    if not latest:
+        return []
+
+    async def write() -> List[ScheduleSaved]:
+        if favorite_of:
+            await session.execute(
+                update(ScheduleRow)
+                .where(ScheduleRow.user_id.in_(list(favorite_of)), ScheduleRow.favorite.is_(True))
+                .values(favorite=False)
+            )
+        now = utcnow()
+        rows = await session.scalars(
+            _upsert_schedules(session, [
+                _new_row_values(user_id, name, favorite_of.get(user_id) == (user_id, name), now)
+                for user_id, name in latest
+            ]),
+            execution_options={"populate_existing": True},
+        )
+        by_key = {(row.user_id, row.name): row for row in rows}
+        saved = [by_key[key] for key in latest]
+        await session.execute(
+            delete(ScheduleItemRow).where(ScheduleItemRow.schedule_id.in_([row.schedule_id for row in saved]))
+        )
+        items = [
+            {"schedule_id": row.schedule_id, "position": i, "course_id": item.courseId, "section_id": item.sectionId}
+            for row, body in zip(saved, latest.values())
+            for i, item in enumerate(body.items)
+        ]
+        if items:
+            await session.execute(insert(ScheduleItemRow), items)
+        await session.commit()
+        return [to_schedule(row, body.items) for row, body in zip(saved, latest.values())]
+
+    return await _retry_conflict(session, write)
+
+async def delete_schedule(session: AsyncSession, user_id: str, schedule_id: str) -> bool:
+    """Delete a schedule (items cascade); False if the user has no such schedule"""
+    result = await session.execute(
+        delete(ScheduleRow).where(ScheduleRow.user_id == user_id, ScheduleRow.schedule_id == schedule_id)
+    )
+    await session.commit()
+    return result.rowcount > 0
+
+# =======================
+# USERS
+# =======================
+
+def to_user(row: UserRow) -> User:
+    return User(id=row.id, username=row.username, email=row.email, created_at=as_utc(row.created_at))
+
+async def create_user(session: AsyncSession, user: UserCreate, hashed_password: str) -> User:
+    """Insert a user; raises IntegrityError if the username or email is taken"""
+    row = UserRow(username=user.username, email=user.email, hashed_password=hashed_password)
+    session.add(row)
+    await session.commit()
+    return to_user(row)
+
+async def get_login(session: AsyncSession, username_or_email: str) -> Optional[Tuple[User, Optional[str]]]:
+    """The user with this username or email and their password hash"""
+    row = await session.scalar(
+        select(UserRow).where(or_(UserRow.username == username_or_email, UserRow.email == username_or_email)).limit(1)
+    )
+    return (to_user(row), row.hashed_password) if row else None
+
+async def get_user(session: AsyncSession, user_id: int) -> Optional[User]:
+    row = await session.get(UserRow, user_id)
+    return to_user(row) if row else None
+
+async def update_user(
+    session: AsyncSession, user_id: int, user: UserUpdate, hashed_password: Optional[str] = None
+) -> Optional[User]:
+    """Apply the fields that were set (the password as its hash); raises
+    IntegrityError on a taken username/email"""
+    row = await session.get(UserRow, user_id)
+    if row is None:
+        return None
+    if user.username is not None:
+        row.username = user.username
+    if user.email is not None:
+        row.email = user.email
+    if hashed_password is not None:
+        row.hashed_password = hashed_password
+    await session.commit()
+    return to_user(row)
+
+async def delete_user(session: AsyncSession, user_id: int) -> bool:
+    result = await session.execute(delete(UserRow).where(UserRow.id == user_id))
+    await session.commit()
+    return result.rowcount > 0
@@ -0,0 +1,70 @@
+from typing import AsyncIterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import StaticPool
+
+from config import settings
+
+# Sync URLs in .env map onto their async drivers
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+def async_database_url(url: str) -> str:
+    """Rewrite e.g. sqlite:///./test.db to sqlite+aiosqlite:///./test.db"""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+def create_engine(url: str):
+    """Async engine with a pool sized from settings; in-memory SQLite shares one connection"""
+    url = async_database_url(url)
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        engine = create_async_engine(url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+    else:
+        engine = create_async_engine(
+            url,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+            pool_recycle=settings.db_pool_recycle_seconds,
+            pool_pre_ping=True,
+        )
+
+    if url.startswith("sqlite"):
+        @event.listens_for(engine.sync_engine, "connect")
+        def _sqlite_pragmas(dbapi_connection, _):
+            # WAL lets readers proceed while a schedule save is writing
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+    return engine
+
+class Base(DeclarativeBase):
+    pass
+
+engine = create_engine(settings.database_url)
+async_session = async_sessionmaker(engine, expire_on_commit=False)
+
+async def init_db() -> None:
+    """Create any missing tables, and indexes added to existing ones"""
+    # Import the table definitions so they are registered on Base.metadata
+    import db_models  # noqa: F401
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(lambda sync_conn: [
+            index.create(sync_conn, checkfirst=True)
+            for table in Base.metadata.sorted_tables
+            for index in table.indexes
+        ])
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: one session per request, closed when the request ends"""
+    async with async_session() as session:
+        yield session
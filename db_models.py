@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from database import Base
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """SQLite hands back naive datetimes; everything is stored in UTC"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+class UserRow(Base):
+    __tablename__ = "users"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    username: Mapped[str] = mapped_column(String(64), unique=True, index=True)
+    email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
+    hashed_password: Mapped[Optional[str]] = mapped_column(String(255))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+
+class ScheduleRow(Base):
+    __tablename__ = "schedules"
+    __table_args__ = (
+        # Listing a user's schedules in a stable order
+        Index("ix_schedules_user_created", "user_id", "created_at", "schedule_id"),
+    )
+
+    schedule_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(64))
+    name: Mapped[str] = mapped_column(String(255))
+    favorite: Mapped[bool] = mapped_column(Boolean, default=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
+
+    items: Mapped[List["ScheduleItemRow"]] = relationship(
+        back_populates="schedule",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="ScheduleItemRow.position",
+        lazy="selectin",
+    )
+
+# At most one favorite per user, and a direct lookup for it
+Index(
+    "ux_schedules_user_favorite",
+    ScheduleRow.user_id,
+    unique=True,
+    sqlite_where=ScheduleRow.favorite.is_(True),
+    postgresql_where=ScheduleRow.favorite.is_(True),
+)
+
+# One schedule per (user, name), the key save_schedule upserts on
+Index("ux_schedules_user_name", ScheduleRow.user_id, ScheduleRow.name, unique=True)
+
+class ScheduleItemRow(Base):
+    __tablename__ = "schedule_items"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    schedule_id: Mapped[str] = mapped_column(ForeignKey("schedules.schedule_id", ondelete="CASCADE"), index=True)
+    position: Mapped[int] = mapped_column(Integer)
+    course_id: Mapped[str] = mapped_column(String(32))
+    section_id: Mapped[Optional[str]] = mapped_column(String(32))
+
+    schedule: Mapped[ScheduleRow] = relationship(back_populates="items")
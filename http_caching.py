@@ -0,0 +1,82 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+import orjson
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+
+def _encode_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def json_bytes(content: Any) -> bytes:
+    """Serialize content (models, lists of models, plain data) with orjson; bytes pass through"""
+    if isinstance(content, bytes):
+        return content
+    # UTC as "Z", the way pydantic writes it on the response_model routes
+    return orjson.dumps(content, default=_encode_default, option=orjson.OPT_UTC_Z)
+
+def etag_for(body: bytes) -> str:
+    """Weak ETag from a hash of the JSON body.
+
+    Weak because the tag names the content, not its bytes on the wire: the
+    gzip middleware sends the same tag with a compressed body, and a strong
+    tag would then claim the two encodings are byte-identical.
+    """
+    return 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        # SQLite hands back naive datetimes; everything is stored in UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag.removeprefix("W/") in candidates
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+def conditional_json(
+    request: Request,
+    content: Any,
+    *,
+    cache_control: str,
+    last_modified: Optional[datetime] = None,
+) -> Response:
+    """JSON response with ETag / Cache-Control / Last-Modified, or a 304.
+
+    content may be already-serialized JSON bytes. If-None-Match is checked against a hash of the serialized body; when the
+    request has no If-None-Match, If-Modified-Since is checked against
+    last_modified.
+    """
+    body = json_bytes(content)
+    etag = etag_for(body)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    else:
+        not_modified = bool(if_modified_since and last_modified and _not_modified_since(if_modified_since, last_modified))
+
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,24 +1,58 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from routers import users_router, schedule_router
 from courses_router import courses_router
 import uvicorn
 from config import settings
+from course_identity import course_index
+from agents import class_grading_agent
+from agents.class_score_cache import class_score_cache
+from agents.grading_jobs import grading_jobs
+from database import engine, init_db
+import metrics
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_db()
+    # Index known courses: the configured catalog plus everything already rated
+    if settings.course_catalog_path:
+        course_index.load_file(settings.course_catalog_path)
+    course_index.add_all(class_score_cache.keys())
+    if settings.warm_grading_agent:
+        class_grading_agent.warm_up()
+    await grading_jobs.start()
+    yield
+    await grading_jobs.stop()
+    await engine.dispose()
 
 app = FastAPI(
     title="Microservices API",
     description="A simple FastAPI microservices setup",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+# Large bodies (schedule lists, compare results, ratings with evidence) only;
+# small ones aren't worth the CPU. SSE streams are never compressed.
+app.add_middleware(GZipMiddleware, minimum_size=settings.gzip_minimum_size, compresslevel=5)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Paginated schedule lists link to the next page in this header
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Outermost, so request latency includes the other middleware
+app.add_middleware(metrics.MetricsMiddleware)
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Microservices API"}
@@ -27,6 +61,10 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
 app.include_router(users_router)
 app.include_router(courses_router)
 app.include_router(schedule_router)
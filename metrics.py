@@ -0,0 +1,275 @@
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, Tuple
+
+# Prometheus text exposition format, version 0.0.4
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+ITERATION_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30)
+
+# USD per million (input, output) tokens, for the cost estimate
+LLM_PRICES_PER_MTOK = {
+    "gpt-5-mini": (0.25, 2.00),
+    "gpt-5": (1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(key: LabelKey, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    @staticmethod
+    def key(labels: Dict[str, str]) -> LabelKey:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self.key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self.key(labels), 0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(key)} {_number(v)}" for key, v in values]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self.key(labels)] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> (per-bucket counts, the last one for +Inf; sum)
+        self._series: Dict[LabelKey, Tuple[list, list]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self.key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self.key(labels))
+        return sum(series[0]) if series else 0
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        with self._lock:
+            series = sorted((key, list(counts), total[0]) for key, (counts, total) in self._series.items())
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(key)} {cumulative}")
+        return lines
+
+class Registry:
+    """Metrics plus callbacks that read counters kept elsewhere at scrape time"""
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], Iterable[_Metric]]] = []
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._add(Counter(name, help))
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        return self._add(Gauge(name, help))
+
+    def histogram(self, name: str, help: str, buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn: Callable[[], Iterable[_Metric]]) -> Callable[[], Iterable[_Metric]]:
+        """Register fn (usable as a decorator) to build extra metrics on every scrape"""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            for metric in collect():
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+# ---------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response body, by route"
+)
+
+password_hash_duration = registry.histogram(
+    "password_hash_duration_seconds", "bcrypt hash/verify time, including the wait for a hashing thread"
+)
+
+class MetricsMiddleware:
+    """ASGI middleware recording http_request_duration_seconds per route template.
+
+    Timing runs until the last body chunk is sent, so streamed responses
+    (SSE) count their full duration.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status_code),
+            )
+
+# ---------------------------------------------------------
+# Grading graph
+# ---------------------------------------------------------
+grading_node_duration = registry.histogram(
+    "grading_node_duration_seconds", "Wall time of each class_grading_graph node"
+)
+grading_tool_duration = registry.histogram(
+    "grading_tool_duration_seconds", "Wall time of each agent tool call"
+)
+grading_tool_calls = registry.counter(
+    "grading_tool_calls_total", "Agent tool calls by tool and outcome (ok/error)"
+)
+grading_llm_calls = registry.counter("grading_llm_calls_total", "Chat model calls made by the grading agent")
+grading_llm_tokens = registry.counter(
+    "grading_llm_tokens_total", "Chat model tokens used by the grading agent, by model and direction"
+)
+grading_llm_cost = registry.counter(
+    "grading_llm_cost_usd_total", "Estimated chat model spend in USD, from LLM_PRICES_PER_MTOK"
+)
+grading_react_iterations = registry.histogram(
+    "grading_react_iterations", "Model turns per ReAct agent run", buckets=ITERATION_BUCKETS
+)
+grading_budget_exhausted = registry.counter(
+    "grading_budget_exhausted_total", "Agent runs stopped by a budget (tool_calls/tokens/deadline)"
+)
+grading_degraded_scores = registry.counter(
+    "grading_degraded_scores_total", "Best-effort scores after a stopped run, by how they were made (model/heuristic)"
+)
+grading_budget_limit = registry.gauge("grading_budget_limit", "Configured per-run agent budgets")
+grading_path = registry.counter(
+    "grading_path_total", "How courses were scored: retrieval (one model call) or agent (ReAct fallback)"
+)
+evidence_source_duration = registry.histogram(
+    "evidence_source_duration_seconds", "Wall time of each evidence source lookup"
+)
+evidence_source_fetches = registry.counter(
+    "evidence_source_fetches_total", "Evidence source lookups by source and outcome (ok/timeout/error)"
+)
+grading_refreshes = registry.counter(
+    "grading_refreshes_total", "Cached courses re-checked, by outcome (extended/regraded/graded/skipped)"
+)
+
+def llm_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """Estimated USD cost of one call; 0 for models without a price entry"""
+    for name, (input_price, output_price) in LLM_PRICES_PER_MTOK.items():
+        # Dated snapshots ("gpt-5-mini-2025-08-07") price like their base model
+        if model == name or model.startswith(name + "-2"):
+            return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+    return 0.0
+
+def record_llm_usage(model: str, input_tokens: int, output_tokens: int) -> None:
+    grading_llm_calls.inc(model=model)
+    grading_llm_tokens.inc(input_tokens, model=model, direction="input")
+    grading_llm_tokens.inc(output_tokens, model=model, direction="output")
+    grading_llm_cost.inc(llm_cost(model, input_tokens, output_tokens), model=model)
+
+def timed_node(name: str, node: Callable) -> Callable:
+    """Wrap an async graph node so its wall time lands in grading_node_duration_seconds"""
+    async def run(state):
+        start = time.perf_counter()
+        try:
+            return await node(state)
+        finally:
+            grading_node_duration.observe(time.perf_counter() - start, node=name)
+    run.__name__ = node.__name__
+    run.__doc__ = node.__doc__
+    return run
+
+def stats_metrics(prefix: str, help: str, stats: Dict[str, float], counters: Iterable[str] = ()) -> list[_Metric]:
+    """Metrics for a component's stats() dict: names in counters become
+    <prefix>_<name>_total counters, everything else a gauge"""
+    counters = set(counters)
+    metrics = []
+    for name, value in stats.items():
+        if name in counters:
+            metric = Counter(f"{prefix}_{name}_total", f"{help}: {name.replace('_', ' ')}")
+            metric.inc(value)
+        else:
+            metric = Gauge(f"{prefix}_{name}", f"{help}: {name.replace('_', ' ')}")
+            metric.set(value)
+        metrics.append(metric)
+    return metrics
@@ -2,7 +2,9 @@ from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from course_identity import canonical_course_id
 
 
 class User(BaseModel):
@@ -66,29 +68,106 @@ class CoursesCompareResult(BaseModel):
     rankedCourses: List[str]           # courseIds best → worst
     scores: Dict[str, float]           # courseId → composite score
 
+HHMM = r"^\s*\d{1,2}(:\d{2})?\s*$"
+
+class SectionMeeting(BaseModel):
+    day: str                           # "M", "Tue", "R", "Fri", ...
+    start: str                         # "HH:MM", 24h
+    end: str
+
+class SectionOption(BaseModel):
+    sectionId: str
+    credits: Optional[int] = None      # defaults to the course's credit hours
+    meetings: List[SectionMeeting] = []
+
+class ScheduleConstraints(BaseModel):
+    maxCredits: Optional[int] = Field(None, ge=0)
+    minCredits: Optional[int] = Field(None, ge=0)
+    noFri: bool = False
+    noDays: List[str] = []             # "M", "Tue", "R", "Fri", ...
+    earliestStart: Optional[str] = Field(None, pattern=HHMM)
+    latestEnd: Optional[str] = Field(None, pattern=HHMM)
+    required: Optional[List[str]] = None   # courseIds that must be placed; all of them by default
+
+    @field_validator("required")
+    @classmethod
+    def canonical_courses(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        return None if v is None else [canonical_course_id(c) for c in v]
+
 class ScheduleLoadRequest(BaseModel):
     courseIds: List[str]
-    constraints: Optional[Dict[str, Any]] = Field(
-        default_factory=lambda: {"maxCredits": 18, "noFri": False}
+    constraints: Optional[ScheduleConstraints] = Field(
+        default_factory=lambda: ScheduleConstraints(maxCredits=18)
     )
+    sections: Optional[Dict[str, List[SectionOption]]] = None   # courseId → candidate sections
+    topK: int = Field(5, ge=1, le=50)
+
+class ScheduleOption(BaseModel):
+    items: List["ScheduleItem"]
+    credits: int
+    weeklyHours: float
+    avgRigor: float
+    daysOnCampus: int
+    campusHours: float                 # first class to last class, summed over days
+    score: float                       # lower is lighter
 
 class ScheduleLoadResult(BaseModel):
     weeklyHours: float
     byCourse: Dict[str, float]         # courseId → hours/week
 
+class SimilarCourse(BaseModel):
+    courseId: str
+    similarity: float                  # 0-1, higher is more alike
+    score: int
+    time_load: float
+    tags: List[str] = []
+
+class SimilarCoursesResult(BaseModel):
+    courseId: str
+    score: int
+    neighbors: List[SimilarCourse]     # most similar first
+
+class CoursePrerequisites(BaseModel):
+    courseId: str
+    prereqs: List[List[str]]           # all of these, each satisfied by any one of its courses
+    coreqs: List[List[str]]            # the same, but may be taken alongside
+    allPrereqs: List[str]              # every course that could be required first, transitively
+
+class CourseUnlocks(BaseModel):
+    courseId: str
+    unlocked: List[str]                # prerequisites newly met by taking courseId on top of completed
+    leadsTo: List[str]                 # every course that (transitively) builds on courseId
+
 # --- Schedules ---
 class ScheduleItem(BaseModel):
     courseId: str
     sectionId: Optional[str] = None
 
+    # "CSE-2221", "cse 2221" and "CSE2221" are all stored as "CSE 2221"
+    @field_validator("courseId")
+    @classmethod
+    def canonical_course(cls, v: str) -> str:
+        return canonical_course_id(v)
+
 class SchedulePayload(BaseModel):
     name: Optional[str] = "Untitled"
     items: List[ScheduleItem]
     favorite: bool = False
+    # When given, the schedule is checked against the prerequisite graph
+    completedCourses: Optional[List[str]] = None
+
+    @field_validator("completedCourses")
+    @classmethod
+    def canonical_courses(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        return None if v is None else [canonical_course_id(c) for c in v]
+
+class ScheduleBatchItem(SchedulePayload):
+    userId: str
 
 class ScheduleSaved(BaseModel):
     scheduleId: str
     userId: str
     name: str
     items: List[ScheduleItem]
-    favorite: bool
\ No newline at end of file
+    favorite: bool
+    updatedAt: Optional[datetime] = None
@@ -0,0 +1,395 @@
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+from agents.class_score import ClassScore
+from agents.class_score_cache import class_score_cache, sqlite_path_from_url
+from config import settings
+from course_identity import CourseId, course_index, parse_course_id
+from metrics import registry, stats_metrics
+
+# Each requirement is a list of clauses that must all hold; a clause is a set
+# of alternatives, any one of which satisfies it ("STAT 3460 or STAT 3470").
+# In memory a clause is an int bitset over course indexes, and every course
+# carries the precomputed transitive closure of what it can require and what
+# can require it, so checks are a few ANDs per course (same idea as the
+# weekly-time bitsets in schedule_solver).
+
+# A course number with an optional subject in front: "CSE 2231", "Stat 3470", "2321", "Math 1151H"
+COURSE_REF_RE = re.compile(r"(?:\b([A-Za-z][A-Za-z&]*))?[\s\-]*\b(\d{4}(?:H|\.\d{2})?)\b")
+SENTENCE_SPLIT_RE = re.compile(r"\.(?=\s|$)")
+CLAUSE_SPLIT_RE = re.compile(r",|;|\band\b", re.IGNORECASE)
+CONCURRENT_RE = re.compile(r"^\s*(concur|coreq|co-req)", re.IGNORECASE)
+ALTERNATIVE_SPLIT_RE = re.compile(r"\bor\b|/", re.IGNORECASE)
+# Words that precede course numbers without being subjects
+NOT_SUBJECTS = frozenset(
+    "prereq prereqs prerequisite prerequisites coreq coreqs concur concurrent concurrently enrollment in of "
+    "or and either both with grade better than level completion credit for one any course courses".split()
+)
+
+Clause = List[str]
+
+def parse_requirements(texts: Iterable[str], subject: str, concurrent: bool = False) -> List[Clause]:
+    """Clauses of course ids from free-text requirements.
+
+    Bare numbers take the subject named before them, or `subject` (the
+    course's own) at the start: with subject "CSE", "2231, 2321, and Stat
+    3460 or 3470" gives [["CSE 2231"], ["CSE 2321"], ["STAT 3460", "STAT 3470"]].
+    Parenthesized notes are ignored; text naming no course is dropped, and
+    so are "Concur: ..." sentences unless parsing co-requisites.
+    """
+    clauses: List[Clause] = []
+    for text in texts:
+        current = subject
+        for sentence in SENTENCE_SPLIT_RE.split(re.sub(r"\([^)]*\)", " ", text)):
+            if not concurrent and CONCURRENT_RE.match(sentence):
+                continue
+            current = _parse_sentence(sentence, current, clauses)
+    return clauses
+
+def _parse_sentence(sentence: str, current: str, clauses: List[Clause]) -> str:
+    """Append the sentence's clauses; returns the subject in effect at its end"""
+    for part in CLAUSE_SPLIT_RE.split(sentence):
+        clause: Clause = []
+        for alternative in ALTERNATIVE_SPLIT_RE.split(part):
+            for word, number in COURSE_REF_RE.findall(alternative):
+                if word and word.lower() not in NOT_SUBJECTS:
+                    current = word.upper()
+                try:
+                    course = str(parse_course_id(f"{current} {number}"))
+                except ValueError:
+                    continue
+                if course not in clause:
+                    clause.append(course)
+        if clause and clause not in clauses:
+            clauses.append(clause)
+    return current
+
+@dataclass
+class Requirements:
+    course_id: str
+    prereqs: List[Clause] = field(default_factory=list)
+    coreqs: List[Clause] = field(default_factory=list)
+
+class _Closures:
+    """Immutable closure index over one version of the requirements.
+
+    Built off the event loop and swapped in whole, so queries read a
+    consistent snapshot without locking and never pay for a rebuild.
+    """
+
+    def __init__(self, requirements: dict[str, Requirements]):
+        self.index: dict[str, int] = {}
+        self.keys: List[str] = []
+        self.course_ids: List[str] = []
+        keys: dict[str, str] = {}
+        for reqs in requirements.values():
+            self._node(reqs.course_id, keys)
+        prereqs = {
+            key: [[self._node(c, keys) for c in clause] for clause in reqs.prereqs]
+            for key, reqs in requirements.items()
+        }
+        coreqs = {
+            key: [[self._node(c, keys) for c in clause] for clause in reqs.coreqs]
+            for key, reqs in requirements.items()
+        }
+        self.prereq_masks = {key: [_mask_of(clause) for clause in clauses] for key, clauses in prereqs.items()}
+        self.coreq_masks = {key: [_mask_of(clause) for clause in clauses] for key, clauses in coreqs.items()}
+
+        n = len(self.keys)
+        direct: List[List[int]] = [[] for _ in range(n)]  # everything a course names as a prerequisite
+        dependents: List[List[int]] = [[] for _ in range(n)]
+        for key, clauses in prereqs.items():
+            i = self.index[key]
+            direct[i] = sorted({j for clause in clauses for j in clause})
+            for j in direct[i]:
+                dependents[j].append(i)
+
+        self.dependents = [_mask_of(nodes) for nodes in dependents]
+        self.ancestors = _closure(direct)
+        self.descendants = _closure(dependents)
+
+    def _node(self, course_id: str, keys: dict[str, str]) -> int:
+        key = keys.get(course_id)
+        if key is None:
+            key = keys[course_id] = parse_course_id(course_id).key
+        if key not in self.index:
+            self.index[key] = len(self.keys)
+            self.keys.append(key)
+            self.course_ids.append(course_id)
+        return self.index[key]
+
+    def mask(self, course_ids: Iterable[str]) -> int:
+        mask = 0
+        for course_id in course_ids:
+            try:
+                index = self.index.get(parse_course_id(course_id).key)
+            except ValueError:
+                continue
+            if index is not None:
+                mask |= 1 << index
+        return mask
+
+    def names(self, mask: int) -> List[str]:
+        return sorted(self.course_ids[i] for i in _bits(mask))
+
+    def satisfied(self, key: str, have: int) -> bool:
+        return all(mask & have for mask in self.prereq_masks.get(key, ()))
+
+class PrerequisiteGraph:
+    """Course dependency graph, persisted to SQLite, with bitset closures.
+
+    Requirements are written through to the table as courses are rated and
+    read back on load. Any change marks the closure index stale; refresh()
+    builds a new one from a copy of the requirements and swaps it in. Queries
+    always read the current index, which may lag the newest ratings until the
+    next refresh, and never rebuild it themselves.
+    """
+
+    def __init__(self, db_path: str | None):
+        self.db_path = db_path
+        self._requirements: dict[str, Requirements] = {}
+        # Guards _requirements and the version counters; never held across I/O or a build
+        self._lock = threading.Lock()
+        # Serializes use of the SQLite connection
+        self._db_lock = threading.Lock()
+        # One build at a time; a second refresh waits and finds the index fresh
+        self._build_lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self.loaded = False
+
+        self._version = 0
+        self._built_version = -1
+        self._closures = _Closures({})
+
+    # ---------------------------------------------------------
+    # Durable tier
+    # ---------------------------------------------------------
+
+    def _db(self) -> sqlite3.Connection | None:
+        if self.db_path is None:
+            return None
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS course_requirements (
+                    course_key TEXT PRIMARY KEY,
+                    course_id TEXT NOT NULL,
+                    prereqs TEXT NOT NULL,
+                    coreqs TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+        return self._conn
+
+    def load(self, scores: Iterable[Tuple[CourseId, ClassScore]] = ()) -> int:
+        """Read stored requirements, then parse any of `scores` not stored yet;
+        returns how many courses have requirements"""
+        with self._db_lock:
+            db = self._db()
+            stored = [] if db is None else db.execute(
+                "SELECT course_id, prereqs, coreqs FROM course_requirements"
+            ).fetchall()
+        with self._lock:
+            for course_id, prereqs, coreqs in stored:
+                self._requirements.setdefault(
+                    parse_course_id(course_id).key, Requirements(course_id, json.loads(prereqs), json.loads(coreqs))
+                )
+            self._version += 1
+        for course, score in scores:
+            if course.key not in self._requirements:
+                self.update(course, score)
+        with self._lock:
+            self.loaded = True
+            return len(self._requirements)
+
+    def update(self, course: CourseId, score: ClassScore) -> Requirements:
+        """Parse a rated course's pre_reqs/co_reqs into the graph and store them"""
+        requirements = Requirements(
+            str(course),
+            parse_requirements(score.pre_reqs, course.subject),
+            parse_requirements(score.co_reqs, course.subject, concurrent=True),
+        )
+        with self._lock:
+            if self._requirements.get(course.key) == requirements:
+                return requirements
+            self._requirements[course.key] = requirements
+            self._version += 1
+        with self._db_lock:
+            db = self._db()
+            if db is not None:
+                # Whatever is current by now, so racing updates can't store an older one last
+                with self._lock:
+                    latest = self._requirements[course.key]
+                db.execute(
+                    "INSERT OR REPLACE INTO course_requirements VALUES (?, ?, ?, ?)",
+                    (course.key, latest.course_id, json.dumps(latest.prereqs), json.dumps(latest.coreqs)),
+                )
+                db.commit()
+        return requirements
+
+    # ---------------------------------------------------------
+    # Closure index
+    # ---------------------------------------------------------
+
+    @property
+    def stale(self) -> bool:
+        return self._built_version != self._version
+
+    def refresh(self) -> None:
+        """Build and swap in a new closure index if anything changed since the
+        last build. Slow at catalog scale: call it off the event loop."""
+        with self._build_lock:
+            with self._lock:
+                if self._built_version == self._version:
+                    return
+                version, requirements = self._version, dict(self._requirements)
+            closures = _Closures(requirements)
+            # A single reference swap: queries see the old index or the new one, never a mix
+            self._closures, self._built_version = closures, version
+
+    # ---------------------------------------------------------
+    # Queries
+    # ---------------------------------------------------------
+
+    def requirements(self, course: CourseId) -> Optional[Requirements]:
+        with self._lock:
+            return self._requirements.get(course.key)
+
+    def all_prereqs(self, course: CourseId) -> List[str]:
+        """Every course that could be required before this one, directly or transitively"""
+        closures = self._closures
+        index = closures.index.get(course.key)
+        return [] if index is None else closures.names(closures.ancestors[index])
+
+    def unlocks(self, course: CourseId, completed: Iterable[str] = ()) -> Tuple[List[str], List[str]]:
+        """(courses whose prerequisites become met by taking `course` on top of
+        `completed`, every course it leads to transitively)"""
+        closures = self._closures
+        index = closures.index.get(course.key)
+        if index is None:
+            return [], []
+        have = closures.mask(completed)
+        with_course = have | (1 << index)
+        unlocked = [
+            closures.course_ids[i] for i in _bits(closures.dependents[index])
+            if closures.satisfied(closures.keys[i], with_course) and not closures.satisfied(closures.keys[i], have)
+        ]
+        return sorted(unlocked), closures.names(closures.descendants[index])
+
+    def unmet(self, course_ids: List[str], completed: Iterable[str]) -> List[dict]:
+        """Requirements a schedule leaves unmet: prerequisites must be among
+        `completed`; co-requisites may also be in the schedule itself. Courses
+        without known requirements, and ids that aren't course ids, always pass."""
+        closures = self._closures
+        have = closures.mask(completed)
+        scheduled = have | closures.mask(course_ids)
+        problems = []
+        for course_id in course_ids:
+            course = course_index.get(course_id)
+            if course is None:
+                # Items aren't required to be course ids; nothing is known about these
+                continue
+            key = course.key
+            missing = [
+                closures.names(mask) for mask in closures.prereq_masks.get(key, ()) if not mask & have
+            ] + [
+                closures.names(mask) for mask in closures.coreq_masks.get(key, ()) if not mask & scheduled
+            ]
+            if missing:
+                problems.append({"courseId": course_id, "missing": missing})
+        return problems
+
+    def stats(self) -> dict:
+        return {"courses": len(self._requirements), "nodes": len(self._closures.keys)}
+
+def _bits(mask: int) -> Iterable[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def _mask_of(nodes: Iterable[int]) -> int:
+    mask = 0
+    for node in nodes:
+        mask |= 1 << node
+    return mask
+
+def _closure(edges: List[List[int]]) -> List[int]:
+    """Transitive closure, as bitsets, of a graph given as adjacency lists.
+
+    Nodes are resolved in topological order (each after everything it
+    points to); whatever sits on a cycle is finished by iterating to a
+    fixed point.
+    """
+    n = len(edges)
+    closure = [0] * n
+    pending = [len(targets) for targets in edges]
+    pointed_by: List[List[int]] = [[] for _ in range(n)]
+    for i, targets in enumerate(edges):
+        for j in targets:
+            pointed_by[j].append(i)
+
+    def reach(i: int) -> int:
+        mask = 0
+        for j in edges[i]:
+            mask |= (1 << j) | closure[j]
+        return mask
+
+    ready = [i for i in range(n) if pending[i] == 0]
+    done = [False] * n
+    while ready:
+        i = ready.pop()
+        done[i] = True
+        closure[i] = reach(i)
+        for k in pointed_by[i]:
+            pending[k] -= 1
+            if pending[k] == 0:
+                ready.append(k)
+
+    cyclic = [i for i in range(n) if not done[i]]
+    changed = True
+    while changed:
+        changed = False
+        for i in cyclic:
+            mask = reach(i)
+            if mask != closure[i]:
+                closure[i] = mask
+                changed = True
+    return closure
+
+prerequisite_graph = PrerequisiteGraph(sqlite_path_from_url(settings.class_score_cache_url or settings.database_url))
+registry.collector(lambda: stats_metrics("prerequisite_graph", "Prerequisite graph", prerequisite_graph.stats()))
+
+_load_lock = asyncio.Lock()
+
+def _rated_courses():
+    for key, score in class_score_cache.scores():
+        try:
+            yield parse_course_id(key), score
+        except ValueError:
+            continue
+
+_refresh_task: Optional[asyncio.Future] = None
+
+async def loaded_prerequisite_graph() -> PrerequisiteGraph:
+    """The graph with its index built, loaded on first use from its table plus
+    any rated course not in it yet"""
+    global _refresh_task
+    if not prerequisite_graph.loaded:
+        async with _load_lock:
+            if not prerequisite_graph.loaded:
+                await asyncio.to_thread(prerequisite_graph.load, _rated_courses())
+    if prerequisite_graph.stale:
+        # Newly rated courses changed the graph: rebuild off the event loop,
+        # with every request that arrives meanwhile waiting on the same build
+        if _refresh_task is None or _refresh_task.done():
+            _refresh_task = asyncio.ensure_future(asyncio.to_thread(prerequisite_graph.refresh))
+        await asyncio.shield(_refresh_task)
+    return prerequisite_graph
@@ -1,9 +1,17 @@
 # routers.py
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
 from typing import List, Optional, Dict, Any
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 # Use your existing user models
-from models import User, UserCreate, UserUpdate, ScheduleLoadRequest, ScheduleLoadResult, ScheduleSaved, ScheduleItem, SchedulePayload
+from models import User, UserCreate, UserUpdate, LoginRequest, Token, ScheduleLoadRequest, ScheduleLoadResult, ScheduleSaved, ScheduleItem, SchedulePayload, ScheduleBatchItem
 from pydantic import BaseModel, Field
+import crud
+from auth import AuthenticatedUser, HasherBusy, create_access_token, current_user, password_hasher
+from config import settings
+from database import get_session
+from http_caching import conditional_json
+from prerequisites import loaded_prerequisite_graph
 
 # ---------------------------------------------------------
 # Routers
@@ -15,37 +23,102 @@ users_router    = APIRouter(prefix="/users",    tags=["users"])
 # SCHEDULE
 # =======================
 
+def _schedules_response(request: Request, content):
+    # Schedules change whenever the user edits them: clients may keep a copy but must revalidate.
+    # ETag only: no Last-Modified, since deleting a schedule (or unsetting a
+    # favorite) leaves the newest remaining updatedAt where it was
+    return conditional_json(request, content, cache_control="private, no-cache")
+
+async def _unmet_requirements(body: SchedulePayload) -> Optional[list]:
+    """The schedule's courses whose requirements completedCourses (or, for
+    co-requisites, the schedule itself) doesn't meet; None when not checked"""
+    if body.completedCourses is None:
+        return None
+    graph = await loaded_prerequisite_graph()
+    return graph.unmet([item.courseId for item in body.items], body.completedCourses)
+
+async def _check_requirements(body: SchedulePayload) -> None:
+    unmet = await _unmet_requirements(body)
+    if unmet:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"message": "Schedule has unmet course requirements", "unmet": unmet},
+        )
+
+# Registered ahead of /{userId}, which would otherwise take "favorites" as a user id
+@schedule_router.get(
+    "/favorites",
+    response_model=Dict[str, Optional[ScheduleSaved]],
+    summary="Gets many users' favorite schedules at once",
+)
+async def get_favorite_schedules(
+    request: Request,
+    userIds: List[str] = Query(..., min_length=1, max_length=settings.schedule_batch_max),
+    session: AsyncSession = Depends(get_session),
+):
+    favorites = await crud.get_favorite_schedules(session, list(dict.fromkeys(userIds)))
+    return _schedules_response(request, favorites)
+
+@schedule_router.post(
+    "/batch",
+    response_model=List[ScheduleSaved],
+    status_code=status.HTTP_201_CREATED,
+    summary="Saves many schedules, for any users, in one transaction",
+)
+async def save_schedules(
+    body: List[ScheduleBatchItem] = Body(..., max_length=settings.schedule_batch_max),
+    session: AsyncSession = Depends(get_session),
+):
+    failing = []
+    for index, item in enumerate(body):
+        unmet = await _unmet_requirements(item)
+        if unmet:
+            failing.append({"index": index, "userId": item.userId, "unmet": unmet})
+    if failing:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"message": "Schedules have unmet course requirements", "schedules": failing},
+        )
+    try:
+        return await crud.save_schedules(session, [(item.userId, item) for item in body])
+    except IntegrityError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Schedules changed concurrently, try again")
+
 @schedule_router.get(
     "/{userId}",
     response_model=List[ScheduleSaved],
-    summary="Gets all of the user's saved schedules",
+    summary="Gets the user's saved schedules, all of them or a page at a time",
 )
-async def get_user_schedules(userId: str):
-    # TODO: query Postgres
-    return [
-        ScheduleSaved(
-            scheduleId="sch_1",
-            userId=userId,
-            name="Spring Plan",
-            items=[ScheduleItem(courseId="CSE-2221", sectionId="001")],
-            favorite=False,
+async def get_user_schedules(
+    userId: str,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=settings.schedule_page_max),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    session: AsyncSession = Depends(get_session),
+):
+    if limit is None and cursor is None:
+        schedules = await crud.list_schedules(session, userId)
+        return _schedules_response(request, schedules)
+
+    try:
+        schedules, next_cursor = await crud.list_schedules_page(
+            session, userId, limit or settings.schedule_page_size, cursor
         )
-    ]
+    except crud.InvalidCursor:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    response = _schedules_response(request, schedules)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
 
 @schedule_router.get(
     "/favorite/{userId}",
     response_model=Optional[ScheduleSaved],
     summary="Gets the user's favorite schedule",
 )
-async def get_favorite_schedule(userId: str):
-    # TODO: query favorite in Postgres
-    return ScheduleSaved(
-        scheduleId="sch_fav",
-        userId=userId,
-        name="Favorite Plan",
-        items=[ScheduleItem(courseId="CSE-3901", sectionId="002")],
-        favorite=True,
-    )
+async def get_favorite_schedule(userId: str, request: Request, session: AsyncSession = Depends(get_session)):
+    schedule = await crud.get_favorite_schedule(session, userId)
+    return _schedules_response(request, schedule)
 
 @schedule_router.put(
     "/save/{userId}",
@@ -53,15 +126,12 @@ async def get_favorite_schedule(userId: str):
     status_code=status.HTTP_201_CREATED,
     summary="Saves a schedule",
 )
-async def save_schedule(userId: str, body: SchedulePayload):
-    # TODO: upsert schedule
-    return ScheduleSaved(
-        scheduleId="sch_new",
-        userId=userId,
-        name=body.name or "Untitled",
-        items=body.items,
-        favorite=body.favorite,
-    )
+async def save_schedule(userId: str, body: SchedulePayload, session: AsyncSession = Depends(get_session)):
+    await _check_requirements(body)
+    try:
+        return await crud.save_schedule(session, userId, body)
+    except IntegrityError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Schedule changed concurrently, try again")
 
 @schedule_router.post(
     "/add/{userId}",
@@ -69,15 +139,12 @@ async def save_schedule(userId: str, body: SchedulePayload):
     status_code=status.HTTP_201_CREATED,
     summary="Add a schedule",
 )
-async def add_schedule(userId: str, body: SchedulePayload):
-    # TODO: insert new schedule
-    return ScheduleSaved(
-        scheduleId="sch_added",
-        userId=userId,
-        name=body.name or "Untitled",
-        items=body.items,
-        favorite=body.favorite,
-    )
+async def add_schedule(userId: str, body: SchedulePayload, session: AsyncSession = Depends(get_session)):
+    await _check_requirements(body)
+    try:
+        return await crud.add_schedule(session, userId, body)
+    except IntegrityError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Schedule name already in use")
 
 # Added: delete schedule
 @schedule_router.delete(
@@ -85,50 +152,121 @@ async def add_schedule(userId: str, body: SchedulePayload):
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete a schedule",
 )
-async def delete_schedule(userId: str, scheduleId: str):
-    # TODO: delete in Postgres; 404 if not found
-    return
+async def delete_schedule(userId: str, scheduleId: str, session: AsyncSession = Depends(get_session)):
+    if not await crud.delete_schedule(session, userId, scheduleId):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Schedule not found")
 
 # =======================
 # USERS
 # =======================
 
+async def _hash_password(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except HasherBusy as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e), headers={"Retry-After": "5"})
+
+def _own_account(userId: int, me: AuthenticatedUser) -> None:
+    if me.id != userId:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not your account")
+
 @users_router.post(
     "/",
     response_model=User,
     status_code=status.HTTP_201_CREATED,
     summary="Create a new user",
 )
-async def create_user(user: UserCreate):
-    # TODO: persist & hash password
-    return User(id=1, username=user.username, email=user.email)
+async def create_user(user: UserCreate, session: AsyncSession = Depends(get_session)):
+    hashed_password = await _hash_password(user.password)
+    try:
+        return await crud.create_user(session, user, hashed_password)
+    except IntegrityError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username or email already in use")
+
+@users_router.post(
+    "/register",
+    response_model=Token,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create a new user and sign them in",
+)
+async def register(user: UserCreate, session: AsyncSession = Depends(get_session)):
+    return create_access_token(await create_user(user, session))
+
+@users_router.post(
+    "/login",
+    response_model=Token,
+    summary="Exchange a username or email and password for an access token",
+)
+async def login(body: LoginRequest, session: AsyncSession = Depends(get_session)):
+    found = await crud.get_login(session, body.username_or_email)
+    user, hashed_password = found if found else (None, None)
+    try:
+        # Unknown users still cost one bcrypt check, so timing doesn't reveal which usernames exist
+        valid = await password_hasher.verify(body.password, hashed_password)
+    except HasherBusy as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e), headers={"Retry-After": "5"})
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username/email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return create_access_token(user)
+
+@users_router.get(
+    "/me",
+    response_model=User,
+    summary="Get the signed-in user",
+)
+async def get_me(me: AuthenticatedUser = Depends(current_user), session: AsyncSession = Depends(get_session)):
+    user = await crud.get_user(session, me.id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
 
 @users_router.get(
     "/{userId}",
     response_model=User,
     summary="Get a user by ID",
 )
-async def get_user(userId: int):
-    # TODO: fetch from Postgres
-    return User(id=userId, username="sample", email="sample@example.com")
+async def get_user(userId: int, session: AsyncSession = Depends(get_session)):
+    user = await crud.get_user(session, userId)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
 
 @users_router.put(
     "/{userId}",
     response_model=User,
     summary="Update a user by ID",
 )
-async def update_user(userId: int, user: UserUpdate):
-    # TODO: partial update
-    return User(id=userId, username=user.username or "sample", email=user.email or "sample@example.com")
+async def update_user(
+    userId: int,
+    user: UserUpdate,
+    me: AuthenticatedUser = Depends(current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    _own_account(userId, me)
+    hashed_password = await _hash_password(user.password) if user.password is not None else None
+    try:
+        updated = await crud.update_user(session, userId, user, hashed_password)
+    except IntegrityError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username or email already in use")
+    if updated is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return updated
 
 @users_router.delete(
     "/{userId}",
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete a user by ID",
 )
-async def delete_user(userId: int):
-    # TODO: delete; 404 if not found
-    return
+async def delete_user(
+    userId: int, me: AuthenticatedUser = Depends(current_user), session: AsyncSession = Depends(get_session)
+):
+    _own_account(userId, me)
+    if not await crud.delete_user(session, userId):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
 # =======================
 # Helper to attach to FastAPI app
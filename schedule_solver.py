@@ -0,0 +1,255 @@
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from agents.class_score import ClassScore
+from models import ScheduleItem, ScheduleOption, SectionOption
+
+# Weekly time is a bitset: 7 days x 288 five-minute slots, one bit per slot
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+DAY_MASK = (1 << SLOTS_PER_DAY) - 1
+DAYS = {
+    "M": 0, "MO": 0, "MON": 0, "MONDAY": 0,
+    "T": 1, "TU": 1, "TUE": 1, "TUES": 1, "TUESDAY": 1,
+    "W": 2, "WE": 2, "WED": 2, "WEDNESDAY": 2,
+    "R": 3, "TH": 3, "THU": 3, "THUR": 3, "THURS": 3, "THURSDAY": 3,
+    "F": 4, "FR": 4, "FRI": 4, "FRIDAY": 4,
+    "SA": 5, "SAT": 5, "SATURDAY": 5,
+    "U": 6, "SU": 6, "SUN": 6, "SUNDAY": 6,
+}
+
+# Score weights: per-course load is time_load hours plus rigor/25 (a rigor of
+# 100 counts like 4 more hours). Each day on campus and each hour between a
+# day's first and last class add a little on top, so compact schedules win
+# ties. Both only grow as classes are added, which keeps the bound admissible.
+RIGOR_PER_HOUR = 25
+DAY_WEIGHT = 0.5
+CAMPUS_WEIGHT = 0.25
+
+# Search budget; past it the best schedules found so far are returned
+MAX_NODES = 250_000
+
+def _minutes(hhmm: str) -> int:
+    hours, _, minutes = hhmm.strip().partition(":")
+    value = int(hours) * 60 + int(minutes or 0)
+    if not 0 <= value <= 24 * 60:
+        raise ValueError(f"Bad time {hhmm!r}")
+    return value
+
+def day_index(day: str) -> int:
+    try:
+        return DAYS[day.strip().upper()]
+    except KeyError:
+        raise ValueError(f"Unknown day {day!r}")
+
+def slot_mask(day: int, start: int, end: int) -> int:
+    """Bits for [start, end) minutes on a day"""
+    first, last = start // SLOT_MINUTES, -(-end // SLOT_MINUTES)
+    return ((1 << (last - first)) - 1) << (day * SLOTS_PER_DAY + first)
+
+def section_mask(section: SectionOption) -> tuple[int, int]:
+    """(time-slot bitset, day bitset) for a section's meetings"""
+    mask = days = 0
+    for meeting in section.meetings:
+        start, end = _minutes(meeting.start), _minutes(meeting.end)
+        if end <= start:
+            raise ValueError(f"Section {section.sectionId}: meeting ends before it starts")
+        day = day_index(meeting.day)
+        mask |= slot_mask(day, start, end)
+        days |= 1 << day
+    return mask, days
+
+def day_span(mask: int, day: int) -> int:
+    """Slots from a day's first class to the end of its last"""
+    bits = (mask >> (day * SLOTS_PER_DAY)) & DAY_MASK
+    if not bits:
+        return 0
+    return bits.bit_length() - ((bits & -bits).bit_length() - 1)
+
+def forbidden_mask(constraints: Dict) -> int:
+    """Slots no section may use, from noFri / noDays / earliestStart / latestEnd"""
+    mask = 0
+    days = [day_index(d) for d in constraints.get("noDays") or []]
+    if constraints.get("noFri"):
+        days.append(DAYS["F"])
+    for day in days:
+        mask |= DAY_MASK << (day * SLOTS_PER_DAY)
+    earliest, latest = constraints.get("earliestStart"), constraints.get("latestEnd")
+    for day in range(7):
+        if earliest:
+            mask |= slot_mask(day, 0, _minutes(earliest))
+        if latest and _minutes(latest) < 24 * 60:
+            mask |= slot_mask(day, _minutes(latest), 24 * 60)
+    return mask
+
+@dataclass
+class _Section:
+    section_id: Optional[str]
+    mask: int
+    days: int
+    day_list: List[int]
+    credits: int
+
+@dataclass
+class _Course:
+    course_id: str
+    load: float
+    rigor: float
+    hours: float
+    required: bool
+    sections: List[_Section] = field(default_factory=list)
+
+def solve_schedules(
+    course_ids: List[str],
+    scores: Dict[str, ClassScore],
+    sections: Optional[Dict[str, List[SectionOption]]] = None,
+    constraints: Optional[Dict] = None,
+    top_k: int = 5,
+    max_nodes: int = MAX_NODES,
+) -> List[ScheduleOption]:
+    """Top-k lightest feasible schedules.
+
+    Each course gets one of its sections (a course without listed sections is
+    placed as a single unscheduled section). Courses in constraints["required"]
+    (all courses by default) must be placed; others may be dropped. Feasible
+    schedules have no time conflicts, respect maxCredits/minCredits and the
+    day/time exclusions, and are ranked by most credits, then lowest score.
+
+    Branch and bound over weekly time-slot bitsets: conflicts and credit caps
+    prune partial schedules, and a partial schedule whose best possible
+    outcome can't beat the current k-th best is abandoned. Raises ValueError
+    for malformed days/times.
+    """
+    constraints = constraints or {}
+    sections = sections or {}
+    max_credits = constraints.get("maxCredits")
+    min_credits = constraints.get("minCredits") or 0
+    required = set(constraints.get("required") or course_ids)
+    forbidden = forbidden_mask(constraints)
+
+    courses: List[_Course] = []
+    for course_id in dict.fromkeys(course_ids):
+        score = scores[course_id]
+        course = _Course(
+            course_id=course_id,
+            load=score.time_load + score.rigor / RIGOR_PER_HOUR,
+            rigor=score.rigor,
+            hours=score.time_load or score.ch,
+            required=course_id in required,
+        )
+        for option in sections.get(course_id) or [SectionOption(sectionId="")]:
+            mask, days = section_mask(option)
+            if mask & forbidden:
+                continue
+            day_list = [d for d in range(7) if days >> d & 1]
+            course.sections.append(_Section(option.sectionId or None, mask, days, day_list, option.credits or score.ch))
+        if not course.sections:
+            if course.required:
+                return []
+            continue
+        # Compact sections first, so good schedules are found early and prune more
+        course.sections.sort(key=lambda s: (len(s.day_list), sum(day_span(s.mask, d) for d in s.day_list)))
+        courses.append(course)
+
+    # Required courses first, most constrained first so conflicts prune early;
+    # then optional courses, lightest per credit first
+    courses.sort(key=lambda c: (
+        not c.required,
+        len(c.sections) if c.required else c.load / max(1, max(s.credits for s in c.sections)),
+    ))
+    n = len(courses)
+
+    # Suffix bounds: the load and credits required courses still add, the most
+    # credits still available, and the cheapest load per credit among the
+    # optional courses still to come
+    min_load_after = [0.0] * (n + 1)
+    min_credits_after = [0] * (n + 1)
+    max_credits_after = [0] * (n + 1)
+    load_per_credit_after = [float("inf")] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        course = courses[i]
+        most = max(s.credits for s in course.sections)
+        max_credits_after[i] = max_credits_after[i + 1] + most
+        if course.required:
+            min_load_after[i] = min_load_after[i + 1] + course.load
+            min_credits_after[i] = min_credits_after[i + 1] + min(s.credits for s in course.sections)
+            load_per_credit_after[i] = load_per_credit_after[i + 1]
+        else:
+            min_load_after[i] = min_load_after[i + 1]
+            min_credits_after[i] = min_credits_after[i + 1]
+            load_per_credit_after[i] = min(load_per_credit_after[i + 1], course.load / max(1, most))
+
+    # Min-heap whose root is the worst kept schedule: (credits, -score, tiebreak, picks)
+    best: List[tuple] = []
+    counter = itertools.count()
+    chosen: List[tuple] = []
+    nodes = 0
+    campus_hours_per_slot = SLOT_MINUTES / 60
+
+    def cost(load: float, days: int, span: int) -> float:
+        return load + DAY_WEIGHT * bin(days).count("1") + CAMPUS_WEIGHT * span * campus_hours_per_slot
+
+    def search(i: int, used: int, days: int, span: int, credits: int, load: float) -> None:
+        nonlocal nodes
+        nodes += 1
+        if nodes > max_nodes:
+            return
+
+        if len(best) == top_k:
+            worst_credits, worst_neg_score, _, _ = best[0]
+            best_credits = credits + max_credits_after[i]
+            if max_credits is not None:
+                best_credits = min(best_credits, max_credits)
+            if best_credits < worst_credits:
+                return
+            if best_credits == worst_credits:
+                # Matching the worst kept schedule's credits takes at least this much more load
+                optional_credits = max(0, worst_credits - credits - min_credits_after[i])
+                least_load = load + min_load_after[i] + optional_credits * load_per_credit_after[i] if optional_credits else load + min_load_after[i]
+                if cost(least_load, days, span) >= -worst_neg_score:
+                    return
+
+        if i == n:
+            if credits >= min_credits:
+                score = cost(load, days, span)
+                entry = (credits, -score, next(counter), list(chosen))
+                if len(best) < top_k:
+                    heapq.heappush(best, entry)
+                else:
+                    heapq.heapreplace(best, entry)
+            return
+
+        course = courses[i]
+        for section in course.sections:
+            if section.mask & used:
+                continue
+            if max_credits is not None and credits + section.credits > max_credits:
+                continue
+            new_used = used | section.mask
+            new_span = span + sum(day_span(new_used, d) - day_span(used, d) for d in section.day_list)
+            chosen.append((course, section))
+            search(i + 1, new_used, days | section.days, new_span, credits + section.credits, load + course.load)
+            chosen.pop()
+        if not course.required:
+            search(i + 1, used, days, span, credits, load)
+
+    search(0, 0, 0, 0, 0, 0.0)
+
+    options = []
+    for credits, neg_score, _, picks in sorted(best, key=lambda e: (-e[0], -e[1], e[2])):
+        used = days = 0
+        for _, section in picks:
+            used |= section.mask
+            days |= section.days
+        options.append(ScheduleOption(
+            items=[ScheduleItem(courseId=course.course_id, sectionId=section.section_id) for course, section in picks],
+            credits=credits,
+            weeklyHours=round(sum(course.hours for course, _ in picks), 2),
+            avgRigor=round(sum(course.rigor for course, _ in picks) / len(picks), 1) if picks else 0.0,
+            daysOnCampus=bin(days).count("1"),
+            campusHours=round(sum(day_span(used, d) for d in range(7)) * campus_hours_per_slot, 2),
+            score=round(-neg_score, 2),
+        ))
+    return options
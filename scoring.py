@@ -0,0 +1,68 @@
+import numpy as np
+from typing import Dict, List, Optional
+
+from agents.class_score import ClassScore
+from models import CoursesCompareResult, ScheduleLoadResult
+
+# Weight names accepted by /courses/compare, mapped to ClassScore axes.
+# Every axis is put on a 0-100 "harder is higher" scale before weighting.
+COMPARE_AXES = {
+    "difficulty": "score",
+    "workload": "time_load",
+    "rigor": "rigor",
+    "assessment": "assessment_intensity",
+    "projects": "project_intensity",
+    "pace": "pace",
+}
+AXIS_SCALE = {"time_load": 100 / 8}
+
+def score_matrix(scores: List[ClassScore], axes: List[str]) -> np.ndarray:
+    """Stack the requested axes of each ClassScore into an (n_courses, n_axes) matrix"""
+    matrix = np.array([[getattr(s, axis) for axis in axes] for s in scores], dtype=np.float64)
+    return matrix.reshape(len(scores), len(axes))
+
+def compare_courses(scores: Dict[str, ClassScore], weights: Optional[Dict[str, float]]) -> CoursesCompareResult:
+    """Rank courses easiest → hardest by a weighted composite of their axes.
+
+    Raises ValueError for unknown weight names or all-zero weights.
+    """
+    weights = weights or {"difficulty": 0.5, "workload": 0.5}
+    unknown = sorted(set(weights) - set(COMPARE_AXES))
+    if unknown:
+        raise ValueError(f"Unknown weights {unknown}; expected any of {sorted(COMPARE_AXES)}")
+
+    names = list(weights)
+    w = np.array([weights[name] for name in names], dtype=np.float64)
+    total = np.abs(w).sum()
+    if total == 0:
+        raise ValueError("At least one weight must be non-zero")
+    w /= total
+
+    course_ids = list(scores)
+    if not course_ids:
+        return CoursesCompareResult(rankedCourses=[], scores={})
+    axes = [COMPARE_AXES[n] for n in names]
+    scale = np.array([AXIS_SCALE.get(axis, 1.0) for axis in axes])
+    composite = (score_matrix([scores[c] for c in course_ids], axes) * scale) @ w
+    order = np.argsort(composite, kind="stable")
+    return CoursesCompareResult(
+        rankedCourses=[course_ids[i] for i in order],
+        scores={c: round(float(v), 2) for c, v in zip(course_ids, composite)},
+    )
+
+def schedule_load(scores: Dict[str, ClassScore]) -> ScheduleLoadResult:
+    """Total weekly hours for a set of courses.
+
+    Uses each course's felt time_load, falling back to credit hours when the
+    agent left time_load at 0.
+    """
+    course_ids = list(scores)
+    if not course_ids:
+        return ScheduleLoadResult(weeklyHours=0.0, byCourse={})
+    matrix = score_matrix([scores[c] for c in course_ids], ["time_load", "ch"])
+    time_load, ch = matrix[:, 0], matrix[:, 1]
+    hours = np.where(time_load > 0, time_load, ch)
+    return ScheduleLoadResult(
+        weeklyHours=round(float(hours.sum()), 2),
+        byCourse={c: round(float(h), 2) for c, h in zip(course_ids, hours)},
+    )
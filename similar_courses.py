@@ -0,0 +1,190 @@
+import re
+import threading
+import zlib
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from agents.class_score import ClassScore
+from metrics import registry, stats_metrics
+from models import SimilarCourse
+
+# Numeric axes, each scaled to 0-1. Their part of the similarity is one minus
+# the Euclidean distance between two courses (over its maximum, sqrt(#axes)).
+NUMERIC_AXES = ["score", "rigor", "assessment_intensity", "project_intensity", "pace", "time_load"]
+AXIS_SCALE = {"time_load": 1 / 8}
+# Tags and summary words are hashed into a fixed number of columns (feature
+# hashing, so nothing global has to be refit as courses are added); their
+# part of the similarity is the cosine of the two bags of words.
+TEXT_DIMS = 256
+TAG_WEIGHT = 3.0
+TEXT_WEIGHT = 0.35
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this to was were will with "
+    "course class students student".split()
+)
+
+def _text_vector(score: ClassScore) -> np.ndarray:
+    counts = np.zeros(TEXT_DIMS, dtype=np.float32)
+    for tag in score.tags:
+        counts[zlib.crc32(f"tag:{tag.strip().lower()}".encode()) % TEXT_DIMS] += TAG_WEIGHT
+    for word in re.findall(r"[a-z][a-z\-]+", score.summary.lower()):
+        if word not in STOPWORDS:
+            counts[zlib.crc32(word.encode()) % TEXT_DIMS] += 1.0
+    vector = np.log1p(counts)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def feature_vector(score: ClassScore) -> np.ndarray:
+    """One row of the index: scaled numeric axes followed by the unit text vector"""
+    numeric = np.array([getattr(score, axis) * AXIS_SCALE.get(axis, 0.01) for axis in NUMERIC_AXES], dtype=np.float32)
+    return np.concatenate([numeric, _text_vector(score)])
+
+class SimilarCourseIndex:
+    """In-memory nearest-neighbour index over cached ClassScores.
+
+    Rows live in one contiguous float32 matrix that doubles when full, so a
+    query is a couple of matrix-vector products over the whole catalog.
+    Adding a course that is already indexed overwrites its row.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        width = len(NUMERIC_AXES) + TEXT_DIMS
+        self._features = np.zeros((capacity, width), dtype=np.float32)
+        self._sq_norms = np.zeros(capacity, dtype=np.float32)  # squared norm of the numeric block
+        self._scores = np.zeros(capacity, dtype=np.int16)
+        self._time_load = np.zeros(capacity, dtype=np.float32)
+        self._subject_codes = np.zeros(capacity, dtype=np.int32)
+        self._subjects: dict[str, int] = {}
+        self._keys: List[str] = []
+        self._course_ids: List[str] = []
+        self._tags: List[List[str]] = []
+        self._rows: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._course_ids)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def _grow(self) -> None:
+        capacity = self._features.shape[0] * 2
+        for name in ("_features", "_sq_norms", "_scores", "_time_load", "_subject_codes"):
+            old = getattr(self, name)
+            new = np.zeros((capacity, *old.shape[1:]), dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+    def add(self, key: str, course_id: str, score: ClassScore) -> None:
+        """Index (or re-index) a course under its course key"""
+        row_values = feature_vector(score)
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                row = len(self._course_ids)
+                if row == self._features.shape[0]:
+                    self._grow()
+                self._rows[key] = row
+                self._keys.append(key)
+                self._course_ids.append(course_id)
+                self._tags.append([])
+            self._course_ids[row] = course_id
+            self._tags[row] = list(score.tags)
+            subject = course_id.rsplit(" ", 1)[0]
+            self._subject_codes[row] = self._subjects.setdefault(subject, len(self._subjects))
+            self._features[row] = row_values
+            numeric = row_values[: len(NUMERIC_AXES)]
+            self._sq_norms[row] = numeric @ numeric
+            self._scores[row] = score.score
+            self._time_load[row] = score.time_load
+
+    def load(self, entries: Iterable[Tuple[str, str, ClassScore]]) -> int:
+        """Index (key, course id, score) triples in bulk; returns how many"""
+        count = 0
+        for key, course_id, score in entries:
+            self.add(key, course_id, score)
+            count += 1
+        self.loaded = True
+        return count
+
+    def remove(self, key: str) -> None:
+        """Drop a course, moving the last row into its place"""
+        with self._lock:
+            row = self._rows.pop(key, None)
+            if row is None:
+                return
+            last = len(self._keys) - 1
+            if row != last:
+                for array in (self._features, self._sq_norms, self._scores, self._time_load, self._subject_codes):
+                    array[row] = array[last]
+                self._keys[row] = self._keys[last]
+                self._course_ids[row] = self._course_ids[last]
+                self._tags[row] = self._tags[last]
+                self._rows[self._keys[row]] = row
+            self._keys.pop()
+            self._course_ids.pop()
+            self._tags.pop()
+
+    def similar(
+        self,
+        score: ClassScore,
+        k: int = 10,
+        exclude: Optional[str] = None,
+        max_score: Optional[int] = None,
+        max_time_load: Optional[float] = None,
+        subject: Optional[str] = None,
+    ) -> List[SimilarCourse]:
+        """The k indexed courses most like `score`, best first.
+
+        exclude is a course key to leave out (the query course itself);
+        the other filters drop courses harder than max_score, heavier than
+        max_time_load, or outside a subject.
+        """
+        query = feature_vector(score)
+        n_numeric = len(NUMERIC_AXES)
+        q_numeric, q_text = query[:n_numeric], query[n_numeric:]
+        with self._lock:
+            n = len(self._course_ids)
+            if n == 0:
+                return []
+            features = self._features[:n]
+            distance = np.sqrt(np.maximum(
+                self._sq_norms[:n] + q_numeric @ q_numeric - 2 * (features[:, :n_numeric] @ q_numeric), 0
+            ))
+            similarity = (1 - TEXT_WEIGHT) * (1 - distance / np.sqrt(n_numeric)) + TEXT_WEIGHT * (features[:, n_numeric:] @ q_text)
+
+            keep = np.ones(n, dtype=bool)
+            if max_score is not None:
+                keep &= self._scores[:n] <= max_score
+            if max_time_load is not None:
+                keep &= self._time_load[:n] <= max_time_load
+            if subject is not None:
+                keep &= self._subject_codes[:n] == self._subjects.get(subject.upper(), -1)
+            if exclude is not None and exclude in self._rows:
+                keep[self._rows[exclude]] = False
+            similarity = np.where(keep, similarity, -np.inf)
+
+            k = min(k, int(keep.sum()))
+            if k <= 0:
+                return []
+            top = np.argpartition(-similarity, k - 1)[:k]
+            top = top[np.argsort(-similarity[top], kind="stable")]
+            return [
+                SimilarCourse(
+                    courseId=self._course_ids[i],
+                    similarity=round(float(similarity[i]), 4),
+                    score=int(self._scores[i]),
+                    time_load=round(float(self._time_load[i]), 2),
+                    tags=self._tags[i],
+                )
+                for i in top
+            ]
+
+    def stats(self) -> dict:
+        return {"size": len(self), "capacity": self._features.shape[0]}
+
+similar_courses = SimilarCourseIndex()
+registry.collector(lambda: stats_metrics("similar_courses", "Similar-course index", similar_courses.stats()))
@@ -0,0 +1,22 @@
+import os
+import tempfile
+
+# Settings are read at import time: point everything at throwaway storage and
+# fake keys before any app module is imported
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-test")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("CLASS_SCORE_CACHE_URL", "sqlite://")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("SEARCH_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "search_cache.db"))
+
+import httpx
+import pytest_asyncio
+
+@pytest_asyncio.fixture
+async def client():
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
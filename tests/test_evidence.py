@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from agents import class_grading_agent, grading_service
+from agents.class_score import ClassScore
+from agents.class_score_cache import class_score_cache
+from agents.evidence import Snippet, evidence_change, evidence_records, gather_evidence, rank_evidence
+
+class FixtureSource:
+    """Evidence source answering from a fixed list of snippets"""
+
+    def __init__(self, name, snippets=(), weight=1.0, delay=0.0, error=None):
+        self.name = name
+        self.weight = weight
+        self.snippets = list(snippets)
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def fetch(self, course_id):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.snippets
+
+def snippet(source, content, url="", relevance=0.5, title=""):
+    return Snippet(source=source, content=content, url=url, relevance=relevance, title=title)
+
+# --- Gathering and ranking ---
+
+@pytest.mark.asyncio
+async def test_failed_and_slow_sources_contribute_nothing():
+    sources = [
+        FixtureSource("osu", [snippet("osu", "Syllabus for the course")]),
+        FixtureSource("reddit", error=RuntimeError("rate limited")),
+        FixtureSource("coursicle", [snippet("coursicle", "Too late")], delay=1.0),
+    ]
+    snippets = await gather_evidence("CSE 2331", sources, timeout=0.1)
+    assert [s.content for s in snippets] == ["Syllabus for the course"]
+    assert all(source.calls == 1 for source in sources)
+
+def test_duplicates_by_url_or_opening_words_are_dropped():
+    snippets = [
+        snippet("osu", "Exams are hard.", url="https://osu.edu/a"),
+        snippet("reddit", "Totally different text", url="https://osu.edu/a"),
+        snippet("reddit", "EXAMS are hard!!", url="https://reddit.com/b"),
+        snippet("reddit", "Lots of homework", url="https://reddit.com/c"),
+    ]
+    ranked = rank_evidence("CSE 2331", snippets, {})
+    assert [s.content for s in ranked] == ["Exams are hard.", "Lots of homework"]
+
+def test_ranking_weighs_sources_and_course_mentions():
+    snippets = [
+        snippet("reddit", "General advice", relevance=0.9),
+        snippet("osu", "Course overview", relevance=0.9),
+        snippet("reddit", "2331 has weekly proofs", relevance=0.9),
+    ]
+    ranked = rank_evidence("CSE 2331", snippets, {"osu": 1.5, "reddit": 1.0})
+    assert [s.content for s in ranked] == ["Course overview", "2331 has weekly proofs", "General advice"]
+
+def test_every_source_keeps_its_best_snippet_within_the_limit():
+    chatty = [snippet("reddit", f"Reddit thread {i} about 2331", relevance=1.0) for i in range(5)]
+    quiet = [snippet("rmp", "One professor review", relevance=0.1)]
+    ranked = rank_evidence("CSE 2331", chatty + quiet, {}, limit=3)
+    assert len(ranked) == 3
+    assert "rmp" in {s.source for s in ranked}
+
+# --- Refresh decision ---
+
+def test_evidence_change_is_jaccard_distance_over_content():
+    stored = evidence_records([snippet("osu", "A b c"), snippet("reddit", "D e f")])
+    assert evidence_change(stored, [snippet("osu", "a, B. c"), snippet("reddit", "d e F")]) == 0
+    assert evidence_change(stored, [snippet("osu", "A b c"), snippet("reddit", "G h i")]) == pytest.approx(2 / 3)
+    assert evidence_change(stored, [snippet("osu", "X")]) == 1
+    assert evidence_change([], [snippet("osu", "A b c")]) == 1
+
+@pytest.fixture
+def regrades(monkeypatch):
+    """Stub out the model: record re-grades instead of running the graph"""
+    runs = []
+
+    async def run_grading(course_id, evidence=None):
+        runs.append((course_id, evidence))
+        return rated()
+
+    monkeypatch.setattr(grading_service, "_run_grading", run_grading)
+    return runs
+
+def rated():
+    return ClassScore(score=60, ch=3, summary="", time_load=3, pre_reqs=[], co_reqs=[])
+
+STORED = [snippet("osu", f"Stored snippet number {i}", url=f"https://osu.edu/{i}") for i in range(3)]
+
+def use_sources(monkeypatch, *snippets):
+    monkeypatch.setattr(class_grading_agent, "evidence_sources", [FixtureSource("osu", snippets)])
+
+@pytest.mark.asyncio
+async def test_refresh_extends_when_evidence_barely_changed(monkeypatch, regrades):
+    class_score_cache.put("CSE 8001", rated(), evidence=evidence_records(STORED))
+    use_sources(monkeypatch, *STORED)
+    assert await grading_service.refresh_course("CSE 8001") == "extended"
+    assert regrades == []
+
+@pytest.mark.asyncio
+async def test_refresh_regrades_from_the_new_evidence_when_it_changed(monkeypatch, regrades):
+    class_score_cache.put("CSE 8002", rated(), evidence=evidence_records(STORED))
+    fresh = [STORED[0], snippet("osu", "A brand new review"), snippet("osu", "Another new one")]
+    use_sources(monkeypatch, *fresh)
+    assert await grading_service.refresh_course("CSE 8002") == "regraded"
+    [(course_id, evidence)] = regrades
+    assert course_id == "CSE 8002"
+    assert {s.content for s in evidence} == {s.content for s in fresh}
+
+@pytest.mark.asyncio
+async def test_refresh_leaves_the_entry_alone_when_sources_find_nothing(monkeypatch, regrades):
+    class_score_cache.put("CSE 8003", rated(), evidence=evidence_records(STORED))
+    use_sources(monkeypatch)
+    assert await grading_service.refresh_course("CSE 8003") == "skipped"
+    assert regrades == []
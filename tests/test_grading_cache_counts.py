@@ -0,0 +1,31 @@
+import pytest
+
+from agents.class_grading_agent import check_cache
+from agents.class_score import ClassScore
+from agents.class_score_cache import class_score_cache
+from agents.grading_service import initial_grading_state
+
+def counts():
+    return class_score_cache.hits, class_score_cache.misses
+
+@pytest.mark.asyncio
+async def test_checked_miss_is_not_counted_again():
+    before = counts()
+    result = await check_cache(initial_grading_state("CSE 9901", cache_checked=True))
+    assert result == {"cached": False, "class_score": None}
+    assert counts() == before
+
+@pytest.mark.asyncio
+async def test_checked_state_still_sees_a_run_that_just_finished():
+    score = ClassScore(score=40, ch=3, summary="", time_load=2, pre_reqs=[], co_reqs=[])
+    class_score_cache.put("CSE 9902", score)
+    before = counts()
+    result = await check_cache(initial_grading_state("cse-9902", cache_checked=True))
+    assert result["cached"] and result["class_score"] == score
+    assert counts() == before
+
+@pytest.mark.asyncio
+async def test_unchecked_state_counts_its_lookup():
+    hits, misses = counts()
+    await check_cache(initial_grading_state("CSE 9903"))
+    assert counts() == (hits, misses + 1)
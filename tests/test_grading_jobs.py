@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from agents import grading_jobs as grading_jobs_module
+from agents.class_score import ClassScore
+from agents.grading_jobs import GradingJobQueue, JobStatus, QueueFull, grading_jobs
+
+class StubGrader:
+    """Stands in for grade_course: records each course and blocks until released"""
+
+    def __init__(self):
+        self.graded = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, course_id: str) -> ClassScore:
+        self.graded.append(course_id)
+        await self.release.wait()
+        return ClassScore(score=50, ch=3, summary="", time_load=3, pre_reqs=[], co_reqs=[])
+
+@pytest.fixture
+def grader(monkeypatch):
+    grader = StubGrader()
+    monkeypatch.setattr(grading_jobs_module, "grade_course", grader)
+    return grader
+
+@pytest_asyncio.fixture
+async def queue(grader):
+    queue = GradingJobQueue(workers=1, max_queued=2, retention=60)
+    await queue.start()
+    yield queue
+    await queue.stop()
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+@pytest.mark.asyncio
+async def test_equivalent_course_ids_share_one_job(queue, grader):
+    first = await queue.submit("CSE 5911")
+    second = await queue.submit("cse-5911", priority="prefetch")
+    assert second.jobId == first.jobId
+    assert queue.deduplicated == 1
+    grader.release.set()
+    await settle()
+    assert first.status == JobStatus.done and first.result is not None
+    assert grader.graded == ["CSE 5911"]
+
+@pytest.mark.asyncio
+async def test_interactive_resubmit_jumps_queued_prefetch_work(queue, grader):
+    await queue.submit("CSE 5911")
+    await settle()
+    await queue.submit("CSE 5912", priority="prefetch")
+    late = await queue.submit("CSE 5913", priority="prefetch")
+    assert (await queue.submit("CSE 5913", priority="interactive")).jobId == late.jobId
+    assert late.priority == "interactive"
+    grader.release.set()
+    await settle()
+    assert grader.graded == ["CSE 5911", "CSE 5913", "CSE 5912"]
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected(queue, grader):
+    await queue.submit("CSE 5911")
+    await settle()
+    await queue.submit("CSE 5912")
+    await queue.submit("CSE 5913")
+    with pytest.raises(QueueFull):
+        await queue.submit("CSE 5914")
+    assert queue.rejected == 1
+
+@pytest.mark.asyncio
+async def test_full_queue_is_429(client, grader, monkeypatch):
+    monkeypatch.setattr(grading_jobs, "max_queued", 0)
+    response = await client.post("/courses/ratings/jobs", json={"courseId": "CSE 5915"})
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "30"
+
+@pytest.mark.asyncio
+async def test_finished_jobs_are_pruned_after_retention(queue, grader, monkeypatch):
+    grader.release.set()
+    job = await queue.submit("CSE 5911")
+    await settle()
+    assert queue.get(job.jobId).status == JobStatus.done
+    now = grading_jobs_module.time.time()
+    monkeypatch.setattr(grading_jobs_module.time, "time", lambda: now + 61)
+    await queue.submit("CSE 5912")
+    assert queue.get(job.jobId) is None
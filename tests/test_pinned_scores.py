@@ -0,0 +1,17 @@
+import pytest
+
+from agents.pinned_scores import pinned_scores
+
+@pytest.mark.asyncio
+async def test_rating_route_serves_the_pinned_score(client):
+    response = await client.get("/courses/ratings/cse-2331")
+    assert response.status_code == 200
+    assert response.json() == pinned_scores["CSE2331"].model_dump(mode="json")
+
+@pytest.mark.asyncio
+async def test_aggregate_routes_see_the_pinned_score(client):
+    response = await client.post("/courses/schedule-load", json={"courseIds": ["CSE 2331"]})
+    assert response.status_code == 200
+    response = await client.post("/courses/compare", json={"courses": [{"courseId": "CSE 2331"}]})
+    assert response.status_code == 200
+    assert response.json()["rankedCourses"] == ["CSE 2331"]
@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from agents import precompute_ratings
+
+@pytest.mark.asyncio
+async def test_lines_that_arent_course_ids_fail_without_running_the_graph(tmp_path, monkeypatch):
+    graded = []
+
+    async def grade(course_id, limiter, retries):
+        graded.append(course_id)
+
+    monkeypatch.setattr(precompute_ratings, "grade_with_retries", grade)
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    counts = await precompute_ratings.precompute(
+        ["cse-2221", "Intro to Programming", "CSE 2221", "math1151"], checkpoint_path=str(checkpoint)
+    )
+
+    assert graded == ["CSE 2221", "MATH 1151"]
+    assert counts == {"done": 2, "skipped": 0, "failed": 1}
+    records = [json.loads(line) for line in checkpoint.read_text().splitlines()]
+    assert [(r["courseId"], r["status"]) for r in records if r["status"] == "failed"] == [("Intro to Programming", "failed")]
+
+    # The bad line isn't checkpointed as done, so a re-run reports it again
+    counts = await precompute_ratings.precompute(["Intro to Programming", "CSE 2221"], checkpoint_path=str(checkpoint))
+    assert counts == {"done": 0, "skipped": 1, "failed": 1}
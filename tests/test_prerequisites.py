@@ -0,0 +1,46 @@
+import threading
+
+from agents.class_score import ClassScore
+from course_identity import parse_course_id
+from prerequisites import PrerequisiteGraph
+
+def rated(*pre_reqs):
+    return ClassScore(score=50, ch=3, summary="", time_load=3, pre_reqs=list(pre_reqs), co_reqs=[])
+
+def graph_with(*courses):
+    graph = PrerequisiteGraph(None)
+    graph.load([(parse_course_id(course), rated(*reqs)) for course, reqs in courses])
+    graph.refresh()
+    return graph
+
+def test_queries_read_the_last_built_index_and_never_rebuild():
+    graph = graph_with(("CSE 2231", ["CSE 2221"]))
+    graph.update(parse_course_id("CSE 2321"), rated("CSE 2231"))
+    assert graph.stale
+    assert graph.all_prereqs(parse_course_id("CSE 2321")) == []
+    assert graph.stale
+
+    graph.refresh()
+    assert not graph.stale
+    assert graph.all_prereqs(parse_course_id("CSE 2321")) == ["CSE 2221", "CSE 2231"]
+
+def test_queries_are_answered_while_a_rebuild_is_running():
+    graph = graph_with(("CSE 2231", ["CSE 2221"]))
+    graph.update(parse_course_id("CSE 2321"), rated("CSE 2231"))
+    answered = threading.Event()
+
+    def query():
+        graph.unmet(["CSE 2231"], [])
+        answered.set()
+
+    with graph._build_lock:  # as if refresh() were mid-build in another thread
+        threading.Thread(target=query).start()
+        assert answered.wait(timeout=2)
+
+def test_unmet_and_unlocks():
+    graph = graph_with(("CSE 2231", ["CSE 2221"]), ("CSE 2321", ["CSE 2231 or CSE 2221"]))
+    assert graph.unmet(["CSE 2231", "CSE 2321"], ["CSE 2221"]) == []
+    assert graph.unmet(["CSE 2231"], []) == [{"courseId": "CSE 2231", "missing": [["CSE 2221"]]}]
+    unlocked, leads_to = graph.unlocks(parse_course_id("CSE 2221"))
+    assert unlocked == ["CSE 2231", "CSE 2321"]
+    assert leads_to == ["CSE 2231", "CSE 2321"]
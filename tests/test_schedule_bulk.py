@@ -0,0 +1,68 @@
+import pytest
+
+def plan(name, favorite=False, **extra):
+    return {"name": name, "items": [{"courseId": "CSE 2221"}], "favorite": favorite, **extra}
+
+@pytest.mark.asyncio
+async def test_every_schedule_response_writes_utc_timestamps_the_same_way(client):
+    saved = (await client.put("/schedule/save/tz1", json=plan("A", favorite=True))).json()
+    batch = (await client.post("/schedule/batch", json=[plan("B", userId="tz1")])).json()
+    responses = [
+        saved,
+        batch[0],
+        (await client.get("/schedule/tz1")).json()[0],
+        (await client.get("/schedule/tz1", params={"limit": 1})).json()[0],
+        (await client.get("/schedule/favorite/tz1")).json(),
+        (await client.get("/schedule/favorites", params={"userIds": "tz1"})).json()["tz1"],
+    ]
+    assert all(schedule["updatedAt"].endswith("Z") for schedule in responses)
+    assert len({schedule["updatedAt"] for schedule in responses if schedule["name"] == "A"}) == 1
+
+@pytest.mark.asyncio
+async def test_pages_cover_the_list_once(client):
+    for i in range(5):
+        await client.post("/schedule/add/pages1", json=plan(f"P{i}"))
+    names, cursor = [], None
+    while True:
+        response = await client.get("/schedule/pages1", params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        names += [s["name"] for s in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert names == [f"P{i}" for i in range(5)]
+
+@pytest.mark.asyncio
+async def test_favorites_for_many_users(client):
+    await client.post("/schedule/batch", json=[
+        plan("A", favorite=True, userId="fav1"),
+        plan("B", favorite=True, userId="fav1"),
+        plan("C", userId="fav2"),
+    ])
+    favorites = (await client.get("/schedule/favorites", params=[("userIds", "fav1"), ("userIds", "fav2")])).json()
+    assert favorites["fav1"]["name"] == "B"
+    assert favorites["fav2"] is None
+
+@pytest.mark.asyncio
+async def test_saving_a_name_again_updates_that_schedule(client):
+    first = (await client.put("/schedule/save/ups1", json=plan("A", favorite=True))).json()
+    second = (await client.put("/schedule/save/ups1", json={**plan("A"), "items": [{"courseId": "CSE 2231"}]})).json()
+    assert second["scheduleId"] == first["scheduleId"]
+    schedules = (await client.get("/schedule/ups1")).json()
+    assert [(s["name"], s["favorite"], s["items"][0]["courseId"]) for s in schedules] == [("A", False, "CSE 2231")]
+
+@pytest.mark.asyncio
+async def test_adding_a_taken_name_is_409(client):
+    assert (await client.post("/schedule/add/ups2", json=plan("A"))).status_code == 201
+    assert (await client.post("/schedule/add/ups2", json=plan("A"))).status_code == 409
+    assert (await client.post("/schedule/add/ups3", json=plan("A"))).status_code == 201
+
+@pytest.mark.asyncio
+async def test_batch_updates_saved_names_in_place(client):
+    saved = (await client.put("/schedule/save/ups4", json=plan("A", favorite=True))).json()
+    batch = (await client.post("/schedule/batch", json=[
+        plan("A", userId="ups4"),
+        plan("B", favorite=True, userId="ups4"),
+    ])).json()
+    assert batch[0]["scheduleId"] == saved["scheduleId"]
+    schedules = (await client.get("/schedule/ups4")).json()
+    assert [(s["name"], s["favorite"]) for s in schedules] == [("A", False), ("B", True)]
@@ -0,0 +1,49 @@
+import pytest
+
+def plan(name, favorite=False):
+    return {"name": name, "items": [{"courseId": "CSE 2221"}], "favorite": favorite}
+
+@pytest.mark.asyncio
+async def test_list_revalidates_by_etag(client):
+    await client.put("/schedule/save/cache1", json=plan("A"))
+    first = await client.get("/schedule/cache1")
+    assert "last-modified" not in first.headers
+    again = await client.get("/schedule/cache1", headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+
+@pytest.mark.asyncio
+async def test_deleting_a_schedule_invalidates_the_cached_list(client):
+    await client.put("/schedule/save/cache2", json=plan("A"))
+    saved = (await client.put("/schedule/save/cache2", json=plan("B"))).json()
+    first = await client.get("/schedule/cache2")
+    assert len(first.json()) == 2
+
+    assert (await client.delete(f"/schedule/cache2/{saved['scheduleId']}")).status_code == 204
+    for headers in (
+        {"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"},
+        {"If-None-Match": first.headers["etag"]},
+    ):
+        response = await client.get("/schedule/cache2", headers=headers)
+        assert response.status_code == 200
+        assert [s["name"] for s in response.json()] == ["A"]
+
+@pytest.mark.asyncio
+async def test_deleted_favorite_is_not_served_from_cache(client):
+    saved = (await client.put("/schedule/save/cache3", json=plan("A", favorite=True))).json()
+    first = await client.get("/schedule/favorite/cache3")
+    await client.delete(f"/schedule/cache3/{saved['scheduleId']}")
+    response = await client.get("/schedule/favorite/cache3", headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == 200
+    assert response.json() is None
+
+@pytest.mark.asyncio
+async def test_gzip_and_identity_bodies_share_a_weak_etag(client):
+    for i in range(20):
+        await client.put("/schedule/save/cache4", json=plan(f"Plan {i}"))
+    gzipped = await client.get("/schedule/cache4", headers={"Accept-Encoding": "gzip"})
+    identity = await client.get("/schedule/cache4", headers={"Accept-Encoding": "identity"})
+    assert gzipped.headers["content-encoding"] == "gzip" and "content-encoding" not in identity.headers
+    assert gzipped.headers["etag"] == identity.headers["etag"]
+    assert gzipped.headers["etag"].startswith('W/"')
+    again = await client.get("/schedule/cache4", headers={"If-None-Match": identity.headers["etag"], "Accept-Encoding": "gzip"})
+    assert again.status_code == 304
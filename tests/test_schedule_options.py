@@ -0,0 +1,41 @@
+import pytest
+
+from agents.class_score import ClassScore
+from agents.class_score_cache import class_score_cache
+
+@pytest.fixture(autouse=True)
+def rated_courses():
+    for course_id in ("CSE 2221", "CSE 2231"):
+        class_score_cache.put(course_id, ClassScore(score=50, ch=3, summary="", time_load=3, pre_reqs=[], co_reqs=[]))
+
+def request(**constraints):
+    return {
+        "courseIds": ["CSE 2221", "cse-2231"],
+        "sections": {"CSE 2221": [{"sectionId": "0010", "meetings": [{"day": "F", "start": "09:10", "end": "10:05"}]}]},
+        "constraints": constraints,
+    }
+
+@pytest.mark.asyncio
+async def test_numeric_strings_are_coerced(client):
+    response = await client.post("/courses/schedule-options", json=request(maxCredits="18", required=["cse 2231"]))
+    assert response.status_code == 200
+    assert response.json()[0]["credits"] == 6
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("constraints", [
+    {"maxCredits": "eighteen"},
+    {"minCredits": -1},
+    {"noDays": "F"},
+    {"noDays": ["Funday"]},
+    {"earliestStart": "9am"},
+    {"latestEnd": "25:00"},
+])
+async def test_bad_constraints_are_422(client, constraints):
+    response = await client.post("/courses/schedule-options", json=request(**constraints))
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_excluded_day_drops_the_section(client):
+    response = await client.post("/courses/schedule-options", json=request(noFri=True, required=["CSE 2231"]))
+    assert response.status_code == 200
+    assert [item["courseId"] for item in response.json()[0]["items"]] == ["CSE 2231"]
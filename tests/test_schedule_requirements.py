@@ -0,0 +1,34 @@
+import pytest
+
+from agents.class_score import ClassScore
+from course_identity import parse_course_id
+from prerequisites import prerequisite_graph
+
+def rated(pre_reqs):
+    return ClassScore(score=50, ch=3, summary="", time_load=3, pre_reqs=pre_reqs, co_reqs=[])
+
+@pytest.fixture(autouse=True)
+def requirements():
+    prerequisite_graph.update(parse_course_id("CSE 2231"), rated(["CSE 2221"]))
+
+def schedule(*course_ids, completed=()):
+    return {"name": "Plan", "items": [{"courseId": c} for c in course_ids], "completedCourses": list(completed)}
+
+@pytest.mark.asyncio
+async def test_items_that_arent_course_ids_pass_the_check(client):
+    response = await client.put("/schedule/save/u1", json=schedule("not a course", "CSE 2231", completed=["CSE 2221"]))
+    assert response.status_code == 201
+    assert [item["courseId"] for item in response.json()["items"]] == ["not a course", "CSE 2231"]
+
+@pytest.mark.asyncio
+async def test_unmet_requirements_are_still_reported_next_to_junk_items(client):
+    response = await client.post("/schedule/add/u1", json=schedule("not a course", "CSE 2231"))
+    assert response.status_code == 422
+    assert response.json()["detail"]["unmet"] == [{"courseId": "CSE 2231", "missing": [["CSE 2221"]]}]
+
+@pytest.mark.asyncio
+async def test_batch_with_junk_items(client):
+    body = [dict(schedule("not a course", completed=[]), userId="u2"), dict(schedule("CSE 2231"), userId="u3")]
+    response = await client.post("/schedule/batch", json=body)
+    assert response.status_code == 422
+    assert [entry["index"] for entry in response.json()["detail"]["schedules"]] == [1]
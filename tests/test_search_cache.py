@@ -0,0 +1,109 @@
+from typing import Any
+
+import pytest
+from langchain_core.tools import BaseTool
+from langgraph.graph import END, START, StateGraph
+
+from agents.tools import search_cache
+from agents.tools.search_cache import CachedSearchTool, SearchResultStore, fresh_search_scope, search_run_scope
+
+class RecordedSearch(BaseTool):
+    """Fixture-backed search: canned results per query, counting upstream calls"""
+
+    name: str = "recorded_search"
+    description: str = "Search with recorded results"
+    calls: list = []
+
+    def _run(self, query: str) -> Any:
+        self.calls.append(query)
+        if "broken" in query:
+            return {"error": "upstream failed"}
+        return {"query": query, "results": [{"url": f"https://example.edu/{len(self.calls)}", "content": query}]}
+
+    async def _arun(self, query: str) -> Any:
+        return self._run(query)
+
+@pytest.fixture
+def upstream():
+    return RecordedSearch(calls=[])
+
+@pytest.fixture
+def store(tmp_path):
+    return SearchResultStore(str(tmp_path / "search.db"), ttl=60)
+
+@pytest.fixture
+def tool(upstream, store):
+    return CachedSearchTool(inner=upstream, store=store)
+
+def test_equivalent_queries_hit_the_cache(tool, upstream):
+    first = tool.invoke({"query": "CSE 2331 OSU syllabus"})
+    second = tool.invoke({"query": "cse-2331  osu Syllabus"})
+    assert second == first
+    assert upstream.calls == ["CSE 2331 OSU syllabus"]
+    assert (tool.hits, tool.misses) == (1, 1)
+
+@pytest.mark.asyncio
+async def test_async_hit_is_served_from_the_store(tool, upstream):
+    await tool.ainvoke({"query": "CSE 2331 reddit"})
+    await tool.ainvoke({"query": "cse2331 Reddit"})
+    assert len(upstream.calls) == 1
+
+def test_word_order_is_part_of_the_key(tool, upstream):
+    tool.invoke({"query": "CSE 2331 before CSE 2231"})
+    tool.invoke({"query": "CSE 2231 before CSE 2331"})
+    assert len(upstream.calls) == 2
+
+def test_expired_results_are_fetched_again(tool, upstream, monkeypatch):
+    tool.invoke({"query": "CSE 2331 workload"})
+    now = search_cache.time.time()
+    monkeypatch.setattr(search_cache.time, "time", lambda: now + 61)
+    tool.invoke({"query": "CSE 2331 workload"})
+    assert len(upstream.calls) == 2
+    assert tool.misses == 2
+
+def test_errors_are_not_stored(tool, upstream):
+    tool.invoke({"query": "broken CSE 2331"})
+    tool.invoke({"query": "broken CSE 2331"})
+    assert len(upstream.calls) == 2
+
+def test_offline_replays_recorded_results_only(upstream, store):
+    CachedSearchTool(inner=upstream, store=store).invoke({"query": "CSE 2331 exams"})
+    offline = CachedSearchTool(inner=upstream, store=store, offline=True)
+    assert offline.invoke({"query": "cse-2331 Exams"})["results"]
+    missing = offline.invoke({"query": "CSE 9999 exams"})
+    assert missing["results"] == [] and "offline" in missing["error"]
+    assert len(upstream.calls) == 1
+
+def test_fresh_scope_skips_and_refreshes_the_store(tool, upstream):
+    tool.invoke({"query": "CSE 2331 professor"})
+    with fresh_search_scope():
+        refreshed = tool.invoke({"query": "CSE 2331 professor"})
+    assert len(upstream.calls) == 2
+    assert tool.invoke({"query": "CSE 2331 professor"}) == refreshed
+
+@pytest.mark.asyncio
+async def test_identical_queries_in_one_run_are_deduplicated(upstream, store):
+    tool = CachedSearchTool(inner=upstream, store=store)
+    with search_run_scope(), fresh_search_scope():
+        await tool.ainvoke({"query": "CSE 2331 labs"})
+        await tool.ainvoke({"query": "cse2331 labs"})
+    assert len(upstream.calls) == 1
+    assert tool.run_dedups == 1
+
+@pytest.mark.asyncio
+async def test_one_scope_covers_every_node_of_a_graph_run(upstream, store):
+    tool = CachedSearchTool(inner=upstream, store=store)
+
+    async def search(state: dict) -> dict:
+        await tool.ainvoke({"query": "CSE 2331 labs"})
+        return {"searches": state["searches"] + 1}
+
+    graph = StateGraph(dict)
+    graph.add_node("retrieve", search)
+    graph.add_node("agent", search)
+    graph.add_edge(START, "retrieve")
+    graph.add_edge("retrieve", "agent")
+    graph.add_edge("agent", END)
+    with search_run_scope(), fresh_search_scope():
+        await graph.compile().ainvoke({"searches": 0})
+    assert len(upstream.calls) == 1
@@ -0,0 +1,37 @@
+import pytest
+
+from auth import password_hasher
+
+async def register(client, username):
+    response = await client.post(
+        "/users/register", json={"username": username, "email": f"{username}@example.edu", "password": "correct horse"}
+    )
+    assert response.status_code == 201
+    token = response.json()["access_token"]
+    me = await client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+    return me.json()["id"], {"Authorization": f"Bearer {token}"}
+
+@pytest.mark.asyncio
+async def test_wrong_password_is_401(client):
+    await register(client, "login1")
+    response = await client.post("/users/login", json={"username_or_email": "login1", "password": "battery staple"})
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+    response = await client.post("/users/login", json={"username_or_email": "login1@example.edu", "password": "correct horse"})
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_updating_another_user_is_403(client):
+    _, headers = await register(client, "owner1")
+    other_id, _ = await register(client, "other1")
+    response = await client.put(f"/users/{other_id}", json={"username": "taken-over"}, headers=headers)
+    assert response.status_code == 403
+    assert (await client.get(f"/users/{other_id}")).json()["username"] == "other1"
+
+@pytest.mark.asyncio
+async def test_saturated_hasher_is_429(client, monkeypatch):
+    await register(client, "busy1")
+    monkeypatch.setattr(password_hasher, "_pending", password_hasher.workers + password_hasher.max_waiting)
+    response = await client.post("/users/login", json={"username_or_email": "busy1", "password": "correct horse"})
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "5"